@@ -21,6 +21,18 @@ stop-db:
 upgrade-schema-version:
 	@./upgrade-schema-version.sh
 
+# Write the manifest of the migrations, required any time
+# a migration file is changed
+migration-manifest:
+	@python3 -m $(MODULE_NAME) migration-manifest
+
+# Write the model of the structure checked for drift, required any time
+# an install file is changed. The connection must hold a fresh install
+# of the structure in the plugin schema, with the plugin SRID
+STRUCTURE_CONNECTION ?= service=test
+structure-model:
+	@python3 -m $(MODULE_NAME) structure-model "$(STRUCTURE_CONNECTION)"
+
 # Apply the patch file from to the migration to the actual install
 # sql files
 patch-install-files:
@@ -61,6 +61,160 @@ def show_default_schema(args):
     print(resources.schema_name())
 
 
+@command("migrations", help="Show the migrations applied by an upgrade")
+@argument("--from", dest="from_version", type=int, default=0, help="Installed version")
+def show_migrations(args):
+    """Show the migrations applied by an upgrade from the installed version, from the manifest"""
+    from .plugin_tools import resources
+
+    manifest = resources.migration_manifest()
+    total = 0
+    for version, _ in resources.available_migrations(args.from_version):
+        entry = manifest[version]
+        total += entry.get("cost", 0)
+        print(
+            f"{version:>4} {entry['file']} phases={','.join(entry.get('phases', ())) or '-'} "
+            f"statements={entry.get('statements', '?')} cost={entry.get('cost', '?')}"
+        )
+    print(f"estimated cost: {total}")
+
+
+@command("migration-manifest", help="Write the manifest of the migrations")
+@argument("--output", help="Manifest file, the one shipped with the plugin by default")
+def migration_manifest(args):
+    """Write the manifest of the migration files"""
+    from pathlib import Path
+
+    from .plugin_tools import manifest, resources
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        output = resources.plugin_path("install", resources.MIGRATIONS_MANIFEST)
+    manifest.write_manifest(output)
+    print(output)
+
+
+@command("batch-install", help="Install the database structure on many targets")
+@argument(
+    "--no-single-transaction",
+    dest="single_transaction",
+    action="store_false",
+    help="Do not run each install as a single transaction",
+)
+@argument("--override", action="store_true", help="Drop and recreate the existing schemas")
+@argument("--workers", type=int, default=4, help="Number of targets installed at once")
+@argument(
+    "targets",
+    help="CSV file with a connection,schema,srid row per target. The connection is the "
+    "name of a QGIS connection or a connection string such as service=name",
+)
+def batch_install(args):
+    """Install the database structure on many targets, several at once"""
+    from pathlib import Path
+
+    app = start_qgis()
+
+    from .plugin_tools.feedback import LoggerProcessingFeedBack
+    from .processing.database import batch
+
+    targets = batch.read_targets(Path(args.targets))
+    results = batch.run_batch(
+        targets,
+        workers=args.workers,
+        override=args.override,
+        feedback=LoggerProcessingFeedBack(use_logger=True),
+        single_transaction=args.single_transaction,
+    )
+    print(batch.summary(results))
+
+    app.exitQgis()
+    if not all(result.success for result in results):
+        cli.exit(1)
+
+
+@command("fleet-upgrade", help="Upgrade the database structure on many databases")
+@argument("--matrix", help="CSV file written with the result of each target")
+@argument("--retries", type=int, default=3, help="Number of retries when a lock is not available")
+@argument("--lock-timeout", type=int, default=2000, help="Lock timeout, in milliseconds")
+@argument("--workers", type=int, default=4, help="Number of databases upgraded at once")
+@argument(
+    "targets",
+    nargs="?",
+    help="CSV file with a connection,schema row per target. "
+    "All the configured PostgreSQL connections are upgraded if not set",
+)
+def fleet_upgrade(args):
+    """Upgrade the database structure on many databases, several at once"""
+    from pathlib import Path
+
+    app = start_qgis()
+
+    from .plugin_tools.feedback import LoggerProcessingFeedBack
+    from .processing.database import batch
+
+    if args.targets:
+        targets = batch.read_targets(Path(args.targets))
+    else:
+        targets = batch.connection_targets()
+    results = batch.run_batch(
+        targets,
+        workers=args.workers,
+        feedback=LoggerProcessingFeedBack(use_logger=True),
+        task=batch.upgrade_target,
+        lock_timeout=args.lock_timeout,
+        retries=args.retries,
+    )
+    print(batch.summary(results, "upgraded or up to date"))
+    if args.matrix:
+        batch.write_matrix(Path(args.matrix), results)
+
+    app.exitQgis()
+    if not all(result.success for result in results):
+        cli.exit(1)
+
+
+@command("structure-model", help="Write the model of the structure checked for drift")
+@argument("--output", help="Model file, the one shipped with the plugin by default")
+@argument(
+    "connection",
+    help="Name of a QGIS connection or connection string such as service=name, to a database "
+    "with a fresh install of the structure in the plugin schema, with the plugin SRID",
+)
+def structure_model(args):
+    """Write the model of the structure from a fresh install"""
+    from pathlib import Path
+
+    app = start_qgis()
+
+    from .plugin_tools import resources
+    from .processing.database import batch, drift
+
+    connection = batch.target_connection(args.connection)
+    output = Path(args.output) if args.output else drift.model_path()
+    drift.write_model(
+        output,
+        drift.snapshot(connection, resources.schema_name()),
+        resources.schema_version(),
+    )
+    print(output)
+
+    app.exitQgis()
+
+
+def start_qgis():
+    """Start a QGIS application without GUI"""
+    import os
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from qgis.core import QgsApplication
+
+    app = QgsApplication([], False)
+    app.initQgis()
+    return app
+
+
 def main() -> None:
     """Main function for the CLI menu."""
 
@@ -1,3 +1,4 @@
+import time
 import webbrowser
 
 from functools import partial
@@ -5,13 +6,16 @@ from typing import Optional
 
 from qgis.core import (
     Qgis,
+    QgsApplication,
     QgsExpressionContextUtils,
     QgsProject,
+    QgsTask,
 )
 from qgis.processing import execAlgorithmDialog
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.QtCore import pyqtSignal
-from qgis.PyQt.QtWidgets import QPushButton
+from qgis.PyQt.QtCore import Qt, QTimer, pyqtSignal
+from qgis.PyQt.QtGui import QColor
+from qgis.PyQt.QtWidgets import QHeaderView, QPushButton, QTableWidgetItem
 
 from .plugin_tools.i18n import tr
 from .plugin_tools.resources import (
@@ -21,7 +25,10 @@ from .plugin_tools.resources import (
     schema_version,
     version,
 )
+from .processing.database import ledger, statistics
+from .processing.database.install import installed_version_sql
 from .processing.tools import (
+    connection_registry,
     fetch_data_from_sql_query,
     get_connection_name,
     get_postgis_connection_list,
@@ -30,6 +37,56 @@ from .processing.tools import (
 
 FORM_CLASS = load_ui("dockwidget_base.ui")
 
+# Delay in milliseconds before checking the database, so that a burst
+# of project changes runs a single check
+STATUS_CHECK_DELAY = 300
+
+# Time in seconds during which the version read from a connection is reused
+STATUS_CACHE_TTL = 30
+
+
+class DatabaseVersionTask(QgsTask):
+    """Read the database version of a connection in a background thread"""
+
+    def __init__(self, connection_name: str):
+        super().__init__(tr("Checking the database version"), QgsTask.CanCancel)
+        self.connection_name = connection_name
+        self.version: Optional[int] = None
+        self.description = ""
+
+    def run(self) -> bool:
+        # No widget nor project must be used here
+        if connection_registry.find(self.connection_name) is None:
+            # The connection has been removed meanwhile
+            return False
+        try:
+            self.version, self.description = PluginDockWidget.check_database_version(self.connection_name)
+        except ValueError:
+            # The version is not an integer
+            return False
+        return True
+
+
+class TableStatisticsTask(QgsTask):
+    """Read the statistics of the tables of a connection in a background thread"""
+
+    def __init__(self, connection_name: str):
+        super().__init__(tr("Reading the table statistics"), QgsTask.CanCancel)
+        self.connection_name = connection_name
+        self.statistics: list[statistics.TableStatistics] = []
+        self.error = ""
+
+    def run(self) -> bool:
+        result, error = fetch_data_from_sql_query(
+            self.connection_name,
+            statistics.table_statistics_sql(schema_name()),
+        )
+        if error:
+            self.error = error
+            return False
+        self.statistics = [statistics.TableStatistics(*row) for row in result]
+        return True
+
 
 class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc, valid-type]
     closingPlugin = pyqtSignal()
@@ -62,6 +119,27 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
         if button:
             button.clicked.connect(self.on_line_help)
 
+        # Database version by connection name: (time, version, description)
+        self.version_cache: dict[str, tuple[float, Optional[int], str]] = {}
+        self.version_task: Optional[DatabaseVersionTask] = None
+
+        # The database is checked once the project changes are over
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(STATUS_CHECK_DELAY)
+        self.status_timer.timeout.connect(self.start_status_check)
+
+        # Statistics of the tables, read on demand
+        self.statistics_task: Optional[TableStatisticsTask] = None
+        self.statistics_connection = ""
+        self.table_statistics.setColumnCount(6)
+        self.table_statistics.setHorizontalHeaderLabels(
+            (tr("Table"), tr("Rows"), tr("Size"), tr("Indexes"), tr("Last vacuum"), tr("Last analyze"))
+        )
+        self.table_statistics.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table_statistics.verticalHeader().hide()
+        self.button_refresh_statistics.clicked.connect(self.refresh_statistics)
+
         # Connect on project load or new
         self.project = QgsProject.instance()
         self.iface.projectRead.connect(self.set_information_from_project)
@@ -72,29 +150,27 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
         self.set_information_from_project()
 
     @staticmethod
-    def check_database_version() -> Optional[int]:
-        """Get the database version"""
-        # Query the database
-        sql = f"""
-            SELECT me_version
-            FROM {schema_name()}.metadata
-            WHERE me_status = 1
-            ORDER BY me_version_date DESC
-            LIMIT 1;
+    def check_database_version(connection_name: str) -> tuple[Optional[int], str]:
+        """Get the database version, with a description of the last change
+
+        The version is read from the last entry of the migration ledger,
+        or from the metadata table for a structure installed without ledger.
+        Run in a background task.
         """
-        project = QgsProject.instance()
-        connection_name = get_connection_name(project)
+        result, _ = fetch_data_from_sql_query(connection_name, ledger.latest_sql(schema_name()))
+        if result:
+            db_version, kind, plugin_version, finished_at, duration = result[0]
+            description = tr(
+                f"Last change: {kind} of version {db_version} on {finished_at}, "
+                f"in {duration}, by the plugin {plugin_version}"
+            )
+            return int(db_version), description
 
-        get_data = QgsExpressionContextUtils.globalScope().variable("stareau_get_database_data")
-        db_version = None
-        if get_data == "yes" and connection_name in get_postgis_connection_list():
-            result, _ = fetch_data_from_sql_query(connection_name, sql)
-            if result:
-                for a in result:
-                    db_version = int(a[0])
-                    break
+        result, _ = fetch_data_from_sql_query(connection_name, installed_version_sql(schema_name()))
+        if result:
+            return int(result[0][0]), ""
 
-        return db_version
+        return None, ""
 
     def set_information_from_project(self):
         """Set project based information such as database connection name"""
@@ -119,10 +195,15 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
         # Check database version against plugin version
         plugin_version = version()
         self.plugin_version.setText(plugin_version)
-        version_comment, version_stylesheet = self.check_database_status(connection_exists)
 
-        self.version_comment.setText(version_comment)
-        self.version_comment.setStyleSheet(version_stylesheet)
+        get_data = QgsExpressionContextUtils.globalScope().variable("stareau_get_database_data")
+        if connection_exists and get_data == "yes":
+            # The database is checked in the background
+            self.set_status(tr("Checking the database version…"), "font-style: italic; color: gray;")
+            self.status_timer.start()
+        else:
+            self.status_timer.stop()
+            self.show_database_status(connection_exists, None, "")
 
         # Set project connection name and stylesheet
         self.database_connection_name.setText(connection_info)
@@ -139,7 +220,53 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
             button.setEnabled(connection_exists)
             button.show()
 
-    def check_database_status(self, connection_exists: bool) -> tuple[str, str]:
+        # The statistics of another connection are not kept
+        if connection_name != self.statistics_connection:
+            self.table_statistics.setRowCount(0)
+            self.statistics_comment.clear()
+            self.statistics_connection = connection_name
+        self.button_refresh_statistics.setEnabled(connection_exists and self.statistics_task is None)
+
+    def start_status_check(self):
+        """Read the database version, from the cache or in a background task"""
+        connection_name = get_connection_name(self.project)
+        cached = self.version_cache.get(connection_name)
+        if cached and time.monotonic() - cached[0] < STATUS_CACHE_TTL:
+            self.show_database_status(True, cached[1], cached[2])
+            return
+
+        task = DatabaseVersionTask(connection_name)
+        task.taskCompleted.connect(partial(self.on_status_checked, task, True))
+        task.taskTerminated.connect(partial(self.on_status_checked, task, False))
+        # Keep a reference to the running task, a previous one is left to
+        # finish and fill the cache
+        self.version_task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def on_status_checked(self, task: DatabaseVersionTask, success: bool):
+        """Show the database version read by the task, if it is still the expected one"""
+        if success:
+            self.version_cache[task.connection_name] = (time.monotonic(), task.version, task.description)
+        if task is not self.version_task:
+            return
+        self.version_task = None
+        if task.connection_name != get_connection_name(self.project):
+            return
+        self.show_database_status(True, task.version, task.description)
+
+    def set_status(self, comment: str, stylesheet: str):
+        self.version_comment.setText(comment)
+        self.version_comment.setStyleSheet(stylesheet)
+
+    def show_database_status(self, connection_exists: bool, db_version: Optional[int], description: str):
+        """Show the database version and its status"""
+        if db_version:
+            self.database_version.setText(str(db_version))
+            self.database_version.setToolTip(description)
+        self.set_status(*self.check_database_status(connection_exists, db_version))
+
+    @staticmethod
+    def check_database_status(connection_exists: bool, db_version_integer: Optional[int]) -> tuple[str, str]:
         """Compare the plugin version versus the database version."""
         # First check, if there isn't any connection set.
         if not connection_exists:
@@ -147,8 +274,6 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
             version_stylesheet = "font-weight: bold; color: orange;"
             return version_comment, version_stylesheet
 
-        db_version_integer = self.check_database_version()
-
         # Second check, if no metadata table has been found.
         if not db_version_integer:
             version_comment = tr(
@@ -157,8 +282,6 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
             version_stylesheet = "font-weight: bold; color: orange;"
             return version_comment, version_stylesheet
 
-        self.database_version.setText(str(db_version_integer))
-
         # Third check, if the database is in front of the plugin for their versions.
         if db_version_integer > schema_version():
             version_comment = tr(
@@ -184,6 +307,67 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
         version_stylesheet = "font-weight: bold; color: green;"
         return version_comment, version_stylesheet
 
+    def refresh_statistics(self):
+        """Read the statistics of the tables in a background task"""
+        if self.statistics_task is not None:
+            return
+        self.button_refresh_statistics.setEnabled(False)
+        self.statistics_comment.setText(tr("Reading the table statistics…"))
+
+        task = TableStatisticsTask(get_connection_name(self.project))
+        task.taskCompleted.connect(partial(self.on_statistics_read, task))
+        task.taskTerminated.connect(partial(self.on_statistics_read, task))
+        self.statistics_task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def on_statistics_read(self, task: TableStatisticsTask):
+        """Show the statistics read by the task"""
+        self.statistics_task = None
+        connection_name = get_connection_name(self.project)
+        self.button_refresh_statistics.setEnabled(connection_name in get_postgis_connection_list())
+        if task.connection_name != connection_name:
+            return
+        if task.error:
+            self.statistics_comment.setText(task.error)
+            return
+
+        warning = QColor("orange")
+        table = self.table_statistics
+        # Sorting while filling would move the rows
+        table.setSortingEnabled(False)
+        table.setRowCount(len(task.statistics))
+        for row, stats in enumerate(task.statistics):
+            name = QTableWidgetItem(f"{stats.schema}.{stats.table}")
+            rows = QTableWidgetItem()
+            if stats.analyzed:
+                rows.setData(Qt.DisplayRole, stats.rows)
+            else:
+                rows.setText(tr("never analyzed"))
+                rows.setForeground(warning)
+            if stats.bloated:
+                name.setForeground(warning)
+                name.setToolTip(tr(f"{stats.dead_rows} dead rows, the table needs a vacuum"))
+            items = (
+                name,
+                rows,
+                QTableWidgetItem(stats.size),
+                QTableWidgetItem(stats.index_size),
+                QTableWidgetItem(stats.last_vacuum or ""),
+                QTableWidgetItem(stats.last_analyze or ""),
+            )
+            for column, item in enumerate(items):
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+
+        never = sum(1 for stats in task.statistics if not stats.analyzed)
+        bloated = sum(1 for stats in task.statistics if stats.bloated)
+        self.statistics_comment.setText(
+            tr(
+                f"{len(task.statistics)} tables, {never} never analyzed, "
+                f"{bloated} with many dead rows. Row counts are estimates."
+            )
+        )
+
     def run_algorithm(self, name):
         if name not in self.algorithms:
             self.iface.messageBar().pushMessage(
@@ -196,9 +380,12 @@ class PluginDockWidget(QtWidgets.QDockWidget, FORM_CLASS):  # type: ignore [misc
         alg_name = f"{provider_id()}:{name}"
         execAlgorithmDialog(alg_name, param)
         if name in ("create_database_structure", "upgrade_database_structure"):
+            # The structure may have changed
+            self.version_cache.clear()
             self.set_information_from_project()
 
     def closeEvent(self, event):
+        self.status_timer.stop()
         self.closingPlugin.emit()
         event.accept()
 
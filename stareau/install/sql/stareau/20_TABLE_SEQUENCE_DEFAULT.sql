@@ -85,6 +85,18 @@ CREATE SEQUENCE stareau.test_id_seq
 ALTER SEQUENCE stareau.test_id_seq OWNED BY stareau.test.id;
 
 
+-- topology_build
+CREATE TABLE stareau.topology_build (
+    table_name text NOT NULL,
+    tolerance double precision NOT NULL,
+    built_at timestamp without time zone NOT NULL
+);
+
+
+-- topology_build
+COMMENT ON TABLE stareau.topology_build IS 'Last topology build of the pipe tables';
+
+
 -- test id
 ALTER TABLE ONLY stareau.test ALTER COLUMN id SET DEFAULT nextval('stareau.test_id_seq'::regclass);
 
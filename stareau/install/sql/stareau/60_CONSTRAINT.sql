@@ -32,6 +32,11 @@ ALTER TABLE ONLY stareau.test
     ADD CONSTRAINT test_pkey PRIMARY KEY (id);
 
 
+-- topology_build topology_build_pkey
+ALTER TABLE ONLY stareau.topology_build
+    ADD CONSTRAINT topology_build_pkey PRIMARY KEY (table_name);
+
+
 --
 -- PostgreSQL database dump complete
 --
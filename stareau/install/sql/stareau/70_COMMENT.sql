@@ -31,6 +31,10 @@ COMMENT ON TABLE stareau.metadata IS 'Metadata of the structure : version and da
 COMMENT ON TABLE stareau.test IS 'Test table';
 
 
+-- topology_build
+COMMENT ON TABLE stareau.topology_build IS 'Last topology build of the pipe tables';
+
+
 --
 -- PostgreSQL database dump complete
 --
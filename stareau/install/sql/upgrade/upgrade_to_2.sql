@@ -0,0 +1,49 @@
+-- Last topology build of the pipe tables
+CREATE TABLE IF NOT EXISTS stareau.topology_build (
+    table_name text NOT NULL,
+    tolerance double precision NOT NULL,
+    built_at timestamp without time zone NOT NULL,
+    CONSTRAINT topology_build_pkey PRIMARY KEY (table_name)
+);
+COMMENT ON TABLE stareau.topology_build IS 'Last topology build of the pipe tables';
+
+-- Spatial indexes of the network tables, created by the install since version 2
+-- The indexes of the parent tables are not inherited: the tables of the
+-- network elements need their own one, for the topology build
+-- They are built concurrently, after the upgrade transaction, so that the
+-- edition of the network tables is not blocked meanwhile
+
+-- phase: concurrent
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_canalisation_geom ON stareau_aep.aep_canalisation USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_canalisation_branchement_geom ON stareau_aep_brcht.aep_canalisation_branchement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_canalisation_geom ON stareau_ass.ass_canalisation USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_ouvrage_special_ligne_geom ON stareau_ass.ass_ouvrage_special_ligne USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_canalisation_branchement_geom ON stareau_ass_brcht.ass_canalisation_branchement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_engouffrement_ligne_geom ON stareau_ass_brcht.ass_engouffrement_ligne USING gist (geom);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_appareillage_geom ON stareau_aep.aep_appareillage USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_captage_geom ON stareau_aep.aep_captage USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_piece_geom ON stareau_aep.aep_piece USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_point_mesure_geom ON stareau_aep.aep_point_mesure USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_pompage_geom ON stareau_aep.aep_pompage USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_regulation_geom ON stareau_aep.aep_regulation USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_reservoir_geom ON stareau_aep.aep_reservoir USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_traitement_geom ON stareau_aep.aep_traitement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_vanne_geom ON stareau_aep.aep_vanne USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_piece_branchement_geom ON stareau_aep_brcht.aep_piece_branchement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_point_livraison_geom ON stareau_aep_brcht.aep_point_livraison USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_raccord_geom ON stareau_aep_brcht.aep_raccord USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_aep_vanne_branchement_geom ON stareau_aep_brcht.aep_vanne_branchement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_bassin_geom ON stareau_ass.ass_bassin USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_chambre_depollution_geom ON stareau_ass.ass_chambre_depollution USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_equipement_geom ON stareau_ass.ass_equipement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_exutoire_geom ON stareau_ass.ass_exutoire USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_ouvrage_special_point_geom ON stareau_ass.ass_ouvrage_special_point USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_piece_geom ON stareau_ass.ass_piece USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_pompage_geom ON stareau_ass.ass_pompage USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_pretraitement_geom ON stareau_ass.ass_pretraitement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_regard_geom ON stareau_ass.ass_regard USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_traitement_geom ON stareau_ass.ass_traitement USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_engouffrement_point_geom ON stareau_ass_brcht.ass_engouffrement_point USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_point_collecte_geom ON stareau_ass_brcht.ass_point_collecte USING gist (geom);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sidx_ass_raccord_geom ON stareau_ass_brcht.ass_raccord USING gist (geom);
@@ -7,8 +7,9 @@ from qgis.PyQt.QtWidgets import QAction
 
 from .dockwidget import PluginDockWidget
 from .plugin_tools.resources import plugin_path, resources_path
+from .processing.database.graph import graph_cache
 from .processing.provider import Provider
-from .processing.tools import plugin_name_normalized
+from .processing.tools import connection_pool, plugin_name_normalized
 
 
 class Plugin:
@@ -58,6 +59,9 @@ class Plugin:
             self.iface.pluginHelpMenu().removeAction(self.help_action)
             del self.help_action
 
+        connection_pool.close()
+        graph_cache.clear()
+
     @staticmethod
     def open_help():
         """Open the online help."""
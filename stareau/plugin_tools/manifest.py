@@ -0,0 +1,81 @@
+"""Manifest of the migration files.
+
+The manifest is generated from the `install/sql/upgrade` directory
+and shipped with the plugin, so that the migrations are known without
+listing the plugin directory, which may be zipped or read only. It
+holds, for each migration, its file, its checksum as recorded in the
+ledger, its phases and an estimated cost.
+
+It must be written again any time a migration file is changed, with
+`python3 -m stareau migration-manifest`: this module does not depend
+on QGIS.
+"""
+
+import hashlib
+import json
+import re
+
+from pathlib import Path
+
+from . import phases, resources
+from .sql import split_statements
+
+# Bump when the content of the manifest changes
+MANIFEST_FORMAT = 1
+
+# Estimated cost of the statements which scan or rewrite the tables,
+# the other statements only change the catalog and cost 1
+STATEMENT_COSTS = (
+    (
+        re.compile(
+            r"^\s*ALTER\s+TABLE\b.*\b(?:TYPE|SET\s+NOT\s+NULL|VALIDATE\s+CONSTRAINT)\b",
+            re.IGNORECASE | re.DOTALL,
+        ),
+        20,
+    ),
+    (re.compile(r"^\s*(?:UPDATE|DELETE|INSERT)\b", re.IGNORECASE), 10),
+    (re.compile(r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b", re.IGNORECASE), 10),
+    (re.compile(r"^\s*(?:VACUUM|ANALY[SZ]E|CLUSTER|REINDEX)\b", re.IGNORECASE), 10),
+)
+
+
+def statement_cost(code: str) -> int:
+    """Return the estimated cost of a statement"""
+    return next((cost for pattern, cost in STATEMENT_COSTS if pattern.match(code)), 1)
+
+
+def file_checksum(path: Path) -> str:
+    """Return the checksum of a migration file, as written in the ledger"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def migration_entry(version: int, sql_file: Path) -> dict:
+    """Return the manifest entry of a migration file"""
+    sql = sql_file.read_text()
+    sql_phases = phases.split_phases(sql)
+    statements = [code for phase_sql in sql_phases.values() for _, code in split_statements(phase_sql)]
+    return {
+        "version": version,
+        "file": sql_file.relative_to(resources.plugin_path("install", "sql")).as_posix(),
+        "checksum": file_checksum(sql_file),
+        "phases": [phase for phase, phase_sql in sql_phases.items() if phase_sql.strip()],
+        "statements": len(statements),
+        "cost": sum(statement_cost(code) for code in statements),
+    }
+
+
+def build_manifest() -> dict:
+    """Return the manifest of the migration files of the plugin directory"""
+    return {
+        "format": MANIFEST_FORMAT,
+        "migrations": [
+            migration_entry(version, sql_file) for version, sql_file in resources.scan_migrations()
+        ],
+    }
+
+
+def write_manifest(path: Path) -> dict:
+    """Write the manifest of the migration files"""
+    manifest = build_manifest()
+    path.write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
@@ -0,0 +1,74 @@
+"""Phases of the migration files.
+
+A migration file may be split in phases, with marker comments::
+
+    -- phase: transaction
+    ALTER TABLE stareau_aep.aep_canalisation ADD COLUMN ...;
+    ALTER TABLE stareau_aep.aep_canalisation ADD CONSTRAINT ... NOT VALID;
+
+    -- phase: concurrent
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS ... ON stareau_aep.aep_canalisation ...;
+
+    -- phase: validate
+    ALTER TABLE stareau_aep.aep_canalisation VALIDATE CONSTRAINT ...;
+
+The transactional phase, which is the whole file when there is no
+marker, is run in the upgrade transaction. The concurrent and validate
+phases are run after its commit, statement by statement outside of any
+transaction, so that they only take locks which do not block the edition
+of the data. They may only depend on the transactional phases, and their
+statements must be safe to run again: an interrupted upgrade resumes with
+the phases not recorded in the ledger.
+"""
+
+import re
+
+from .sql import NAME
+
+TRANSACTION = "transaction"
+CONCURRENT = "concurrent"
+VALIDATE = "validate"
+
+# Phases run after the upgrade transaction, in order
+ONLINE_PHASES = (CONCURRENT, VALIDATE)
+
+PHASE_MARKER = re.compile(r"^[ \t]*--[ \t]*phase:[ \t]*(?P<phase>\w+)[ \t]*$", re.IGNORECASE | re.MULTILINE)
+
+# Index build which may leave an invalid index when interrupted
+CONCURRENT_INDEX = re.compile(
+    r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?P<name>{NAME})\s+ON\s+(?:ONLY\s+)?(?P<table>(?:{NAME})(?:\s*\.\s*(?:{NAME}))?)",
+    re.IGNORECASE,
+)
+
+
+def split_phases(sql: str) -> dict[str, str]:
+    """Return the SQL of each phase of a migration file
+
+    The SQL before the first marker belongs to the transactional phase.
+    """
+    phases = {TRANSACTION: ""}
+    phase = TRANSACTION
+    pos = 0
+    for m in PHASE_MARKER.finditer(sql):
+        phases[phase] += sql[pos : m.start()]
+        phase = m.group("phase").lower()
+        if phase not in (TRANSACTION, *ONLINE_PHASES):
+            raise ValueError(f"Unknown migration phase '{phase}'")
+        phases.setdefault(phase, "")
+        pos = m.end()
+    phases[phase] += sql[pos:]
+    return phases
+
+
+def index_name(code: str) -> str:
+    """Return the qualified name of the index built concurrently, or an empty string
+
+    The index is created in the schema of its table.
+    """
+    m = CONCURRENT_INDEX.match(code)
+    if not m:
+        return ""
+    table = m.group("table")
+    schema = table.rpartition(".")[0].strip()
+    return f"{schema}.{m.group('name')}" if schema else m.group("name")
@@ -2,6 +2,7 @@
 
 import configparser
 import functools
+import json
 
 from importlib import resources
 from pathlib import Path
@@ -27,21 +28,51 @@ def resources_path(*args) -> Path:
     return plugin_path("resources", *args)
 
 
-@functools.cache
-def available_migrations(minimum_version: int = 0) -> Sequence[tuple[int, Path]]:
-    """Get all the upgrade SQL files since the provided version."""
+# Manifest of the migrations, in the install directory
+MIGRATIONS_MANIFEST = "migrations.json"
+
+
+def scan_migrations() -> Sequence[tuple[int, Path]]:
+    """List the upgrade SQL files of the plugin directory, sorted by version."""
     upgrade_dir = plugin_path("install", "sql", "upgrade")
 
     def files() -> Iterator[tuple[int, Path]]:
         for sql_file in upgrade_dir.glob("*.sql"):
             if sql_file.name.startswith("upgrade_to_"):
                 version = int(sql_file.stem.removeprefix("upgrade_to_"))
-                if version > minimum_version:
-                    yield (version, sql_file)
+                yield (version, sql_file)
 
     return tuple(s for s in sorted(files(), key=lambda item: item[0]))  # type: ignore [call-overload]
 
 
+@functools.cache
+def migration_manifest() -> dict[int, dict]:
+    """Read the manifest of the migrations, by version in order.
+
+    Without manifest, the upgrade SQL files are listed, with their
+    version and file only.
+    """
+    path = plugin_path("install", MIGRATIONS_MANIFEST)
+    try:
+        manifest = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {
+            version: {"version": version, "file": f"upgrade/{sql_file.name}"}
+            for version, sql_file in scan_migrations()
+        }
+    return {entry["version"]: entry for entry in manifest["migrations"]}
+
+
+def available_migrations(minimum_version: int = 0) -> Sequence[tuple[int, Path]]:
+    """Get all the upgrade SQL files since the provided version."""
+    sql_dir = plugin_path("install", "sql")
+    return tuple(
+        (entry["version"], sql_dir.joinpath(entry["file"]))
+        for entry in migration_manifest().values()
+        if entry["version"] > minimum_version
+    )
+
+
 def latest_upgrade() -> Optional[tuple[int, Path]]:
     """Get the latest install version from which to upgrade"""
     versions = available_migrations()
@@ -0,0 +1,62 @@
+"""Tokens and statements of the plugin SQL scripts.
+
+This module does not depend on QGIS, so that the scripts may be
+analyzed from the command line.
+"""
+
+import re
+
+from typing import Iterator
+
+NAME = r'"(?:[^"]|"")*"|[A-Za-z_][\w$]*'
+
+TOKENS = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<dollar>\$(?P<tag>[A-Za-z_]\w*)?\$)
+    | (?P<string>'(?:[^']|'')*')
+    | (?P<quoted>"(?:[^"]|"")*")
+    | (?P<srid>,\s*(?P<srid_value>\d+)\s*\))
+    | (?P<word>[A-Za-z_][\w$]*)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+
+def split_statements(sql: str) -> Iterator[tuple[str, str]]:
+    """Iterate over the (sql, code) statements of a script
+
+    `code` is the statement without comments, used for the analysis.
+    Semicolons in literals, quoted identifiers and dollar quoted bodies
+    do not end a statement.
+    """
+    start = pos = 0
+    code: list[str] = []
+    while True:
+        m = TOKENS.search(sql, pos)
+        end = m.start() if m else len(sql)
+        semicolon = sql.find(";", pos, end)
+        if semicolon != -1:
+            code.append(sql[pos:semicolon])
+            statement = sql[start:semicolon].strip()
+            if "".join(code).strip():
+                yield statement, "".join(code)
+            code = []
+            start = pos = semicolon + 1
+            continue
+        if not m:
+            break
+
+        code.append(sql[pos:end])
+        pos = m.end()
+        if m.lastgroup == "comment":
+            code.append(" ")
+            continue
+        if m.lastgroup == "dollar":
+            closing = sql.find(m.group(0), pos)
+            pos = len(sql) if closing == -1 else closing + len(m.group(0))
+        code.append(sql[m.start() : pos])
+
+    code.append(sql[pos:])
+    if "".join(code).strip():
+        yield sql[start:].strip(), "".join(code)
@@ -1,16 +1,21 @@
+from pathlib import Path
+
 from qgis.core import (
     QgsProcessingException,
     QgsProcessingOutputNumber,
     QgsProcessingOutputString,
     QgsProcessingParameterFileDestination,
     QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
     QgsProject,
 )
 
 from ..plugin_tools.i18n import tr
+from ..plugin_tools.resources import schema_name
 from .base_algorithm import BaseProcessingAlgorithm
+from .database import project
 from .tools import (
-    createAdministrationProjectFromTemplate,
+    connection_registry,
     get_connection_name,
     get_postgis_connection_list,
     plugin_name_normalized,
@@ -19,6 +24,7 @@ from .tools import (
 
 class CreateDatabaseLocalInterface(BaseProcessingAlgorithm):
     CONNECTION_NAME = "CONNECTION_NAME"
+    SCHEMA = "SCHEMA"
     PROJECT_FILE = "PROJECT_FILE"
 
     OUTPUT_STATUS = "OUTPUT_STATUS"
@@ -46,9 +52,16 @@ class CreateDatabaseLocalInterface(BaseProcessingAlgorithm):
             "to create the needed data by using QGIS editing capabilities"
             "\n"
             "\n"
+            "The layers are read from the database catalog. Their primary key, "
+            "geometry type, SRID and estimated extent are stored in the project, "
+            "so that QGIS does not have to read them from each table when the project is opened."
+            "\n"
+            "\n"
             "* PostgreSQL connection to database: name of the database connection "
             "you would like to use for the new QGIS project."
             "\n"
+            "* Schema name: the schema where the plugin structure has been installed."
+            "\n"
             "* QGIS project file to create: choose the output file destination."
         )
         return short_help
@@ -69,6 +82,14 @@ class CreateDatabaseLocalInterface(BaseProcessingAlgorithm):
         param.setHelp(tr("The database where the plugin schema has been installed."))
         self.addParameter(param)
 
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=schema_name(),
+            ),
+        )
+
         # target project file
         self.addParameter(
             QgsProcessingParameterFileDestination(
@@ -106,12 +127,25 @@ class CreateDatabaseLocalInterface(BaseProcessingAlgorithm):
     def processAlgorithm(self, parameters, context, feedback):
         # Database connection parameters
         connection_name = parameters[self.CONNECTION_NAME]
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
 
-        # Write the file out again
-        project_file = self.parameterAsString(parameters, self.PROJECT_FILE, context)
-        if not createAdministrationProjectFromTemplate(connection_name, project_file):
+        connection = connection_registry.find(connection_name)
+        if not connection:
             raise QgsProcessingException(f"Connection {connection_name} not found")
 
+        project_file = self.parameterAsString(parameters, self.PROJECT_FILE, context)
+        layers = project.create_administration_project(
+            Path(project_file),
+            connection,
+            connection_name,
+            schema,
+        )
+        if not layers:
+            feedback.reportError(tr(f"No table found in the schema {schema}"))
+        feedback.pushInfo(
+            tr(f"{len(layers)} layers, {sum(1 for layer in layers if layer.extent)} with a stored extent")
+        )
+
         msg = tr("QGIS Administration project has been successfully created from database connection")
         msg += ": {}".format(connection_name)
         feedback.pushInfo(msg)
@@ -1,2 +1,9 @@
+from .alg_batch import CreateDatabaseBatch
+from .alg_check import CheckDatabaseStructure
 from .alg_create import CreateDatabaseStructure
+from .alg_fleet import UpgradeDatabaseFleet
+from .alg_import import ImportNetworkData
+from .alg_template import CreateDatabaseFromTemplate
+from .alg_topology import BuildNetworkTopology
+from .alg_trace import TraceConnected, TraceDownstream, TraceUpstream
 from .alg_upgrade import UpgradeDatabaseStructure
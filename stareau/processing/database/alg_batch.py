@@ -0,0 +1,168 @@
+from pathlib import Path
+
+from qgis.core import (
+    QgsProcessingContext,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterMatrix,
+    QgsProcessingParameterNumber,
+)
+
+from . import batch
+from .base import BaseDatabaseAlgorithm, i18n
+
+# Shorcut
+tr = i18n.tr
+
+
+class CreateDatabaseBatch(BaseDatabaseAlgorithm):
+    """
+    Install the plugin structure on many targets at once
+    """
+
+    TARGETS = "TARGETS"
+    TARGETS_FILE = "TARGETS_FILE"
+    OVERRIDE = "OVERRIDE"
+    WORKERS = "WORKERS"
+    SINGLE_TRANSACTION = "SINGLE_TRANSACTION"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_FAILED = "OUTPUT_FAILED"
+
+    def name(self):
+        return "create_database_batch"
+
+    def displayName(self):
+        return tr("Create database structure on many targets")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Install the plugin database structure on a list of targets, several "
+            "targets at once."
+            "\n"
+            "\n"
+            "* Targets: one row per target, with the name of a PostgreSQL connection "
+            "(or a connection string such as service=name), the schema name and the SRID. "
+            "Empty schema and SRID take the default values."
+            "\n"
+            "* Targets file: the same as a CSV file, with an optional "
+            "connection,schema,srid header."
+            "\n"
+            "\n"
+            "A failed target does not stop the others: the summary lists the "
+            "result of each target."
+            "\n"
+            "\n"
+            'Beware ! If you check the "override" checkboxes, you will loose '
+            "all existing data in the existing schemas !"
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        self.addParameter(
+            QgsProcessingParameterMatrix(
+                self.TARGETS,
+                tr("Targets"),
+                headers=[tr("Connection"), tr("Schema"), tr("SRID")],
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.TARGETS_FILE,
+                tr("Targets file (CSV)"),
+                extension="csv",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.OVERRIDE,
+                tr(
+                    "Overwrite the database schemas and all data ? "
+                    "** CAUTION ** It will remove all existing data !"
+                ),
+                defaultValue=False,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.WORKERS,
+                tr("Number of targets installed at once"),
+                type=QgsProcessingParameterNumber.Integer,
+                defaultValue=4,
+                minValue=1,
+                maxValue=64,
+            )
+        )
+
+        param = QgsProcessingParameterBoolean(
+            self.SINGLE_TRANSACTION,
+            tr("Run each install as a single transaction"),
+            defaultValue=True,
+        )
+        param.setHelp(tr("A failed target is then left without any partial structure."))
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_FAILED, tr("Number of failed targets")))
+
+    def targets(self, parameters: dict, context: QgsProcessingContext) -> list[batch.Target]:
+        matrix = self.parameterAsMatrix(parameters, self.TARGETS, context)
+        columns = len(batch.TARGET_HEADERS)
+        rows = [matrix[i : i + columns] for i in range(0, len(matrix), columns)]
+        targets = batch.parse_targets(rows)
+
+        targets_file = self.parameterAsFile(parameters, self.TARGETS_FILE, context)
+        if targets_file:
+            targets.extend(batch.read_targets(Path(targets_file)))
+        return targets
+
+    def checkParameterValues(self, parameters, context):
+        try:
+            targets = self.targets(parameters, context)
+        except (OSError, ValueError) as e:
+            return False, tr(f"Invalid targets: {e}")
+
+        if not targets:
+            return False, tr("At least one target is required")
+
+        names = [str(t) for t in targets]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            return False, tr(f"Duplicated targets: {', '.join(sorted(duplicates))}")
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        targets = self.targets(parameters, context)
+        override = self.parameterAsBool(parameters, self.OVERRIDE, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context)
+        single_transaction = self.parameterAsBool(parameters, self.SINGLE_TRANSACTION, context)
+
+        feedback.pushInfo(tr(f"Installing {len(targets)} targets, {workers} at once…"))
+        results = batch.run_batch(
+            targets,
+            workers=workers,
+            override=override,
+            feedback=feedback,
+            single_transaction=single_transaction,
+        )
+
+        msg = batch.summary(results)
+        feedback.pushInfo(msg)
+        failed = sum(1 for result in results if not result.success)
+
+        return {
+            self.OUTPUT_STATUS: 0 if failed else 1,
+            self.OUTPUT_FAILED: failed,
+            self.OUTPUT_STRING: msg,
+        }
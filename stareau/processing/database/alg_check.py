@@ -0,0 +1,195 @@
+import json
+
+from pathlib import Path
+
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterCrs,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
+    QgsProject,
+    QgsProviderConnectionException,
+)
+
+from ..tools import get_connection_name
+from . import drift, install, timing
+from .base import BaseDatabaseAlgorithm, i18n, resources
+
+# Shorcut
+tr = i18n.tr
+
+# Number of differences written in the log, all of them are in the report
+MAX_LISTED = 50
+
+
+class CheckDatabaseStructure(BaseDatabaseAlgorithm):
+    """
+    Compare the database structure with the structure installed by the plugin
+    """
+
+    CONNECTION_NAME = "CONNECTION_NAME"
+    SCHEMA = "SCHEMA"
+    CRS = "CRS"
+    MODEL = "MODEL"
+    REPORT = "REPORT"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_DIFFERENCES = "OUTPUT_DIFFERENCES"
+
+    def name(self):
+        return "check_database_structure"
+
+    def displayName(self):
+        return tr("Check database structure")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Check that the database structure still matches the one installed by the plugin."
+            "\n"
+            "\n"
+            "The tables, columns, inheritance, indexes, constraints and comments of all the "
+            "schemas of the structure are read at once, and compared with the model of the "
+            "structure shipped with the plugin."
+            "\n"
+            "\n"
+            "* Missing: the object is installed by the plugin but not found in the database."
+            "\n"
+            "* Unexpected: the object is found in the database only."
+            "\n"
+            "* Changed: the definition of the object is not the expected one."
+            "\n"
+            "\n"
+            "Nothing is changed in the database."
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        project = QgsProject.instance()
+        connection_name = get_connection_name(project)
+        param = QgsProcessingParameterProviderConnection(
+            self.CONNECTION_NAME,
+            tr("Connection to the PostgreSQL database"),
+            "postgres",
+            defaultValue=connection_name,
+            optional=False,
+        )
+        param.setHelp(tr("The database where the schema is installed."))
+        self.addParameter(param)
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=resources.schema_name(),
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterCrs(
+                self.CRS,
+                tr("Geometry CRS"),
+                defaultValue=f"EPSG:{resources.srid_value()}",
+                optional=False,
+            )
+        )
+
+        param = QgsProcessingParameterFile(
+            self.MODEL,
+            tr("Structure model"),
+            extension="json",
+            optional=True,
+        )
+        param.setHelp(tr("Model of the structure to compare with, the one of the plugin by default."))
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.REPORT,
+            tr("Differences"),
+            fileFilter="JSON (*.json)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(tr("JSON file with all the differences and the time spent reading the catalog."))
+        self.addParameter(param)
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_DIFFERENCES, tr("Number of differences")))
+
+    def checkParameterValues(self, parameters, context):
+        model = self.parameterAsFile(parameters, self.MODEL, context)
+        if not model and not drift.model_path().exists():
+            return False, tr("The plugin is shipped without the structure model: a model file must be given")
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        srid = int(self.parameterAsCrs(parameters, self.CRS, context).authid().replace("EPSG:", ""))
+        model_file = self.parameterAsFile(parameters, self.MODEL, context)
+        report_path = self.parameterAsFileOutput(parameters, self.REPORT, context)
+
+        connection = self.find_connection(connection_name)
+        model = drift.read_model(Path(model_file) if model_file else drift.model_path())
+
+        try:
+            result = connection.executeSql(install.installed_version_sql(schema))
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        db_version = int(result[0][0]) if result else None
+        if db_version != model["version"]:
+            feedback.reportError(
+                tr(
+                    f"The database version {db_version} is not the version {model['version']} of the "
+                    "model: some differences may come from the migrations."
+                )
+            )
+
+        report = timing.TimingReport()
+        actual = drift.snapshot(connection, schema, report)
+        with report.measure("compare", "model"):
+            differences = drift.compare(drift.expected_objects(model, schema, srid), actual)
+
+        count = sum(len(objects) for objects in actual.values())
+        seconds = sum(entry["seconds"] for entry in report.entries if entry["kind"] == "query")
+        feedback.pushInfo(
+            tr(f"{count} objects read with {len(drift.SNAPSHOT_QUERIES)} catalog queries in {seconds:.2f}s.")
+        )
+        for difference in differences[:MAX_LISTED]:
+            feedback.pushInfo(f"* {difference}")
+        if len(differences) > MAX_LISTED:
+            feedback.pushInfo(tr(f"… and {len(differences) - MAX_LISTED} more differences"))
+
+        if report_path:
+            Path(report_path).write_text(
+                json.dumps(
+                    {
+                        "schema": schema,
+                        "version": db_version,
+                        "model_version": model["version"],
+                        "timing": report.entries,
+                        "differences": [{"status": d.status, **vars(d)} for d in differences],
+                    },
+                    indent=2,
+                    ensure_ascii=False,
+                )
+            )
+
+        if differences:
+            msg = tr(f"The database structure differs from the model: {len(differences)} differences.")
+        else:
+            msg = tr("The database structure matches the model.")
+        return {
+            self.REPORT: report_path,
+            self.OUTPUT_STATUS: 0 if differences else 1,
+            self.OUTPUT_DIFFERENCES: len(differences),
+            self.OUTPUT_STRING: msg,
+        }
@@ -1,22 +1,37 @@
+import contextlib
+import time
 
-import csv
 from pathlib import Path
+from typing import Optional, Sequence
 
 from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsDataSourceUri,
+    QgsProcessingContext,
     QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingOutputNumber,
     QgsProcessingOutputString,
     QgsProcessingParameterBoolean,
     QgsProcessingParameterCrs,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterNumber,
     QgsProcessingParameterProviderConnection,
     QgsProcessingParameterString,
     QgsProject,
     QgsProviderConnectionException,
-    QgsProviderRegistry,
 )
 
-from ..tools import get_connection_name
+from ..tools import (
+    connection_registry,
+    get_connection_name,
+    pooled_connection,
+    psycopg_connection,
+    psycopg_module,
+)
+from . import deferred, glossary, install, parallel, rewrite, timing
 from .base import BaseDatabaseAlgorithm, i18n, resources
 
 # Shorcut
@@ -32,6 +47,15 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
     OVERRIDE = "OVERRIDE"
     SCHEMA = "SCHEMA"
     CRS = 'CRS'
+    SINGLE_TRANSACTION = "SINGLE_TRANSACTION"
+    COPY_GLOSSARIES = "COPY_GLOSSARIES"
+    WORKERS = "WORKERS"
+    TIMING_REPORT = "TIMING_REPORT"
+    DEFER_INDEXES = "DEFER_INDEXES"
+    DATA_FILE = "DATA_FILE"
+    DATA_DIRECTORY = "DATA_DIRECTORY"
+    RESET = "RESET"
+    RENDER_FILE = "RENDER_FILE"
 
     OUTPUT_STATUS = "OUTPUT_STATUS"
     OUTPUT_STRING = "OUTPUT_STRING"
@@ -85,6 +109,21 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
             )
         )
 
+        param = QgsProcessingParameterBoolean(
+            self.RESET,
+            tr("Only empty the tables if the structure is up to date"),
+            defaultValue=False,
+        )
+        param.setHelp(
+            tr(
+                "With the overwrite option: if the installed version is the plugin one, "
+                "the data tables are truncated and the glossaries are kept, instead of "
+                "rebuilding the whole structure."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
         self.addParameter(
             QgsProcessingParameterString(
                 self.SCHEMA,
@@ -101,6 +140,130 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
             )
         )
 
+        param = QgsProcessingParameterBoolean(
+            self.SINGLE_TRANSACTION,
+            tr("Run the install as a single transaction"),
+            defaultValue=False,
+        )
+        param.setHelp(
+            tr(
+                "Send the whole install (structure, glossaries and metadata) as one script "
+                "in a single round-trip. Nothing is installed if an error occurs."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterBoolean(
+            self.COPY_GLOSSARIES,
+            tr("Load the glossaries with COPY"),
+            defaultValue=False,
+        )
+        param.setHelp(
+            tr(
+                "Stream the glossary CSV files to the database with COPY, all glossaries "
+                "in one transaction. Requires the python module 'psycopg'."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterNumber(
+            self.WORKERS,
+            tr("Number of database connections"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=1,
+            minValue=1,
+            maxValue=32,
+        )
+        param.setHelp(
+            tr(
+                "Run the independent install statements in parallel on this number of "
+                "connections. With 1, statements are run in strict order. "
+                "Requires the python module 'psycopg'."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterBoolean(
+            self.DEFER_INDEXES,
+            tr("Build the indexes and constraints after loading the data"),
+            defaultValue=False,
+        )
+        param.setHelp(
+            tr(
+                "Create bare tables first, then load the data, then build all the indexes "
+                "and constraints in a final phase, in parallel with several connections. "
+                "Requires the python module 'psycopg'."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFile(
+            self.DATA_FILE,
+            tr("Data to load before building the indexes (SQL file or pg_dump archive)"),
+            behavior=QgsProcessingParameterFile.File,
+            optional=True,
+        )
+        param.setHelp(
+            tr(
+                "A SQL file is run with psql, a pg_dump archive is restored with "
+                "pg_restore --data-only."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFile(
+            self.DATA_DIRECTORY,
+            tr("Data to load before building the indexes (directory)"),
+            behavior=QgsProcessingParameterFile.Folder,
+            optional=True,
+        )
+        param.setHelp(
+            tr(
+                "A pg_dump directory archive, or a directory of CSV files with a header "
+                "named schema.table.csv."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.TIMING_REPORT,
+            tr("Timing report"),
+            fileFilter="JSON (*.json)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(
+            tr(
+                "JSON file with the time spent in each file, statement and glossary. "
+                "Statements are then run one by one, which requires the python module 'psycopg'."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.RENDER_FILE,
+            tr("Only write the install script to a file"),
+            fileFilter="SQL (*.sql)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(
+            tr(
+                "The whole install script, adapted to the schema and the SRID, is written to "
+                "the file instead of being run: nothing is done on the database. The script "
+                "can then be run with psql --single-transaction."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
         # OUTPUTS
         # Add output for status (integer) and message (string)
         self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
@@ -108,15 +271,41 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
         self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_VERSION, tr("Output version")))
 
     def checkParameterValues(self, parameters, context):
-        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
         connection_name = self.parameterAsConnectionName(
             parameters,
             self.CONNECTION_NAME,
             context,
         )
-        connection = metadata.findConnection(connection_name)
+        connection = connection_registry.find(connection_name)
         override = self.parameterAsBoolean(parameters, self.OVERRIDE, context)
         schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        single_transaction = self.parameterAsBool(parameters, self.SINGLE_TRANSACTION, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context)
+
+        defer_indexes = self.parameterAsBool(parameters, self.DEFER_INDEXES, context)
+        data_sources = self.data_sources(parameters, context)
+
+        if single_transaction and workers > 1:
+            msg = tr("A single transaction install cannot be run on several connections")
+            return False, msg
+
+        if single_transaction and defer_indexes:
+            msg = tr("A single transaction install cannot build the indexes after the data load")
+            return False, msg
+
+        if self.parameterAsBool(parameters, self.RESET, context) and not override:
+            msg = tr("The tables can only be emptied with the overwrite option")
+            return False, msg
+
+        if data_sources and not defer_indexes:
+            msg = tr("Data can only be loaded when the indexes are built after the data load")
+            return False, msg
+
+        if self.parameterAsFileOutput(parameters, self.RENDER_FILE, context):
+            if data_sources:
+                return False, tr("Data cannot be loaded when the install script is only written")
+            # Nothing is done on the database
+            return super(CreateDatabaseStructure, self).checkParameterValues(parameters, context)
 
         if schema in connection.schemas() and not override:
             msg = tr(
@@ -128,6 +317,14 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
 
         return super(CreateDatabaseStructure, self).checkParameterValues(parameters, context)
 
+    def data_sources(self, parameters: dict, context: QgsProcessingContext) -> list[Path]:
+        """Return the data to load in the bare tables"""
+        sources = (
+            self.parameterAsFile(parameters, self.DATA_FILE, context),
+            self.parameterAsFile(parameters, self.DATA_DIRECTORY, context),
+        )
+        return [Path(source) for source in sources if source]
+
     @staticmethod
     def create_database(
         connection_name: str,
@@ -138,146 +335,397 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
         override: bool,
         install_dir: Path,
         feedback: QgsProcessingFeedback,
+        single_transaction: bool = False,
+        copy_glossaries: bool = False,
+        workers: int = 1,
+        report: Optional[timing.TimingReport] = None,
+        defer_indexes: bool = False,
+        data_sources: Sequence[Path] = (),
+        reset: bool = False,
     ):
-        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
-        connection = metadata.findConnection(connection_name)
-        if not connection:
-            raise QgsProcessingException(f"La connexion {connection_name} n'existe pas.")
-
-        # Drop schema if needed
-        if override:
-            feedback.pushInfo(tr(f"Trying to drop schema {schema}…"))
-            sql = (
-                f"DROP SCHEMA IF EXISTS {schema}_defense_incendie CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_aep_brcht CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_aep CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_ass_brcht CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_ass CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_principale CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_commun CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema}_valeur CASCADE;\n"
-                f"DROP SCHEMA IF EXISTS {schema} CASCADE;\n"
-                f"DROP DOMAIN IF EXISTS {schema}.c_insee;\n"
-                f"DROP DOMAIN IF EXISTS {schema}.c_annee;"
+        connection = CreateDatabaseStructure.find_connection(connection_name)
+        if override and reset and CreateDatabaseStructure.reset_data(connection, schema, version, feedback):
+            return
+
+        CreateDatabaseStructure.install_structure(
+            connection,
+            schema,
+            srid,
+            version=version,
+            override=override,
+            install_dir=install_dir,
+            feedback=feedback,
+            single_transaction=single_transaction,
+            copy_glossaries=copy_glossaries,
+            workers=workers,
+            report=report,
+            defer_indexes=defer_indexes,
+            data_sources=data_sources,
+        )
+
+    @staticmethod
+    def reset_data(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        version: int,
+        feedback: QgsProcessingFeedback,
+    ) -> bool:
+        """Empty the data tables if the installed structure has the given version
+
+        Return False, without changing anything, if the structure is missing
+        or has another version.
+        """
+        try:
+            installed = connection.executeSql(f"SELECT to_regclass('{schema}.metadata') IS NOT NULL")
+            if installed and installed[0][0]:
+                installed = connection.executeSql(install.installed_version_sql(schema))
+            else:
+                installed = []
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+
+        installed_version = installed[0][0] if installed and installed[0] else None
+        if str(installed_version) != str(version):
+            feedback.pushInfo(
+                tr(
+                    f"Installed version '{installed_version}' is not '{version}': "
+                    "the structure is rebuilt."
+                )
             )
-            try:
-                connection.executeSql(sql)
-            except QgsProviderConnectionException as e:
-                raise QgsProcessingException(str(e))
-            feedback.pushInfo("  Success !")
-
-        # Create full structure
-        # SCHEMA is used in the path even if the target schema is not the same
-        plugin_schema_name = resources.schema_name()
-        plugin_srid = resources.srid_value()
-        sql_files = [
-            "00_initialize_database.sql",
-            "StaR-Eau/00-creation schemas.sql",
-            "StaR-Eau/01-creation domaines.sql",
-            "StaR-Eau/02-creation tables principales.sql",
-            "StaR-Eau/03-creation tables communes.sql",
-            "StaR-Eau/04-creation assainissement.sql",
-            "StaR-Eau/05-creation branchement assainissement.sql",
-            "StaR-Eau/06-creation eau potable.sql",
-            "StaR-Eau/07-creation branchement eau potable.sql",
-            "StaR-Eau/08-creation gestion pei.sql",
-            "StaR-Eau/09-creation table valeur.sql",
-            "StaR-Eau/10-creation_com_materiau.sql",
-            f"{plugin_schema_name}/10_FUNCTION.sql",
-            f"{plugin_schema_name}/20_TABLE_SEQUENCE_DEFAULT.sql",
-            f"{plugin_schema_name}/30_VIEW.sql",
-            f"{plugin_schema_name}/40_INDEX.sql",
-            f"{plugin_schema_name}/50_TRIGGER.sql",
-            f"{plugin_schema_name}/60_CONSTRAINT.sql",
-            f"{plugin_schema_name}/70_COMMENT.sql",
-            f"{plugin_schema_name}/90_GLOSSARY.sql",
-            "99_finalize_database.sql",
-        ]
-
-        # Loop sql files and run SQL code
-        for sf in sql_files:
-            feedback.pushInfo(sf)
-            sql_file = install_dir.joinpath("sql", sf)
-            with open(sql_file, "r") as f:
-                sql = f.read()
-                if len(sql.strip()) == 0:
-                    feedback.pushInfo("  Skipped (empty file)")
-                    continue
+            return False
 
-                # Replace default SCHEMA by user defined one
-                # Useful when the SQL calls functions or objects
-                # prefixed by the schema
-                if schema != plugin_schema_name:
-                    sql = sql.replace(f"{plugin_schema_name}_", f"{schema}_")
-                    sql = sql.replace(f"{plugin_schema_name}.", f"{schema}.")
-                    sql = sql.replace(f" {plugin_schema_name};", f" {schema};")
+        start = time.perf_counter()
+        try:
+            tables = [row[0] for row in connection.executeSql(install.data_tables_sql(schema))]
+            if tables:
+                connection.executeSql(install.truncate_sql(tables))
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
 
-                if srid != plugin_srid:
-                    sql = sql.replace(f", {plugin_srid})", f", {srid})")
+        feedback.pushInfo(
+            tr(
+                f"Structure version '{version}' is up to date: {len(tables)} tables "
+                f"emptied in {time.perf_counter() - start:.2f}s, glossaries kept."
+            )
+        )
+        return True
 
+    @staticmethod
+    def install_structure(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        srid: int,
+        *,
+        version: int,
+        override: bool,
+        install_dir: Path,
+        feedback: QgsProcessingFeedback,
+        single_transaction: bool = False,
+        copy_glossaries: bool = False,
+        workers: int = 1,
+        report: Optional[timing.TimingReport] = None,
+        defer_indexes: bool = False,
+        data_sources: Sequence[Path] = (),
+    ):
+        """Install the structure with the given connection
+
+        The time spent in each file and glossary is added to the report,
+        and the time of each statement if the report asks for it.
+        """
+        if report is None:
+            report = timing.TimingReport()
+
+        if workers > 1 or defer_indexes:
+            CreateDatabaseStructure.create_database_parallel(
+                connection,
+                schema,
+                srid,
+                version=version,
+                override=override,
+                install_dir=install_dir,
+                feedback=feedback,
+                workers=workers,
+                copy_glossaries=copy_glossaries,
+                report=report,
+                defer_indexes=defer_indexes,
+                data_sources=data_sources,
+            )
+            return
+
+        if single_transaction:
+            CreateDatabaseStructure.create_database_single_transaction(
+                connection,
+                schema,
+                srid,
+                version=version,
+                override=override,
+                install_dir=install_dir,
+                feedback=feedback,
+                copy_glossaries=copy_glossaries,
+                report=report,
+            )
+            return
+
+        with contextlib.ExitStack() as stack:
+            # Statements are timed one by one on a psycopg connection
+            conn = None
+            if report.statements:
+                conn = stack.enter_context(pooled_connection(connection))
+
+            def execute(kind: str, name: str, sql: str):
+                if conn is not None:
+                    timing.execute_statements(conn, name, sql, report, kind)
+                    return
                 try:
-                    connection.executeSql(sql)
+                    with report.measure(kind, name):
+                        connection.executeSql(sql)
                 except QgsProviderConnectionException as e:
                     raise QgsProcessingException(str(e))
 
+            # Drop schema if needed
+            if override:
+                feedback.pushInfo(tr(f"Trying to drop schema {schema}…"))
+                execute("file", "drop", install.drop_schema_sql(schema))
                 feedback.pushInfo("  Success !")
 
-        # loop csv files and insert data
-        for file in install_dir.joinpath("csv", "StaR-Eau").glob("*.csv"):
-            feedback.pushInfo(file.name)
-            table_name = file.stem
-            values = []
-            with open(file) as f:
-                cf = csv.reader(f)
-                for row in cf:
-                    values.append(
-                        f"("
-                        f""+("'"+row[0].replace("'", "''")+"'" if row[0] else "NULL")+", "
-                        f""+("'"+row[1].replace("'", "''")+"'" if row[0] else "NULL")+", "
-                        f""+("'"+row[2].replace("'", "''")+"'" if row[0] else "NULL")+""
-                        f")"
-                    )
-            additional_values = [
-                ('non_renseigne', 'Non renseigné(e)', 'information en recherche ou disponible mais non saisie'),
-                ('non_concerne', 'Non concerné(e)', 'information non possible ou non pertinente pour l\'élément décrit'),
-                ('non_valide', 'Non validé(e)', 'information existe mais n\'est pas officiellement validée'),
-                ('non_determine', 'Non déterminé(e)', 'information inconnue ou non disponible et ne peut pas l\'être'),
-                ('autre', 'Autre', 'ne figure pas dans la liste ci-dessus. cf. commentaire')
-            ]
-            for row in additional_values:
-                values.append(
-                    f"("
-                    f""+("'"+row[0].replace("'", "''")+"'" if row[0] else "NULL")+", "
-                    f""+("'"+row[1].replace("'", "''")+"'" if row[0] else "NULL")+", "
-                    f""+("'"+row[2].replace("'", "''")+"'" if row[0] else "NULL")+""
-                    f")"
-                )
-            values = ',\n'.join(values)
-            sql = (
-                f"INSERT INTO {schema}_valeur.{table_name} (code, valeur, description) VALUES\n"
-                f"{values}\n"
-                f"ON CONFLICT (code) DO NOTHING"
+            # Loop sql files and run SQL code
+            sql_dir = install_dir.joinpath("sql")
+            cache_dir = rewrite.cache_path()
+            for sql_file in install.sql_files(install_dir):
+                name = sql_file.relative_to(sql_dir).as_posix()
+                feedback.pushInfo(name)
+                sql = install.render_sql_file(sql_file, schema, srid, cache_dir)
+                if len(sql.strip()) == 0:
+                    feedback.pushInfo("  Skipped (empty file)")
+                    continue
+
+                if conn is not None:
+                    sql = install.strip_transaction_statements(sql)
+                execute("file", name, sql)
+
+                feedback.pushInfo("  Success !")
+
+            # loop csv files and insert data
+            if copy_glossaries:
+                with pooled_connection(connection) as copy_conn, report.measure("glossary", "COPY"):
+                    count = glossary.copy_glossaries(copy_conn, schema, install_dir, feedback)
+                feedback.pushInfo(tr(f"{count} glossary rows loaded"))
+            else:
+                for csv_file in glossary.glossary_files(install_dir):
+                    feedback.pushInfo(csv_file.name)
+                    execute("glossary", csv_file.stem, glossary.glossary_insert_sql(schema, csv_file))
+                    feedback.pushInfo("  Success !")
+
+            execute("file", "metadata", install.metadata_sql(schema, version))
+
+    @staticmethod
+    def create_database_single_transaction(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        srid: int,
+        *,
+        version: int,
+        override: bool,
+        install_dir: Path,
+        feedback: QgsProcessingFeedback,
+        copy_glossaries: bool = False,
+        report: Optional[timing.TimingReport] = None,
+    ):
+        """Run the whole install as a single transaction in one round-trip
+
+        The install script is sent as one multi-statement query, which
+        PostgreSQL runs as a single implicit transaction: any error
+        rolls back the whole install.
+
+        With `copy_glossaries`, the script and the glossary COPY are run
+        in one explicit transaction on a psycopg connection.
+        """
+        parts = list(
+            install.iter_install_script(
+                install_dir,
+                schema,
+                srid,
+                version=version,
+                override=override,
+                glossaries=not copy_glossaries,
+                cache_dir=rewrite.cache_path(),
             )
+        )
+        script = install.render_install_script(iter(parts))
+        feedback.pushInfo(tr(f"Running the install script ({len(parts)} parts) in a single transaction…"))
+
+        if copy_glossaries:
+            psycopg = psycopg_module()
 
             try:
-                connection.executeSql(sql)
+                with pooled_connection(connection) as conn:
+                    round_trip = install.round_trip_time(lambda: conn.execute("SELECT 1"))
+                    start = time.perf_counter()
+                    with conn.transaction():
+                        conn.execute(script)
+                        count = glossary.copy_glossaries(conn, schema, install_dir, feedback)
+                    elapsed = time.perf_counter() - start
+            except psycopg.Error as e:
+                raise QgsProcessingException(str(e)) from None
+            feedback.pushInfo(tr(f"{count} glossary rows loaded"))
+            # The glossary tables would have been loaded with one call each
+            calls = len(parts) + len(glossary.glossary_files(install_dir))
+        else:
+            round_trip = install.round_trip_time(lambda: connection.executeSql("SELECT 1"))
+            start = time.perf_counter()
+            try:
+                connection.executeSql(script)
             except QgsProviderConnectionException as e:
                 raise QgsProcessingException(str(e))
+            elapsed = time.perf_counter() - start
+            calls = len(parts)
+        feedback.pushInfo("  Success !")
+        if report is not None:
+            report.add("script", "install", elapsed)
+
+        # Each part would have been one call (round-trip and commit)
+        saved = (calls - 1) * round_trip
+        feedback.pushInfo(
+            tr(
+                f"Install done in {elapsed:.2f}s with 1 transaction instead of {calls}: "
+                f"about {saved:.2f}s saved (round-trip time {round_trip * 1000:.1f} ms)."
+            )
+        )
+
+    @staticmethod
+    def create_database_parallel(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        srid: int,
+        *,
+        version: int,
+        override: bool,
+        install_dir: Path,
+        feedback: QgsProcessingFeedback,
+        workers: int,
+        copy_glossaries: bool = False,
+        report: Optional[timing.TimingReport] = None,
+        defer_indexes: bool = False,
+        data_sources: Sequence[Path] = (),
+    ):
+        """Run the install statements in parallel on several connections
+
+        Statements touching different objects, such as the glossary tables,
+        are run at the same time. See the `parallel` module.
+
+        With `defer_indexes`, the indexes and constraints are left out of
+        the install, the data sources are loaded in the bare tables, then
+        the indexes and constraints are built. See the `deferred` module.
+
+        The metadata and the ledger entry are written last, in their own
+        transaction, once all the other statements have succeeded.
+        """
+        psycopg = psycopg_module()
+
+        if report is None:
+            report = timing.TimingReport()
+
+        parts = install.iter_install_script(
+            install_dir,
+            schema,
+            srid,
+            version=version,
+            override=override,
+            glossaries=not copy_glossaries,
+            cache_dir=rewrite.cache_path(),
+        )
+        # Each statement is committed on its own: the install is only
+        # registered once all of them have succeeded
+        parts = (part for part in parts if part[0] != "metadata")
+
+        deferred_statements: list[tuple[str, str]] = []
+        if defer_indexes:
+            # The glossaries are loaded with ON CONFLICT on their primary key
+            parts = deferred.split_parts(parts, [f"{schema}_valeur"], deferred_statements)
+
+        statements = parallel.build_graph(parts, install.schemas(schema))
+        feedback.pushInfo(tr(f"Running {len(statements)} statements on {workers} connections…"))
+
+        start = time.perf_counter()
+        busy = parallel.execute_graph(
+            statements,
+            lambda: psycopg_connection(connection),
+            workers,
+            feedback,
+            report,
+        )
+        elapsed = time.perf_counter() - start
+        report.add("script", "install", elapsed)
 
-            feedback.pushInfo("  Success !")
+        if copy_glossaries:
+            with pooled_connection(connection) as conn:
+                count = glossary.copy_glossaries(conn, schema, install_dir, feedback)
+            feedback.pushInfo(tr(f"{count} glossary rows loaded"))
 
-        metadata_version = version
-        sql = f"""
-            INSERT INTO {schema}.metadata
-            (id, me_version, me_version_date, me_status)
-            VALUES (
-                1, '{metadata_version}', now()::timestamp(0), 1
-            )"""
+        feedback.pushInfo("  Success !")
+        feedback.pushInfo(
+            tr(f"Statements run in {elapsed:.2f}s instead of {busy:.2f}s if run one after the other.")
+        )
+
+        if defer_indexes:
+            CreateDatabaseStructure.build_deferred(
+                connection,
+                schema,
+                deferred_statements,
+                feedback=feedback,
+                workers=workers,
+                report=report,
+                data_sources=data_sources,
+            )
 
+        feedback.pushInfo("metadata")
         try:
-            connection.executeSql(sql)
-        except QgsProviderConnectionException as e:
-            raise QgsProcessingException(str(e))
+            with pooled_connection(connection) as conn:
+                conn.execute(install.metadata_sql(schema, version))
+        except psycopg.Error as e:
+            raise QgsProcessingException(str(e)) from None
+
+    @staticmethod
+    def build_deferred(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        deferred_statements: list[tuple[str, str]],
+        *,
+        feedback: QgsProcessingFeedback,
+        workers: int,
+        report: timing.TimingReport,
+        data_sources: Sequence[Path] = (),
+    ):
+        """Load the data sources in the bare tables, then build the indexes and constraints"""
+        psycopg = psycopg_module()
+
+        conninfo = QgsDataSourceUri(connection.uri()).connectionInfo(True)
+        for source in data_sources:
+            feedback.pushInfo(tr(f"Loading the data from {source}…"))
+            with pooled_connection(connection) as conn, report.measure("data", source.name):
+                deferred.load_data(conn, conninfo, source, feedback)
+        if data_sources:
+            try:
+                with pooled_connection(connection) as conn:
+                    conn.execute("ANALYZE")
+            except psycopg.Error as e:
+                raise QgsProcessingException(str(e)) from None
+
+        statements = parallel.build_graph(deferred_statements, install.schemas(schema))
+        feedback.pushInfo(
+            tr(f"Building {len(statements)} indexes and constraints on {workers} connections…")
+        )
+        start = time.perf_counter()
+        parallel.execute_graph(
+            statements,
+            lambda: psycopg_connection(connection),
+            workers,
+            feedback,
+            report,
+        )
+        elapsed = time.perf_counter() - start
+        report.add("script", "indexes and constraints", elapsed)
+        feedback.pushInfo(tr(f"Indexes and constraints built in {elapsed:.2f}s."))
 
     def processAlgorithm(self, parameters, context, feedback):
         connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
@@ -286,7 +734,40 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
         install_dir = resources.plugin_path().joinpath("install")
         version = resources.schema_version()
         srid = int(self.parameterAsCrs(parameters, self.CRS, context).authid().replace('EPSG:', ''))
-
+        single_transaction = self.parameterAsBool(parameters, self.SINGLE_TRANSACTION, context)
+        copy_glossaries = self.parameterAsBool(parameters, self.COPY_GLOSSARIES, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context)
+        defer_indexes = self.parameterAsBool(parameters, self.DEFER_INDEXES, context)
+        data_sources = self.data_sources(parameters, context)
+        reset = self.parameterAsBool(parameters, self.RESET, context)
+        report_path = self.parameterAsFileOutput(parameters, self.TIMING_REPORT, context)
+        render_path = self.parameterAsFileOutput(parameters, self.RENDER_FILE, context)
+
+        if render_path:
+            parts = install.iter_install_script(
+                install_dir,
+                schema,
+                srid,
+                version=version,
+                override=override,
+                cache_dir=rewrite.cache_path(),
+            )
+            header = install.script_header(
+                tr(f"Install of the structure version '{version}'"),
+                schema,
+                srid,
+            )
+            count = install.write_script(Path(render_path), parts, header)
+            msg = tr(f"The install script, in {count} parts, has been written to {render_path}")
+            feedback.pushInfo(msg)
+            return {
+                self.RENDER_FILE: render_path,
+                self.OUTPUT_STATUS: 1,
+                self.OUTPUT_VERSION: version,
+                self.OUTPUT_STRING: msg,
+            }
+
+        report = timing.TimingReport(statements=bool(report_path))
         self.create_database(
             connection_name,
             schema,
@@ -295,11 +776,23 @@ class CreateDatabaseStructure(BaseDatabaseAlgorithm):
             override=override,
             install_dir=install_dir,
             feedback=feedback,
+            single_transaction=single_transaction,
+            copy_glossaries=copy_glossaries,
+            workers=workers,
+            report=report,
+            defer_indexes=defer_indexes,
+            data_sources=data_sources,
+            reset=reset,
         )
 
         feedback.pushInfo(f"Database version '{version}'.")
 
+        report.push_summary(feedback)
+        if report_path:
+            report.write(Path(report_path), algorithm=self.name(), schema=schema, version=version)
+
         return {
+            self.TIMING_REPORT: report_path,
             self.OUTPUT_STATUS: 1,
             self.OUTPUT_VERSION: version,
             self.OUTPUT_STRING: tr(
@@ -0,0 +1,197 @@
+from pathlib import Path
+
+from qgis.core import (
+    QgsProcessingContext,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterMatrix,
+    QgsProcessingParameterNumber,
+)
+
+from . import batch, upgrade
+from .base import BaseDatabaseAlgorithm, i18n
+
+# Shorcut
+tr = i18n.tr
+
+
+class UpgradeDatabaseFleet(BaseDatabaseAlgorithm):
+    """
+    Upgrade the plugin structure on many databases at once
+    """
+
+    TARGETS = "TARGETS"
+    TARGETS_FILE = "TARGETS_FILE"
+    RUN_MIGRATIONS = "RUN_MIGRATIONS"
+    WORKERS = "WORKERS"
+    LOCK_TIMEOUT = "LOCK_TIMEOUT"
+    RETRIES = "RETRIES"
+    MATRIX = "MATRIX"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_FAILED = "OUTPUT_FAILED"
+
+    def name(self):
+        return "upgrade_database_fleet"
+
+    def displayName(self):
+        return tr("Upgrade database structure on many databases")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Upgrade the plugin database structure on a list of databases, several "
+            "databases at once."
+            "\n"
+            "\n"
+            "* Targets: one row per target, with the name of a PostgreSQL connection "
+            "(or a connection string such as service=name) and the schema name. "
+            "An empty schema takes the default value."
+            "\n"
+            "* Targets file: the same as a CSV file, with an optional "
+            "connection,schema header."
+            "\n"
+            "\n"
+            "Without targets, all the configured PostgreSQL connections are upgraded."
+            "\n"
+            "\n"
+            "A failed target does not stop the others: the summary lists the "
+            "versions and the result of each target."
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        self.addParameter(
+            QgsProcessingParameterMatrix(
+                self.TARGETS,
+                tr("Targets"),
+                headers=[tr("Connection"), tr("Schema")],
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.TARGETS_FILE,
+                tr("Targets file (CSV)"),
+                extension="csv",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.RUN_MIGRATIONS,
+                tr("Check this box to upgrade. No action will be done otherwise"),
+                defaultValue=False,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.WORKERS,
+                tr("Number of databases upgraded at once"),
+                type=QgsProcessingParameterNumber.Integer,
+                defaultValue=4,
+                minValue=1,
+                maxValue=64,
+            )
+        )
+
+        param = QgsProcessingParameterNumber(
+            self.LOCK_TIMEOUT,
+            tr("Lock timeout (milliseconds)"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=upgrade.LOCK_TIMEOUT,
+            minValue=0,
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterNumber(
+            self.RETRIES,
+            tr("Number of retries when a lock is not available"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=upgrade.RETRIES,
+            minValue=0,
+            maxValue=20,
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.MATRIX,
+            tr("Result of each target"),
+            fileFilter="CSV (*.csv)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(tr("CSV file with the versions, the time and the result of each target."))
+        self.addParameter(param)
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_FAILED, tr("Number of failed targets")))
+
+    def targets(self, parameters: dict, context: QgsProcessingContext) -> list[batch.Target]:
+        matrix = self.parameterAsMatrix(parameters, self.TARGETS, context)
+        rows = [matrix[i : i + 2] for i in range(0, len(matrix), 2)]
+        targets = batch.parse_targets(rows)
+
+        targets_file = self.parameterAsFile(parameters, self.TARGETS_FILE, context)
+        if targets_file:
+            targets.extend(batch.read_targets(Path(targets_file)))
+
+        if not matrix and not targets_file:
+            targets = batch.connection_targets()
+        return targets
+
+    def checkParameterValues(self, parameters, context):
+        if not self.parameterAsBool(parameters, self.RUN_MIGRATIONS, context):
+            return False, tr("You must check the box to run the upgrade !")
+
+        try:
+            targets = self.targets(parameters, context)
+        except (OSError, ValueError) as e:
+            return False, tr(f"Invalid targets: {e}")
+
+        if not targets:
+            return False, tr("At least one target is required")
+
+        names = [str(t) for t in targets]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            return False, tr(f"Duplicated targets: {', '.join(sorted(duplicates))}")
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        targets = self.targets(parameters, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context)
+        matrix_path = self.parameterAsFileOutput(parameters, self.MATRIX, context)
+
+        feedback.pushInfo(tr(f"Upgrading {len(targets)} targets, {workers} at once…"))
+        results = batch.run_batch(
+            targets,
+            workers=workers,
+            feedback=feedback,
+            task=batch.upgrade_target,
+            lock_timeout=self.parameterAsInt(parameters, self.LOCK_TIMEOUT, context),
+            retries=self.parameterAsInt(parameters, self.RETRIES, context),
+        )
+
+        msg = batch.summary(results, tr("upgraded or up to date"))
+        feedback.pushInfo(msg)
+        if matrix_path:
+            batch.write_matrix(Path(matrix_path), results)
+        failed = sum(1 for result in results if not result.success)
+
+        return {
+            self.MATRIX: matrix_path,
+            self.OUTPUT_STATUS: 0 if failed else 1,
+            self.OUTPUT_FAILED: failed,
+            self.OUTPUT_STRING: msg,
+        }
@@ -0,0 +1,210 @@
+import time
+
+from pathlib import Path
+
+from qgis.core import (
+    QgsProcessing,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterMatrix,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
+    QgsProject,
+    QgsVectorLayer,
+)
+
+from ..tools import get_connection_name
+from . import importer
+from .base import BaseDatabaseAlgorithm, i18n, resources
+
+# Shorcut
+tr = i18n.tr
+
+
+class ImportNetworkData(BaseDatabaseAlgorithm):
+    """
+    Import network layers in the tables of the structure
+    """
+
+    CONNECTION_NAME = "CONNECTION_NAME"
+    SCHEMA = "SCHEMA"
+    LAYERS = "LAYERS"
+    MAPPING = "MAPPING"
+    COMMON_VALUES = "COMMON_VALUES"
+    WORKERS = "WORKERS"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_FEATURES = "OUTPUT_FEATURES"
+
+    def name(self):
+        return "import_network_data"
+
+    def displayName(self):
+        return tr("Import network data")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Import network layers, from GeoPackage or Shapefile files, in the tables of the structure."
+            "\n"
+            "\n"
+            "* Layers: each layer is imported in the table of the same name, and its fields in "
+            "the columns of the same name. The geometries are converted to the type and the CRS "
+            "of the table."
+            "\n"
+            "* Mapping file: JSON file giving the table of a layer and the field of a column, "
+            'such as {"layers": {"canalisations": {"table": "aep_canalisation", '
+            '"fields": {"materiau": "MAT"}}}}.'
+            "\n"
+            "* Common values: values of the columns common to all the tables, as the operator "
+            "or the source of the data, used when they are not in the layers."
+            "\n"
+            "\n"
+            "The features are streamed with a binary COPY, several tables at once. "
+            "Each layer is imported in a transaction: the first failure stops the import, "
+            "the layers already imported are kept. The data is appended to the tables."
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        project = QgsProject.instance()
+        connection_name = get_connection_name(project)
+        param = QgsProcessingParameterProviderConnection(
+            self.CONNECTION_NAME,
+            tr("Connection to the PostgreSQL database"),
+            "postgres",
+            defaultValue=connection_name,
+            optional=False,
+        )
+        param.setHelp(tr("The database where the schema is installed."))
+        self.addParameter(param)
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=resources.schema_name(),
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.LAYERS,
+                tr("Layers"),
+                layerType=QgsProcessing.TypeVector,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFile(
+                self.MAPPING,
+                tr("Mapping file"),
+                extension="json",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterMatrix(
+                self.COMMON_VALUES,
+                tr("Common values"),
+                headers=[tr("Column"), tr("Value")],
+                optional=True,
+            )
+        )
+
+        param = QgsProcessingParameterNumber(
+            self.WORKERS,
+            tr("Number of tables imported at once"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=4,
+            minValue=1,
+            maxValue=64,
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_FEATURES, tr("Number of imported features")))
+
+    def common_values(self, parameters: dict, context: QgsProcessingContext) -> dict[str, str]:
+        matrix = self.parameterAsMatrix(parameters, self.COMMON_VALUES, context)
+        return {
+            str(column).strip(): str(value)
+            for column, value in zip(matrix[::2], matrix[1::2])
+            if str(column).strip() and str(value) != ""
+        }
+
+    def processAlgorithm(self, parameters, context, feedback):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        layers = self.parameterAsLayerList(parameters, self.LAYERS, context)
+        mapping_file = self.parameterAsFile(parameters, self.MAPPING, context)
+        common_values = self.common_values(parameters, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context)
+
+        connection = self.find_connection(connection_name)
+        tables = importer.target_tables(connection, schema)
+        if not tables:
+            raise QgsProcessingException(tr(f"The structure is not installed in the schema {schema}"))
+        layer_mappings = importer.read_mapping(Path(mapping_file)) if mapping_file else {}
+
+        common_columns = {column.name for table in tables for column in table.columns if column.common}
+        unknown = sorted(set(common_values) - common_columns)
+        if unknown:
+            raise QgsProcessingException(tr(f"Unknown common columns: {', '.join(unknown)}"))
+
+        # Check all the layers before importing any of them
+        sources = []
+        errors = []
+        for layer in layers:
+            if not isinstance(layer, QgsVectorLayer):
+                continue
+            name = importer.source_name(layer)
+            try:
+                mapping = importer.map_layer(
+                    name,
+                    layer.fields(),
+                    tables,
+                    layer_mappings.get(name),
+                    common_values,
+                )
+            except QgsProcessingException as e:
+                errors.append(str(e))
+                continue
+            missing = importer.missing_columns(mapping, layer.isSpatial())
+            if missing:
+                errors.append(tr(f"{name}: no value for the columns {', '.join(missing)} of {mapping.table}"))
+                continue
+            feedback.pushInfo(
+                tr(f"{name} → {mapping.table}: {len(mapping.fields)} fields, {layer.featureCount()} features")
+            )
+            sources.append(importer.layer_source(layer, mapping))
+        for error in errors:
+            feedback.reportError(error)
+        if errors:
+            raise QgsProcessingException(tr(f"{len(errors)} layers cannot be imported"))
+
+        start = time.perf_counter()
+        count = importer.import_layers(
+            connection,
+            sources,
+            context.transformContext(),
+            workers=workers,
+            feedback=feedback,
+        )
+
+        seconds = time.perf_counter() - start
+        msg = tr(f"{count} features imported from {len(sources)} layers in {seconds:.1f}s")
+        feedback.pushInfo(msg)
+        return {
+            self.OUTPUT_STATUS: 1,
+            self.OUTPUT_FEATURES: count,
+            self.OUTPUT_STRING: msg,
+        }
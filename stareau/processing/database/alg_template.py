@@ -0,0 +1,346 @@
+import time
+
+from typing import Optional
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsDataSourceUri,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterCrs,
+    QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
+    QgsProject,
+    QgsProviderConnectionException,
+    QgsProviderRegistry,
+)
+
+from ..tools import get_connection_name
+from . import install
+from .alg_create import CreateDatabaseStructure
+from .base import BaseDatabaseAlgorithm, i18n, resources
+
+# Shorcut
+tr = i18n.tr
+
+
+class CreateDatabaseFromTemplate(BaseDatabaseAlgorithm):
+    """
+    Create a new database by cloning a template database
+    holding the plugin structure
+    """
+
+    CONNECTION_NAME = "CONNECTION_NAME"
+    DATABASE = "DATABASE"
+    SCHEMA = "SCHEMA"
+    CRS = "CRS"
+    TEMPLATE = "TEMPLATE"
+    REBUILD_TEMPLATE = "REBUILD_TEMPLATE"
+    NEW_CONNECTION_NAME = "NEW_CONNECTION_NAME"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_DATABASE = "OUTPUT_DATABASE"
+
+    def name(self):
+        return "create_database_from_template"
+
+    def displayName(self):
+        return tr("Create database from template")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Create a new database holding the plugin structure by cloning a template "
+            "database, which is much faster than running the install scripts."
+            "\n"
+            "\n"
+            "The template database is created and installed on the first run, "
+            "with the given schema and CRS, then marked as a template. "
+            "It is rebuilt when its structure version is not the one of the plugin. "
+            "An existing database which is not a template is never used nor dropped."
+            "\n"
+            "\n"
+            "* PostgreSQL connection: any connection to the PostgreSQL server, with "
+            "the privileges to create databases."
+            "\n"
+            "* Template database: by default, the template is named after the schema and "
+            "the SRID, so that each pair of schema and CRS has its own template."
+            "\n"
+            "\n"
+            "Beware ! Sessions connected to the template database are terminated "
+            "before cloning."
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        project = QgsProject.instance()
+        connection_name = get_connection_name(project)
+        param = QgsProcessingParameterProviderConnection(
+            self.CONNECTION_NAME,
+            tr("Connection to the PostgreSQL server"),
+            "postgres",
+            defaultValue=connection_name,
+            optional=False,
+        )
+        param.setHelp(tr("The connection used to create the template and the new databases."))
+        self.addParameter(param)
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.DATABASE,
+                tr("Name of the database to create"),
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=resources.schema_name(),
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterCrs(
+                self.CRS,
+                tr("Geometry CRS"),
+                defaultValue=f"EPSG:{resources.srid_value()}",
+                optional=False,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.TEMPLATE,
+                tr("Template database name"),
+                optional=True,
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.REBUILD_TEMPLATE,
+                tr("Rebuild the template database"),
+                defaultValue=False,
+            )
+        )
+        param = QgsProcessingParameterString(
+            self.NEW_CONNECTION_NAME,
+            tr("Name of the QGIS connection to save for the new database"),
+            optional=True,
+        )
+        param.setHelp(tr("If set, a PostgreSQL connection to the new database is saved in QGIS."))
+        self.addParameter(param)
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_DATABASE, tr("Output database")))
+
+    def checkParameterValues(self, parameters, context):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        connection = self.find_connection(connection_name)
+        database = self.parameterAsString(parameters, self.DATABASE, context)
+        if not database:
+            return False, tr("The name of the database to create is required")
+
+        if self.database_exists(connection, database) is not None:
+            return False, tr(f"The database {database} already exists !")
+
+        return super().checkParameterValues(parameters, context)
+
+    @staticmethod
+    def template_name(schema: str, srid: int) -> str:
+        """Return the default template database name"""
+        return f"{schema}_template_{srid}"
+
+    @staticmethod
+    def database_exists(
+        connection: QgsAbstractDatabaseProviderConnection,
+        database: str,
+    ) -> Optional[bool]:
+        """Return whether the database is a template, or None if it does not exist"""
+        sql = f"SELECT datistemplate FROM pg_database WHERE datname = {connection.quotedValue(database)}"
+        try:
+            result = connection.executeSql(sql)
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        return bool(result[0][0]) if result else None
+
+    @staticmethod
+    def template_version(
+        connection: QgsAbstractDatabaseProviderConnection,
+        template: str,
+        schema: str,
+    ) -> Optional[str]:
+        """Return the structure version installed in the template, if any"""
+        template_connection = CreateDatabaseFromTemplate.database_connection(connection, template)
+        try:
+            installed = template_connection.executeSql(f"SELECT to_regclass('{schema}.metadata') IS NOT NULL")
+            if installed and installed[0][0]:
+                installed = template_connection.executeSql(install.installed_version_sql(schema))
+            else:
+                installed = []
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        return str(installed[0][0]) if installed and installed[0] else None
+
+    @staticmethod
+    def terminate_sessions(connection: QgsAbstractDatabaseProviderConnection, database: str):
+        """Terminate the other sessions connected to the database"""
+        sql = (
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            f"WHERE datname = {connection.quotedValue(database)} AND pid <> pg_backend_pid()"
+        )
+        try:
+            connection.executeSql(sql)
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+
+    @staticmethod
+    def database_connection(
+        connection: QgsAbstractDatabaseProviderConnection,
+        database: str,
+    ) -> QgsAbstractDatabaseProviderConnection:
+        """Return a connection to another database of the same server"""
+        uri = QgsDataSourceUri(connection.uri())
+        uri.setDatabase(database)
+        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
+        return metadata.createConnection(uri.uri(False), {})
+
+    @staticmethod
+    def build_template(
+        connection: QgsAbstractDatabaseProviderConnection,
+        template: str,
+        schema: str,
+        srid: int,
+        *,
+        feedback: QgsProcessingFeedback,
+    ):
+        """(Re)create the template database and install the structure in it
+
+        Only a database marked as a template is dropped: an ordinary
+        database with the same name is never replaced.
+        """
+        is_template = CreateDatabaseFromTemplate.database_exists(connection, template)
+        if is_template is False:
+            raise QgsProcessingException(
+                tr(f"The database {template} exists but is not a template database.")
+            )
+        quoted_template = connection.quotedIdentifier(template)
+        try:
+            if is_template:
+                feedback.pushInfo(tr(f"Dropping the template database {template}…"))
+                connection.executeSql(f"ALTER DATABASE {quoted_template} WITH IS_TEMPLATE false")
+                CreateDatabaseFromTemplate.terminate_sessions(connection, template)
+                connection.executeSql(f"DROP DATABASE {quoted_template}")
+
+            feedback.pushInfo(tr(f"Creating the template database {template}…"))
+            connection.executeSql(f"CREATE DATABASE {quoted_template}")
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+
+        version = resources.schema_version()
+        try:
+            CreateDatabaseStructure.install_structure(
+                CreateDatabaseFromTemplate.database_connection(connection, template),
+                schema,
+                srid,
+                version=version,
+                override=False,
+                install_dir=resources.plugin_path().joinpath("install"),
+                feedback=feedback,
+                single_transaction=True,
+            )
+        except QgsProcessingException:
+            # The database has just been created, it is not left behind as
+            # an ordinary database blocking the next run
+            CreateDatabaseFromTemplate.terminate_sessions(connection, template)
+            try:
+                connection.executeSql(f"DROP DATABASE {quoted_template}")
+            except QgsProviderConnectionException:
+                pass
+            raise
+
+        try:
+            connection.executeSql(f"ALTER DATABASE {quoted_template} WITH IS_TEMPLATE true")
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        feedback.pushInfo(tr(f"Template database {template} installed with version '{version}'."))
+
+    @staticmethod
+    def clone_template(
+        connection: QgsAbstractDatabaseProviderConnection,
+        template: str,
+        database: str,
+        *,
+        feedback: QgsProcessingFeedback,
+    ):
+        """Create the database from the template"""
+        # Cloning fails if any session is connected to the template
+        CreateDatabaseFromTemplate.terminate_sessions(connection, template)
+
+        start = time.perf_counter()
+        sql = (
+            f"CREATE DATABASE {connection.quotedIdentifier(database)} "
+            f"TEMPLATE {connection.quotedIdentifier(template)}"
+        )
+        try:
+            connection.executeSql(sql)
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        feedback.pushInfo(
+            tr(f"Database {database} cloned from {template} in {time.perf_counter() - start:.2f}s.")
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        database = self.parameterAsString(parameters, self.DATABASE, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        srid = int(self.parameterAsCrs(parameters, self.CRS, context).authid().replace("EPSG:", ""))
+        template = self.parameterAsString(parameters, self.TEMPLATE, context)
+        rebuild = self.parameterAsBool(parameters, self.REBUILD_TEMPLATE, context)
+        new_connection_name = self.parameterAsString(parameters, self.NEW_CONNECTION_NAME, context)
+
+        if not template:
+            template = self.template_name(schema, srid)
+
+        connection = self.find_connection(connection_name)
+
+        is_template = self.database_exists(connection, template)
+        if is_template is False:
+            # Never drop an ordinary database, even when the template is rebuilt
+            raise QgsProcessingException(
+                tr(f"The database {template} exists but is not a template database.")
+            )
+
+        if is_template and not rebuild:
+            # The template is a cache of the install of the plugin version
+            version = resources.schema_version()
+            template_version = self.template_version(connection, template, schema)
+            if template_version != str(version):
+                feedback.pushInfo(
+                    tr(
+                        f"The template database {template} holds the version '{template_version}' "
+                        f"instead of '{version}'."
+                    )
+                )
+                rebuild = True
+
+        if rebuild or is_template is None:
+            self.build_template(connection, template, schema, srid, feedback=feedback)
+
+        self.clone_template(connection, template, database, feedback=feedback)
+
+        if new_connection_name:
+            metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
+            metadata.saveConnection(self.database_connection(connection, database), new_connection_name)
+            feedback.pushInfo(tr(f"Connection {new_connection_name} saved."))
+
+        return {
+            self.OUTPUT_STATUS: 1,
+            self.OUTPUT_DATABASE: database,
+            self.OUTPUT_STRING: tr(
+                f"*** THE DATABASE {database} HAS BEEN CREATED FROM THE TEMPLATE {template} ***"
+            ),
+        }
@@ -0,0 +1,140 @@
+import time
+
+from qgis.core import (
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
+    QgsProject,
+)
+
+from ..tools import get_connection_name
+from . import topology
+from .base import BaseDatabaseAlgorithm, i18n, resources
+
+# Shorcut
+tr = i18n.tr
+
+
+class BuildNetworkTopology(BaseDatabaseAlgorithm):
+    """
+    Fill the initial and terminal nodes of the pipes from their geometry
+    """
+
+    CONNECTION_NAME = "CONNECTION_NAME"
+    SCHEMA = "SCHEMA"
+    TOLERANCE = "TOLERANCE"
+    INCREMENTAL = "INCREMENTAL"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_UPDATED = "OUTPUT_UPDATED"
+    OUTPUT_UNSNAPPED = "OUTPUT_UNSNAPPED"
+
+    def name(self):
+        return "build_network_topology"
+
+    def displayName(self):
+        return tr("Build network topology")
+
+    def shortHelpString(self):
+        short_help = tr(
+            "Fill the initial and terminal nodes of the pipes from their geometry."
+            "\n"
+            "\n"
+            "Each end of a pipe is linked to the nearest node of the same network, "
+            "drinking water or sewerage, branches included, within the tolerance. "
+            "The node of an end without any node within the tolerance is cleared."
+            "\n"
+            "\n"
+            "* Incremental: only update the pipes whose update date is later than the last "
+            "build with the same tolerance, and the pipes close to the nodes updated since then. "
+            "The update date must be set when the data is edited. "
+            "Run a full build after deleting nodes."
+            "\n"
+            "\n"
+            "Each pipe table is updated in its own transaction."
+        )
+        return short_help
+
+    def initAlgorithm(self, config):
+        project = QgsProject.instance()
+        connection_name = get_connection_name(project)
+        param = QgsProcessingParameterProviderConnection(
+            self.CONNECTION_NAME,
+            tr("Connection to the PostgreSQL database"),
+            "postgres",
+            defaultValue=connection_name,
+            optional=False,
+        )
+        param.setHelp(tr("The database where the schema is installed."))
+        self.addParameter(param)
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=resources.schema_name(),
+            ),
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.TOLERANCE,
+                tr("Tolerance, in the units of the CRS of the structure"),
+                type=QgsProcessingParameterNumber.Double,
+                defaultValue=0.1,
+                minValue=0,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.INCREMENTAL,
+                tr("Only update the pipes modified since the last build"),
+                defaultValue=False,
+            )
+        )
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_UPDATED, tr("Number of updated pipes")))
+        self.addOutput(
+            QgsProcessingOutputNumber(self.OUTPUT_UNSNAPPED, tr("Number of pipe ends without any node"))
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
+        incremental = self.parameterAsBoolean(parameters, self.INCREMENTAL, context)
+
+        connection = self.find_connection(connection_name)
+
+        start = time.perf_counter()
+        results = topology.build_topology(
+            connection,
+            schema,
+            tolerance,
+            incremental=incremental,
+            feedback=feedback,
+        )
+
+        updated = sum(result.updated for result in results)
+        unsnapped = sum(result.unsnapped for result in results)
+        seconds = time.perf_counter() - start
+        msg = tr(
+            f"{updated} pipes updated in {len(results)} tables in {seconds:.1f}s, "
+            f"{unsnapped} pipe ends without any node"
+        )
+        feedback.pushInfo(msg)
+        return {
+            self.OUTPUT_STATUS: 1,
+            self.OUTPUT_UPDATED: updated,
+            self.OUTPUT_UNSNAPPED: unsnapped,
+            self.OUTPUT_STRING: msg,
+        }
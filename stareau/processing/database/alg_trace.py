@@ -0,0 +1,276 @@
+import time
+
+from qgis.core import (
+    QgsDataSourceUri,
+    QgsFeatureRequest,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterProviderConnection,
+    QgsProcessingParameterString,
+    QgsProcessingParameterVectorLayer,
+    QgsProject,
+    QgsVectorLayer,
+)
+
+from ..tools import get_connection_name
+from . import graph, topology
+from .base import BaseDatabaseAlgorithm, i18n, resources
+
+# Shorcut
+tr = i18n.tr
+
+
+def layer_table(layer: QgsVectorLayer) -> str:
+    """Return the schema qualified table of a PostgreSQL layer"""
+    if layer.providerType() != "postgres":
+        return ""
+    uri = QgsDataSourceUri(layer.source())
+    return f"{uri.schema()}.{uri.table()}"
+
+
+def feature_ids(layer: QgsVectorLayer, fids: list[int]) -> list[int]:
+    """Return the ids of the features of a layer from the values of their `fid` field"""
+    request = QgsFeatureRequest()
+    request.setFilterExpression(f'"fid" IN ({", ".join(map(str, fids))})')
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    request.setNoAttributes()
+    return [feature.id() for feature in layer.getFeatures(request)]
+
+
+class TraceNetwork(BaseDatabaseAlgorithm):
+    """
+    Trace the network from the selected features of a layer
+    """
+
+    CONNECTION_NAME = "CONNECTION_NAME"
+    SCHEMA = "SCHEMA"
+    START = "START"
+    BRANCHES = "BRANCHES"
+
+    OUTPUT_STATUS = "OUTPUT_STATUS"
+    OUTPUT_STRING = "OUTPUT_STRING"
+    OUTPUT_PIPES = "OUTPUT_PIPES"
+    OUTPUT_NODES = "OUTPUT_NODES"
+
+    DIRECTION = graph.CONNECTED
+
+    def group(self):
+        return tr("Network")
+
+    def groupId(self):
+        return f"{resources.plugin_name_normalized()}_network"
+
+    def flags(self):
+        # The selection of the layers of the project is changed
+        return super().flags() | QgsProcessingAlgorithm.FlagNoThreading
+
+    def help_string(self, trace: str) -> str:
+        return tr(
+            f"{trace}"
+            "\n"
+            "\n"
+            "* Start: the selected features of a layer of nodes or pipes of the network. "
+            "The network, drinking water or sewerage, is the one of the layer."
+            "\n"
+            "* Branches: include the branches in the trace."
+            "\n"
+            "\n"
+            "The pipes and the nodes reached are selected in the layers of the project. "
+            "The nodes and the pipes are linked by the initial and terminal nodes of the pipes, "
+            "see the algorithm building the network topology."
+            "\n"
+            "\n"
+            "The graph of the network is kept in memory, "
+            "and loaded again when its tables have been modified according to their update date."
+        )
+
+    def initAlgorithm(self, config):
+        project = QgsProject.instance()
+        connection_name = get_connection_name(project)
+        param = QgsProcessingParameterProviderConnection(
+            self.CONNECTION_NAME,
+            tr("Connection to the PostgreSQL database"),
+            "postgres",
+            defaultValue=connection_name,
+            optional=False,
+        )
+        param.setHelp(tr("The database where the schema is installed."))
+        self.addParameter(param)
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.SCHEMA,
+                tr("Schema name"),
+                defaultValue=resources.schema_name(),
+            ),
+        )
+        self.addParameter(
+            QgsProcessingParameterVectorLayer(
+                self.START,
+                tr("Layer of the selected start features"),
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.BRANCHES,
+                tr("Include the branches"),
+                defaultValue=True,
+            )
+        )
+
+        # OUTPUTS
+        # Add output for status (integer) and message (string)
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_PIPES, tr("Number of pipes reached")))
+        self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_NODES, tr("Number of nodes reached")))
+
+    def start_features(
+        self,
+        network_graph: graph.NetworkGraph,
+        layer: QgsVectorLayer,
+        table: str,
+    ) -> tuple[list[int], list[int]]:
+        """Return the start nodes and edges of the selected features"""
+        features = layer.selectedFeatures()
+        if not features:
+            raise QgsProcessingException(tr(f"No feature is selected in the layer {layer.name()}"))
+
+        nodes = []
+        edges = []
+        if layer.fields().indexOf("noeudinitial") >= 0:
+            for feature in features:
+                edge = network_graph.edge(table, feature["fid"])
+                if edge is None:
+                    continue
+                edges.append(edge)
+                if self.DIRECTION == graph.UPSTREAM:
+                    nodes.append(network_graph.edge_from[edge])
+                else:
+                    nodes.append(network_graph.edge_to[edge])
+        elif layer.fields().indexOf("id_noeud_reseau") >= 0:
+            for feature in features:
+                node = network_graph.node_index.get(feature["id_noeud_reseau"])
+                if node is not None:
+                    nodes.append(node)
+        else:
+            raise QgsProcessingException(tr(f"The layer {layer.name()} is not a layer of nodes or pipes"))
+
+        if not nodes:
+            raise QgsProcessingException(tr("The selected features are not linked to the network"))
+        return nodes, edges
+
+    def processAlgorithm(self, parameters, context, feedback):
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        layer = self.parameterAsVectorLayer(parameters, self.START, context)
+        branches = self.parameterAsBoolean(parameters, self.BRANCHES, context)
+
+        table = layer_table(layer)
+        table_schema = table.split(".")[0]
+        network = None
+        if table_schema.startswith(schema):
+            network = topology.NETWORKS.get(table_schema[len(schema) :])
+        if network is None:
+            raise QgsProcessingException(tr(f"The layer {layer.name()} is not a layer of the network"))
+
+        connection = self.find_connection(connection_name)
+        network_graph = graph.graph_cache.get(
+            connection,
+            schema,
+            network,
+            branches=branches,
+            feedback=feedback,
+        )
+
+        start = time.perf_counter()
+        nodes, edges = self.start_features(network_graph, layer, table)
+        trace = network_graph.trace(nodes, self.DIRECTION)
+        # The selected pipes are in the trace, whatever its direction
+        trace.edges.extend(set(edges) - set(trace.edges))
+        seconds = time.perf_counter() - start
+
+        fids = network_graph.features(trace)
+        project = context.project() or QgsProject.instance()
+        for project_layer in project.mapLayers().values():
+            if not isinstance(project_layer, QgsVectorLayer):
+                continue
+            layer_fids = fids.get(layer_table(project_layer))
+            if layer_fids is None:
+                continue
+            if layer_fids:
+                project_layer.selectByIds(feature_ids(project_layer, layer_fids))
+            else:
+                project_layer.removeSelection()
+
+        msg = tr(
+            f"{len(trace.edges)} pipes and {len(trace.nodes)} nodes reached in {seconds:.3f}s, "
+            f"graph of {network_graph.edge_count} pipes"
+        )
+        feedback.pushInfo(msg)
+        return {
+            self.OUTPUT_STATUS: 1,
+            self.OUTPUT_PIPES: len(trace.edges),
+            self.OUTPUT_NODES: len(trace.nodes),
+            self.OUTPUT_STRING: msg,
+        }
+
+
+class TraceDownstream(TraceNetwork):
+    """
+    Trace the network downstream of the selected features
+    """
+
+    DIRECTION = graph.DOWNSTREAM
+
+    def name(self):
+        return "trace_downstream"
+
+    def displayName(self):
+        return tr("Trace downstream")
+
+    def shortHelpString(self):
+        return self.help_string(
+            tr("Select the pipes and the nodes downstream of the selected features, following the pipes.")
+        )
+
+
+class TraceUpstream(TraceNetwork):
+    """
+    Trace the network upstream of the selected features
+    """
+
+    DIRECTION = graph.UPSTREAM
+
+    def name(self):
+        return "trace_upstream"
+
+    def displayName(self):
+        return tr("Trace upstream")
+
+    def shortHelpString(self):
+        return self.help_string(
+            tr("Select the pipes and the nodes upstream of the selected features, against the pipes.")
+        )
+
+
+class TraceConnected(TraceNetwork):
+    """
+    Trace the part of the network connected to the selected features
+    """
+
+    DIRECTION = graph.CONNECTED
+
+    def name(self):
+        return "trace_connected"
+
+    def displayName(self):
+        return tr("Trace connected network")
+
+    def shortHelpString(self):
+        return self.help_string(
+            tr("Select the pipes and the nodes connected to the selected features, in any direction.")
+        )
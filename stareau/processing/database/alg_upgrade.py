@@ -1,17 +1,25 @@
 
+from pathlib import Path
+
 from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
     QgsProcessingException,
+    QgsProcessingFeedback,
     QgsProcessingOutputNumber,
     QgsProcessingOutputString,
     QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterNumber,
     QgsProcessingParameterProviderConnection,
     QgsProcessingParameterString,
     QgsProject,
     QgsProviderConnectionException,
-    QgsProviderRegistry,
 )
 
-from ..tools import get_connection_name
+from ...plugin_tools import phases
+from ..tools import connection_registry, get_connection_name, pooled_connection
+from . import install, ledger, rewrite, timing, upgrade
 from .base import BaseDatabaseAlgorithm, i18n, resources
 
 # Shorcut
@@ -22,6 +30,12 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
     CONNECTION_NAME = "CONNECTION_NAME"
     RUN_MIGRATIONS = "RUN_MIGRATIONS"
     SCHEMA = "SCHEMA"
+    TIMING_REPORT = "TIMING_REPORT"
+    RENDER_FILE = "RENDER_FILE"
+    FROM_VERSION = "FROM_VERSION"
+    LOCK_TIMEOUT = "LOCK_TIMEOUT"
+    RETRIES = "RETRIES"
+    ACCEPT_EDITED = "ACCEPT_EDITED"
     OUTPUT_STATUS = "OUTPUT_STATUS"
     OUTPUT_STRING = "OUTPUT_STRING"
 
@@ -42,6 +56,20 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
             "\n"
             "* PostgreSQL connection to the database: name of the database "
             "connection you would like to use for the upgrade."
+            "\n"
+            "\n"
+            "All the migrations are applied in a single transaction: if one of them "
+            "fails, the database is left unchanged. Locks are waited for a short time "
+            "only, and the migration is retried later when a lock is not available."
+            "\n"
+            "\n"
+            "Applied migrations are recorded in the migration ledger: they are not run "
+            "again, and the upgrade is refused if their file has been edited since."
+            "\n"
+            "\n"
+            "The concurrent and validate phases of the migrations are run after the "
+            "transaction, statement by statement. If the upgrade is interrupted, run it "
+            "again to resume them. They require the python module 'psycopg'."
         )
         return short_help
 
@@ -74,12 +102,97 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
             ),
         )
 
+        param = QgsProcessingParameterNumber(
+            self.LOCK_TIMEOUT,
+            tr("Lock timeout (milliseconds)"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=upgrade.LOCK_TIMEOUT,
+            minValue=0,
+        )
+        param.setHelp(
+            tr(
+                "Maximum time waited for a lock by each statement, so that the upgrade does "
+                "not block the queries queued behind it. 0 waits without limit."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterNumber(
+            self.RETRIES,
+            tr("Number of retries when a lock is not available"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=upgrade.RETRIES,
+            minValue=0,
+            maxValue=20,
+        )
+        param.setHelp(tr("The delay before each retry is doubled, starting from half a second."))
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterBoolean(
+            self.ACCEPT_EDITED,
+            tr("Upgrade even if applied migration files have been edited"),
+            defaultValue=False,
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.TIMING_REPORT,
+            tr("Timing report"),
+            fileFilter="JSON (*.json)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(
+            tr(
+                "JSON file with the time spent in each migration and statement. "
+                "Statements are then run one by one, which requires the python module 'psycopg'."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterFileDestination(
+            self.RENDER_FILE,
+            tr("Only write the upgrade script to a file"),
+            fileFilter="SQL (*.sql)",
+            optional=True,
+            createByDefault=False,
+        )
+        param.setHelp(
+            tr(
+                "The upgrade script from the installed version is written to the file instead "
+                "of being run: nothing is done on the database. The installed version must "
+                "then be given."
+            )
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
+        param = QgsProcessingParameterNumber(
+            self.FROM_VERSION,
+            tr("Installed version, when only writing the upgrade script"),
+            type=QgsProcessingParameterNumber.Integer,
+            minValue=1,
+            optional=True,
+        )
+        param.setFlags(param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(param)
+
         # OUTPUTS
         # Add output for status (integer) and message (string)
         self.addOutput(QgsProcessingOutputNumber(self.OUTPUT_STATUS, tr("Output status")))
         self.addOutput(QgsProcessingOutputString(self.OUTPUT_STRING, tr("Output message")))
 
     def checkParameterValues(self, parameters, context):
+        if self.parameterAsFileOutput(parameters, self.RENDER_FILE, context):
+            if parameters.get(self.FROM_VERSION) is None:
+                return False, tr("The installed version is required to write the upgrade script")
+            # Nothing is done on the database
+            return super(UpgradeDatabaseStructure, self).checkParameterValues(parameters, context)
+
         # Check if runit is checked
         run_migrations = self.parameterAsBool(parameters, self.RUN_MIGRATIONS, context)
         if not run_migrations:
@@ -87,12 +200,11 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
             return False, msg
 
         # Check that the connection name has been configured
-        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
         connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
         if not connection_name:
             return False, tr('You must use the "Configure plugin" alg to set the database connection name')
 
-        connection = metadata.findConnection(connection_name)
+        connection = connection_registry.find(connection_name)
         schema = self.parameterAsString(parameters, self.SCHEMA, context)
 
         # # Check that it corresponds to an existing connection
@@ -109,29 +221,50 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
 
         return super(UpgradeDatabaseStructure, self).checkParameterValues(parameters, context)
 
-    def processAlgorithm(self, parameters, context, feedback):
-        # Run migration
-        run_migrations = self.parameterAsBool(parameters, self.RUN_MIGRATIONS, context)
-        if not run_migrations:
-            msg = tr("Vous devez cocher cette case pour réaliser la mise à jour !")
-            raise QgsProcessingException(msg)
-
-        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
-        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+    def render_upgrade(self, parameters, context, feedback):
+        """Write the upgrade script to a file, without connecting to the database"""
+        render_path = self.parameterAsFileOutput(parameters, self.RENDER_FILE, context)
         schema = self.parameterAsString(parameters, self.SCHEMA, context)
+        db_version = self.parameterAsInt(parameters, self.FROM_VERSION, context)
+        current_version = resources.schema_version()
+        srid = resources.srid_value()
+
+        parts = install.iter_upgrade_script(
+            schema,
+            srid,
+            from_version=db_version,
+            version=current_version,
+            cache_dir=rewrite.cache_path(),
+        )
+        header = install.script_header(
+            tr(f"Upgrade of the structure from version '{db_version}' to '{current_version}'"),
+            schema,
+            srid,
+        )
+        count = install.write_script(Path(render_path), parts, header)
 
-        connection = metadata.findConnection(connection_name)
-
-        # Get database version
-        sql = f"""
-            SELECT me_version
-            FROM {schema}.metadata
-            WHERE me_status = 1
-            ORDER BY me_version_date DESC
-            LIMIT 1;
+        msg = tr(f"The upgrade script, in {count} parts, has been written to {render_path}")
+        feedback.pushInfo(msg)
+        return {self.RENDER_FILE: render_path, self.OUTPUT_STATUS: 1, self.OUTPUT_STRING: msg}
+
+    @staticmethod
+    def upgrade_structure(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        *,
+        feedback: QgsProcessingFeedback,
+        report: timing.TimingReport,
+        lock_timeout: int = upgrade.LOCK_TIMEOUT,
+        retries: int = upgrade.RETRIES,
+        accept_edited: bool = False,
+    ) -> tuple[int, bool]:
+        """Upgrade the structure to the plugin version
+
+        Return the installed version and whether something has been done.
         """
+        # Get database version
         try:
-            data = connection.executeSql(sql)
+            data = connection.executeSql(install.installed_version_sql(schema))
         except QgsProviderConnectionException as e:
             raise QgsProcessingException(str(e))
 
@@ -148,8 +281,156 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
         current_version = resources.schema_version()
         feedback.pushInfo(tr("Schema version") + " = {}".format(current_version))
 
+        if db_version > current_version:
+            raise QgsProcessingException(
+                tr(
+                    "The database structure version is newer than the plugin one."
+                    " You need to upgrade your plugin."
+                )
+            )
+
+        # Upgrade scripts are adapted to the schema only
+        srid = resources.srid_value()
+        cache_dir = rewrite.cache_path()
+
+        # Online phases left by an interrupted upgrade
+        pending = upgrade.online_phases(
+            schema,
+            srid,
+            ledger.applied_phases(connection, schema, phases.ONLINE_PHASES),
+            cache_dir,
+        )
+
+        # Nothing to do
+        if db_version == current_version and not pending:
+            return db_version, False
+
+        if db_version < current_version:
+            UpgradeDatabaseStructure.run_migrations(
+                connection,
+                schema,
+                srid,
+                db_version,
+                current_version,
+                cache_dir=cache_dir,
+                accept_edited=accept_edited,
+                feedback=feedback,
+                report=report,
+                lock_timeout=lock_timeout,
+                retries=retries,
+            )
+            # Then the online phases of the applied migrations
+            pending = upgrade.online_phases(
+                schema,
+                srid,
+                ledger.applied_phases(connection, schema, phases.ONLINE_PHASES),
+                cache_dir,
+            )
+
+        if pending:
+            feedback.pushInfo(tr(f"Running {len(pending)} phases outside of a transaction…"))
+            with pooled_connection(connection) as conn:
+                conn.autocommit = True
+                for phase in pending:
+                    upgrade.run_online_phase(
+                        conn,
+                        phase,
+                        schema=schema,
+                        feedback=feedback,
+                        report=report,
+                        lock_timeout=lock_timeout,
+                        retries=retries,
+                    )
+
+        return db_version, True
+
+    @staticmethod
+    def run_migrations(
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        srid: int,
+        db_version: int,
+        version: int,
+        *,
+        cache_dir: Path,
+        accept_edited: bool,
+        feedback: QgsProcessingFeedback,
+        report: timing.TimingReport,
+        lock_timeout: int,
+        retries: int,
+    ):
+        """Run the transactional phase of the migrations from the installed version"""
+        # Check the ledger against the migration files
+        applied = ledger.applied_migrations(connection, schema)
+        edited = ledger.edited_migrations(applied, resources.available_migrations())
+        if edited:
+            names = ", ".join(sql_file.name for sql_file in edited)
+            if not accept_edited:
+                raise QgsProcessingException(
+                    tr(f"Migration files have been edited since they were applied: {names}")
+                )
+            feedback.reportError(tr(f"Migration files edited since they were applied: {names}"))
+
+        skipped = [v for v in applied if v > db_version]
+        if skipped:
+            feedback.pushInfo(
+                tr(f"Versions {', '.join(map(str, skipped))} already applied according to the ledger")
+            )
+
+        migrations = upgrade.migrations(schema, srid, db_version, cache_dir, applied=applied)
+        manifest = resources.migration_manifest()
+        cost = sum(manifest[m.version].get("cost", 0) for m in migrations)
+        feedback.pushInfo(tr(f"{len(migrations)} migrations to apply, estimated cost {cost}"))
+
+        options = {
+            "schema": schema,
+            "version": version,
+            "feedback": feedback,
+            "report": report,
+            "lock_timeout": lock_timeout,
+            "retries": retries,
+        }
+        # Savepoints require an explicit transaction on a psycopg connection
+        if report.statements or upgrade.has_psycopg():
+            with pooled_connection(connection) as conn:
+                upgrade.run_upgrade(conn, migrations, **options)
+        else:
+            upgrade.run_upgrade_script(connection, migrations, **options)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        if self.parameterAsFileOutput(parameters, self.RENDER_FILE, context):
+            return self.render_upgrade(parameters, context, feedback)
+
+        # Run migration
+        run_migrations = self.parameterAsBool(parameters, self.RUN_MIGRATIONS, context)
+        if not run_migrations:
+            msg = tr("Vous devez cocher cette case pour réaliser la mise à jour !")
+            raise QgsProcessingException(msg)
+
+        connection_name = self.parameterAsConnectionName(parameters, self.CONNECTION_NAME, context)
+        schema = self.parameterAsString(parameters, self.SCHEMA, context)
+
+        connection = connection_registry.find(connection_name)
+
+        lock_timeout = self.parameterAsInt(parameters, self.LOCK_TIMEOUT, context)
+        retries = self.parameterAsInt(parameters, self.RETRIES, context)
+
+        report_path = self.parameterAsFileOutput(parameters, self.TIMING_REPORT, context)
+        report = timing.TimingReport(statements=bool(report_path))
+
+        db_version, upgraded = self.upgrade_structure(
+            connection,
+            schema,
+            feedback=feedback,
+            report=report,
+            lock_timeout=lock_timeout,
+            retries=retries,
+            accept_edited=self.parameterAsBool(parameters, self.ACCEPT_EDITED, context),
+        )
+        current_version = resources.schema_version()
+
         # Return if nothing to do
-        if db_version == current_version:
+        if not upgraded:
             return {
                 self.OUTPUT_STATUS: 1,
                 self.OUTPUT_STRING: tr(
@@ -157,53 +438,17 @@ class UpgradeDatabaseStructure(BaseDatabaseAlgorithm):
                 ),
             }
 
-        migrations = resources.available_migrations(db_version)
-
-        # Loop sql files and run SQL code
-        for new_db_version, sql_file in migrations:
-            with sql_file.open() as f:
-                sql = f.read()
-                if len(sql.strip()) == 0:
-                    feedback.pushInfo(f"* {sql_file.name}  -- SKIPPED (EMPTY FILE)")
-                    continue
-
-                # Replace default SCHEMA by user defined one
-                # Useful when the SQL calls functions or objects
-                # prefixed by the schema
-                if schema != resources.schema_name():
-                    sql = sql.replace(f"{resources.schema_name()}.", f"{schema}.")
-                    sql = sql.replace(f" {resources.schema_name()};", f" {schema};")
-
-                # Add SQL database version in adresse.metadata
-                feedback.pushInfo(tr("* NEW DB VERSION ") + str(new_db_version))
-                sql += f"""
-                    UPDATE {schema}.metadata
-                    SET (me_version, me_version_date)
-                    = ( '{new_db_version}', now()::timestamp(0) );
-                """
-
-                try:
-                    connection.executeSql(sql)
-                except QgsProviderConnectionException as e:
-                    feedback.reportError("Error when executing file {}".format(sql_file.name))
-                    connection.executeSql("ROLLBACK;")
-                    raise QgsProcessingException(str(e))
-
-                feedback.pushInfo(f"* {sql_file} -- OK !")
-
-        # Everything is fine, we now update to the plugin version
-        sql = f"""
-            UPDATE {schema}.metadata
-            SET (me_version, me_version_date)
-            = ( '{current_version}', now()::timestamp(0) );
-        """
-
-        try:
-            connection.executeSql(sql)
-        except QgsProviderConnectionException as e:
-            raise QgsProcessingException(str(e))
-
         msg = tr("*** THE DATABASE STRUCTURE HAS BEEN UPDATED ***")
         feedback.pushInfo(msg)
 
-        return {self.OUTPUT_STATUS: 1, self.OUTPUT_STRING: msg}
+        report.push_summary(feedback)
+        if report_path:
+            report.write(
+                Path(report_path),
+                algorithm=self.name(),
+                schema=schema,
+                from_version=db_version,
+                version=current_version,
+            )
+
+        return {self.TIMING_REPORT: report_path, self.OUTPUT_STATUS: 1, self.OUTPUT_STRING: msg}
@@ -1,5 +1,6 @@
 from qgis.core import (
     QgsAbstractDatabaseProviderConnection,
+    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProviderConnectionException,
 )
@@ -9,6 +10,7 @@ from ...plugin_tools import (
     resources,
 )
 from ..base_algorithm import BaseProcessingAlgorithm
+from ..tools import connection_registry
 
 
 class BaseDatabaseAlgorithm(BaseProcessingAlgorithm):
@@ -18,6 +20,14 @@ class BaseDatabaseAlgorithm(BaseProcessingAlgorithm):
     def groupId(self):
         return f"{resources.plugin_name_normalized()}_structure"
 
+    @staticmethod
+    def find_connection(connection_name: str) -> QgsAbstractDatabaseProviderConnection:
+        """Return the PostgreSQL connection or raise if it does not exist"""
+        connection = connection_registry.find(connection_name)
+        if not connection:
+            raise QgsProcessingException(f"La connexion {connection_name} n'existe pas.")
+        return connection
+
     @staticmethod
     def vacuum_all_tables(
         connection: QgsAbstractDatabaseProviderConnection,
@@ -0,0 +1,325 @@
+"""Install or upgrade of the structure on many targets at once.
+
+Used by the batch and fleet processing algorithms and the command line.
+"""
+
+import csv
+import queue
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsDataSourceUri,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProviderConnectionException,
+    QgsProviderRegistry,
+)
+
+from ...plugin_tools import resources
+from ...plugin_tools.i18n import tr
+from ..tools import connection_registry
+
+# Matrix and CSV columns
+TARGET_HEADERS = ("connection", "schema", "srid")
+
+
+@dataclass
+class Target:
+    """Where to install the structure
+
+    `connection` is either the name of a QGIS PostgreSQL connection
+    or a libpq connection string, such as `service=syndicat_1`.
+    """
+
+    connection: str
+    schema: str
+    srid: int
+
+    def __str__(self) -> str:
+        return f"{self.connection}/{self.schema}"
+
+
+@dataclass
+class TargetResult:
+    target: Target
+    success: bool
+    seconds: float
+    message: str
+    # Versions before and after an upgrade
+    from_version: Optional[int] = None
+    version: Optional[int] = None
+
+
+def parse_targets(rows: Iterable[Sequence[str]]) -> list[Target]:
+    """Return the targets from (connection, schema, srid) rows
+
+    The schema and the SRID default to the plugin ones when empty.
+    """
+    targets = []
+    for row in rows:
+        connection, schema, srid = [*(str(v).strip() for v in row), "", "", ""][:3]
+        if not connection:
+            continue
+        targets.append(
+            Target(
+                connection,
+                schema or resources.schema_name(),
+                int(srid.removeprefix("EPSG:")) if srid else resources.srid_value(),
+            )
+        )
+    return targets
+
+
+def read_targets(path: Path) -> list[Target]:
+    """Read the targets from a CSV file, with an optional header
+
+    The SRID column of the header may be left out.
+    """
+    with path.open(newline="") as f:
+        rows = [row for row in csv.reader(f) if row]
+    header = tuple(v.strip().lower() for v in rows[0][:3]) if rows else ()
+    if header and header == TARGET_HEADERS[: len(header)]:
+        rows = rows[1:]
+    return parse_targets(rows)
+
+
+def connection_targets(names: Optional[Iterable[str]] = None) -> list[Target]:
+    """Return a target with the default schema for each QGIS PostgreSQL connection
+
+    All the configured connections are used if no names are given.
+    """
+    if names is None:
+        names = connection_registry.names()
+    return parse_targets((name,) for name in sorted(names))
+
+
+def target_connection(connection: str) -> QgsAbstractDatabaseProviderConnection:
+    """Return the QGIS connection of a target"""
+    conn = connection_registry.find(connection)
+    if conn:
+        return conn
+    if "=" in connection:
+        metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
+        return metadata.createConnection(QgsDataSourceUri(connection).uri(False), {})
+    raise QgsProcessingException(tr(f"La connexion {connection} n'existe pas."))
+
+
+# Errors of a target reported in its result by the tasks
+TARGET_ERRORS = (QgsProcessingException, QgsProviderConnectionException, OSError)
+
+
+def error_message(error: Exception) -> str:
+    """Return the message of the error of a target"""
+    if isinstance(error, QgsProcessingException):
+        return str(error)
+    # Unexpected error, e.g. a bug or a missing module
+    return f"{type(error).__name__}: {error}"
+
+
+class TargetFeedback(QgsProcessingFeedback):
+    """Feedback of a target, or of a table of an import, run in a worker thread
+
+    Messages are queued, so that they are written by the main thread
+    with the name of the target.
+    """
+
+    def __init__(self, target: Union[Target, str], messages: queue.Queue):
+        super().__init__()
+        self.target = target
+        self.messages = messages
+
+    def pushInfo(self, text):
+        self.messages.put((self.target, False, text))
+
+    def reportError(self, text, fatalError=False):
+        self.messages.put((self.target, True, text))
+
+
+def install_target(
+    target: Target,
+    *,
+    override: bool,
+    feedback: QgsProcessingFeedback,
+    **options,
+) -> TargetResult:
+    """Install the structure on a target and return the result"""
+    from .alg_create import CreateDatabaseStructure
+
+    start = time.perf_counter()
+    try:
+        connection = target_connection(target.connection)
+        try:
+            exists = target.schema in connection.schemas()
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        if exists and not override:
+            raise QgsProcessingException(tr(f"Schema {target.schema} already exists in database !"))
+
+        CreateDatabaseStructure.install_structure(
+            connection,
+            target.schema,
+            target.srid,
+            version=resources.schema_version(),
+            override=override,
+            install_dir=resources.plugin_path().joinpath("install"),
+            feedback=feedback,
+            **options,
+        )
+    except TARGET_ERRORS as e:
+        # A failed target must not stop the others
+        return TargetResult(target, False, time.perf_counter() - start, error_message(e))
+    return TargetResult(target, True, time.perf_counter() - start, tr("Installed"))
+
+
+def upgrade_target(
+    target: Target,
+    *,
+    feedback: QgsProcessingFeedback,
+    **options,
+) -> TargetResult:
+    """Upgrade the structure of a target and return the result"""
+    from .alg_upgrade import UpgradeDatabaseStructure
+    from .timing import TimingReport
+
+    start = time.perf_counter()
+    db_version = None
+    try:
+        connection = target_connection(target.connection)
+        db_version, upgraded = UpgradeDatabaseStructure.upgrade_structure(
+            connection,
+            target.schema,
+            feedback=feedback,
+            report=TimingReport(),
+            **options,
+        )
+    except TARGET_ERRORS as e:
+        # A failed target must not stop the others
+        return TargetResult(
+            target,
+            False,
+            time.perf_counter() - start,
+            error_message(e),
+            from_version=db_version,
+        )
+    return TargetResult(
+        target,
+        True,
+        time.perf_counter() - start,
+        tr("Upgraded") if upgraded else tr("Up to date"),
+        from_version=db_version,
+        version=resources.schema_version(),
+    )
+
+
+def run_batch(
+    targets: Sequence[Target],
+    *,
+    workers: int,
+    feedback: QgsProcessingFeedback,
+    task: Callable[..., TargetResult] = install_target,
+    **options,
+) -> list[TargetResult]:
+    """Run the task on the targets, with at most `workers` at once
+
+    The task is `install_target` or `upgrade_target`. A failed target,
+    whatever its error, does not stop the others. Progress and messages
+    are reported in the feedback, prefixed with the target. Other options are passed to the
+    task.
+    """
+    messages: queue.Queue = queue.Queue()
+    results: list[Optional[TargetResult]] = [None] * len(targets)
+    target_feedbacks = [TargetFeedback(target, messages) for target in targets]
+
+    def flush():
+        while not messages.empty():
+            target, error, text = messages.get()
+            if error:
+                feedback.reportError(f"[{target}] {text}")
+            else:
+                feedback.pushInfo(f"[{target}] {text}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {
+            executor.submit(
+                task,
+                target,
+                feedback=target_feedback,
+                **options,
+            ): index
+            for index, (target, target_feedback) in enumerate(zip(targets, target_feedbacks))
+        }
+        done_count = 0
+        while running:
+            done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+            flush()
+            if feedback.isCanceled():
+                for future in running:
+                    future.cancel()
+                for target_feedback in target_feedbacks:
+                    target_feedback.cancel()
+            for future in done:
+                index = running.pop(future)
+                if future.cancelled():
+                    result = TargetResult(targets[index], False, 0.0, tr("Canceled"))
+                else:
+                    try:
+                        result = future.result()
+                    except Exception as e:  # noqa: BLE001
+                        # Any other error of a target, e.g. a bug or a missing module,
+                        # must not stop the others
+                        result = TargetResult(targets[index], False, 0.0, error_message(e))
+                results[index] = result
+                done_count += 1
+                feedback.setProgress(100 * done_count / len(targets))
+                if result.success:
+                    feedback.pushInfo(f"[{result.target}] {result.message} ({result.seconds:.1f}s)")
+                else:
+                    feedback.reportError(f"[{result.target}] {result.message}")
+    flush()
+
+    return [result for result in results if result is not None]
+
+
+def summary(results: Sequence[TargetResult], done: Optional[str] = None) -> str:
+    """Return the consolidated summary of a batch
+
+    `done` qualifies the successful targets, `installed` by default.
+    """
+    if done is None:
+        done = tr("installed")
+    failed = [result for result in results if not result.success]
+    lines = [tr(f"{len(results)} targets: {len(results) - len(failed)} {done}, {len(failed)} failed")]
+    for result in results:
+        status = "OK" if result.success else tr("FAILED")
+        versions = ""
+        if result.from_version is not None:
+            versions = f"{result.from_version} -> {result.version if result.success else '?'} "
+        # Only the first line of the error, the matrix holds the whole message
+        message = result.message.partition("\n")[0]
+        lines.append(f"  {status:6} {result.target} {versions}({result.seconds:.1f}s) {message}")
+    return "\n".join(lines)
+
+
+def write_matrix(path: Path, results: Sequence[TargetResult]):
+    """Write the result of each target as a CSV file"""
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("connection", "schema", "status", "from_version", "version", "seconds", "message"))
+        for result in results:
+            writer.writerow(
+                (
+                    result.target.connection,
+                    result.target.schema,
+                    "OK" if result.success else "FAILED",
+                    "" if result.from_version is None else result.from_version,
+                    "" if result.version is None else result.version,
+                    f"{result.seconds:.1f}",
+                    result.message,
+                )
+            )
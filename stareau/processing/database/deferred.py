@@ -0,0 +1,195 @@
+"""Install profile building the indexes and constraints after the data load.
+
+The install statements are split in two phases: the bare tables are
+created first, and the indexes and constraints are built in a final
+phase, once the legacy data has been loaded. Loading data in tables
+without index is much faster than maintaining the indexes row by row.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from qgis.core import QgsProcessingException, QgsProcessingFeedback
+
+from ...plugin_tools.i18n import tr
+from ...plugin_tools.sql import NAME, split_statements
+
+if TYPE_CHECKING:
+    import psycopg
+
+# Statements building an index or a constraint
+DEFERRED_STATEMENT = re.compile(
+    r"^\s*(?:CREATE\s+(?:UNIQUE\s+)?INDEX\b"
+    r"|ALTER\s+TABLE\s+(?:ONLY\s+)?[^;]*?\bADD\s+CONSTRAINT\s+"
+    rf"(?:{NAME})\s+(?:PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|EXCLUDE)\b)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+CREATE_TABLE = re.compile(
+    r"^\s*CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?P<table>(?:{NAME})\s*\.\s*(?:{NAME})|{NAME})",
+    re.IGNORECASE,
+)
+
+# Table constraints declared in the CREATE TABLE statement
+INLINE_CONSTRAINT = re.compile(
+    rf",\s*CONSTRAINT\s+(?P<name>{NAME})\s+(?P<kind>PRIMARY\s+KEY|UNIQUE)\s*\((?P<columns>[^)]*)\)",
+    re.IGNORECASE,
+)
+
+
+def is_deferred(code: str) -> bool:
+    """Whether the statement builds an index or a constraint"""
+    return DEFERRED_STATEMENT.match(code) is not None
+
+
+def split_parts(
+    parts: Iterable[tuple[str, str]],
+    keep_schemas: Iterable[str],
+    deferred: list[tuple[str, str]],
+) -> Iterator[tuple[str, str]]:
+    """Remove the index and constraint statements from the install parts
+
+    The removed statements are appended to `deferred`, with the primary
+    keys and unique constraints declared in the CREATE TABLE statements
+    first. The constraints of the tables in `keep_schemas` are kept, for
+    instance for the glossaries which are loaded with `ON CONFLICT`.
+    """
+    keep_schemas = {schema.lower() for schema in keep_schemas}
+    table_constraints = []
+    for name, sql in parts:
+        statements = []
+        for text, code in split_statements(sql):
+            if is_deferred(code):
+                deferred.append((name, text))
+                continue
+
+            m = CREATE_TABLE.match(code)
+            if m and m.group("table").split(".")[0].strip().strip('"').lower() not in keep_schemas:
+                table = m.group("table")
+                for constraint in INLINE_CONSTRAINT.finditer(code):
+                    constraint_sql = (
+                        f"ALTER TABLE ONLY {table} ADD CONSTRAINT {constraint.group('name')} "
+                        f"{constraint.group('kind')} ({constraint.group('columns')})"
+                    )
+                    table_constraints.append((name, constraint_sql))
+                # The comments are dropped with the constraints
+                text = INLINE_CONSTRAINT.sub("", code).strip()
+
+            statements.append(text)
+        yield name, ";\n".join(statements)
+
+    deferred[:0] = table_constraints
+
+
+def load_data(
+    conn: "psycopg.Connection",
+    conninfo: str,
+    source: Path,
+    feedback: QgsProcessingFeedback,
+):
+    """Load the legacy data in the bare tables
+
+    The source may be:
+
+    * a SQL file, run with `psql`
+    * a pg_dump archive (custom or directory format), restored with
+      `pg_restore --data-only`
+    * a directory of CSV files with a header, named `schema.table.csv`,
+      loaded with COPY
+    """
+    if source.is_dir() and not source.joinpath("toc.dat").exists():
+        for csv_file in sorted(source.glob("*.csv")):
+            schema, _, table = csv_file.stem.partition(".")
+            if not table:
+                feedback.reportError(tr(f"{csv_file.name} is not named as schema.table.csv, skipped"))
+                continue
+            load_csv(conn, schema, table, csv_file, feedback)
+        return
+
+    if source.suffix.lower() == ".sql":
+        command = ["psql", "--quiet", "--no-psqlrc", "--set", "ON_ERROR_STOP=1", "--file", str(source)]
+    else:
+        command = ["pg_restore", "--data-only", "--no-owner", "--exit-on-error", str(source)]
+    run_client(command, conninfo, feedback)
+
+
+def load_csv(
+    conn: "psycopg.Connection",
+    schema: str,
+    table: str,
+    csv_file: Path,
+    feedback: QgsProcessingFeedback,
+):
+    """Stream a CSV file with a header in a table"""
+    import psycopg
+
+    from psycopg import sql
+
+    with csv_file.open("rb") as f:
+        header = f.readline().decode().strip()
+        columns = [sql.Identifier(column.strip().strip('"')) for column in header.split(",")]
+        statement = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT csv)").format(
+            sql.Identifier(schema, table),
+            sql.SQL(", ").join(columns),
+        )
+        try:
+            with conn.transaction(), conn.cursor() as cur, cur.copy(statement) as copy:
+                while data := f.read(1 << 20):
+                    copy.write(data)
+        except psycopg.Error as e:
+            raise QgsProcessingException(f"{csv_file.name}: {e}") from None
+    feedback.pushInfo(tr(f"{csv_file.name}: loaded"))
+
+
+def passfile_line(password: str) -> str:
+    """Return the line of a password file matching any server, database and user"""
+    password = password.replace("\\", "\\\\").replace(":", "\\:")
+    return f"*:*:*:*:{password}\n"
+
+
+def run_client(command: list[str], conninfo: str, feedback: QgsProcessingFeedback):
+    """Run a PostgreSQL client tool on the database
+
+    The password is not passed on the command line, which may be read by
+    the other users of the system, but in a temporary password file.
+    """
+    from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+    executable = shutil.which(command[0])
+    if not executable:
+        raise QgsProcessingException(
+            tr(f"The PostgreSQL client '{command[0]}' is required to load the data.")
+        )
+
+    params = conninfo_to_dict(conninfo)
+    password = params.pop("password", None)
+    if password is not None:
+        params.pop("passfile", None)
+    conninfo = make_conninfo("", **params)
+
+    # psql takes the database as its last argument, pg_restore with -d
+    if command[0] == "pg_restore":
+        args = [executable, "--dbname", conninfo, *command[1:]]
+    else:
+        args = [executable, *command[1:], conninfo]
+
+    feedback.pushInfo(" ".join(command))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        if password is not None:
+            passfile = Path(tmp, "pgpass")
+            passfile.touch(mode=0o600)
+            passfile.write_text(passfile_line(str(password)))
+            env["PGPASSFILE"] = str(passfile)
+        result = subprocess.run(args, capture_output=True, text=True, check=False, env=env)
+    for line in result.stderr.splitlines():
+        feedback.pushInfo(line)
+    if result.returncode != 0:
+        raise QgsProcessingException(tr(f"{command[0]} failed with the code {result.returncode}"))
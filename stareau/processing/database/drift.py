@@ -0,0 +1,192 @@
+"""Detection of the drift of a deployed structure.
+
+A snapshot of the catalog of all the schemas of the structure is taken
+with a handful of queries, one per kind of object, whatever the number
+of objects. It is compared with the model of the structure shipped
+with the plugin, which is the snapshot of a fresh install in the plugin
+schema, with the plugin SRID: the model is rewritten for the checked
+schema and SRID before the comparison, as are the install scripts.
+"""
+
+import json
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsProcessingException,
+    QgsProviderConnectionException,
+)
+
+from ...plugin_tools import resources
+from . import install
+from .glossary import sql_literal
+from .rewrite import SqlRewriter
+from .timing import TimingReport
+
+MODEL_FILE = "structure.json"
+
+# Bump when the snapshot queries change, to refuse the older models
+MODEL_FORMAT = 1
+
+# One query per kind of object, returning (name, definition) rows.
+# `{schemas}` is the array of the schemas of the structure.
+SNAPSHOT_QUERIES = {
+    "relations": """
+        SELECT n.nspname || '.' || c.relname, c.relkind::text
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY({schemas}) AND c.relkind IN ('r', 'p', 'v', 'm', 'f', 'S')""",
+    "columns": """
+        SELECT
+            n.nspname || '.' || c.relname || '.' || a.attname,
+            format_type(a.atttypid, a.atttypmod)
+            || CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END
+            || coalesce(' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid), '')
+        FROM pg_catalog.pg_attribute a
+        JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+        WHERE n.nspname = ANY({schemas}) AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+        AND a.attnum > 0 AND NOT a.attisdropped""",
+    "inheritance": """
+        SELECT
+            n.nspname || '.' || c.relname,
+            string_agg(pn.nspname || '.' || p.relname, ', ' ORDER BY i.inhseqno)
+        FROM pg_catalog.pg_inherits i
+        JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_catalog.pg_class p ON p.oid = i.inhparent
+        JOIN pg_catalog.pg_namespace pn ON pn.oid = p.relnamespace
+        WHERE n.nspname = ANY({schemas})
+        GROUP BY 1""",
+    "indexes": """
+        SELECT n.nspname || '.' || c.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class c ON c.oid = i.indexrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY({schemas})""",
+    # Constraints of the tables and of the domains, but the not null
+    # constraints which are part of the columns
+    "constraints": """
+        SELECT
+            n.nspname || '.' || coalesce(c.relname, t.typname) || '.' || k.conname,
+            pg_get_constraintdef(k.oid)
+        FROM pg_catalog.pg_constraint k
+        JOIN pg_catalog.pg_namespace n ON n.oid = k.connamespace
+        LEFT JOIN pg_catalog.pg_class c ON c.oid = k.conrelid
+        LEFT JOIN pg_catalog.pg_type t ON t.oid = k.contypid
+        WHERE n.nspname = ANY({schemas}) AND k.contype <> 'n'""",
+    "comments": """
+        SELECT
+            n.nspname || '.' || c.relname || coalesce('.' || a.attname, ''),
+            d.description
+        FROM pg_catalog.pg_description d
+        JOIN pg_catalog.pg_class c ON c.oid = d.objoid AND d.classoid = 'pg_catalog.pg_class'::regclass
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum = d.objsubid
+        WHERE n.nspname = ANY({schemas}) AND (d.objsubid = 0 OR a.attnum IS NOT NULL)""",
+}
+
+# Kinds of objects whose definition is SQL, rewritten for the checked schema
+SQL_DEFINITIONS = ("columns", "inheritance", "indexes", "constraints")
+
+
+@dataclass
+class Difference:
+    kind: str
+    name: str
+    expected: Optional[str]
+    actual: Optional[str]
+
+    @property
+    def status(self) -> str:
+        if self.actual is None:
+            return "missing"
+        if self.expected is None:
+            return "unexpected"
+        return "changed"
+
+    def __str__(self) -> str:
+        if self.status == "changed":
+            return f"{self.status} {self.kind[:-1]} {self.name}: {self.actual} (expected {self.expected})"
+        return f"{self.status} {self.kind[:-1]} {self.name}"
+
+
+def model_path() -> Path:
+    """Return the path of the model shipped with the plugin"""
+    return resources.plugin_path("install", MODEL_FILE)
+
+
+def snapshot(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+    report: Optional[TimingReport] = None,
+) -> dict[str, dict[str, str]]:
+    """Return the definition of each object of the structure, by kind"""
+    schemas = f"ARRAY[{', '.join(sql_literal(name) for name in install.schemas(schema))}]::name[]"
+    report = report or TimingReport()
+    result = {}
+    for kind, sql in SNAPSHOT_QUERIES.items():
+        try:
+            with report.measure("query", kind):
+                rows = connection.executeSql(sql.format(schemas=schemas))
+        except QgsProviderConnectionException as e:
+            raise QgsProcessingException(str(e))
+        result[kind] = {name: definition for name, definition in rows}
+    return result
+
+
+def write_model(path: Path, objects: dict[str, dict[str, str]], version: int):
+    """Write the snapshot of a fresh install as the model of the structure"""
+    data = {
+        "format": MODEL_FORMAT,
+        "version": version,
+        "schema": resources.schema_name(),
+        "srid": resources.srid_value(),
+        "objects": {kind: dict(sorted(objects[kind].items())) for kind in SNAPSHOT_QUERIES},
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+
+def read_model(path: Path) -> dict:
+    """Read a model written by `write_model`"""
+    try:
+        data = json.loads(path.read_text())
+    except OSError as e:
+        raise QgsProcessingException(f"Cannot read the structure model {path}: {e}")
+    except ValueError as e:
+        raise QgsProcessingException(f"Invalid structure model {path}: {e}")
+    if data.get("format") != MODEL_FORMAT:
+        raise QgsProcessingException(f"The structure model {path} has been written by another plugin version")
+    return data
+
+
+def expected_objects(model: dict, schema: str, srid: int) -> dict[str, dict[str, str]]:
+    """Return the objects of the model, rewritten for the schema and SRID"""
+    rewriter = SqlRewriter(schema, srid)
+    result = {}
+    for kind, objects in model["objects"].items():
+        rewrite = rewriter.rewrite if kind in SQL_DEFINITIONS else str
+        result[kind] = {
+            rewriter.rename(name.split(".", 1)[0]) + "." + name.split(".", 1)[1]: rewrite(definition)
+            for name, definition in objects.items()
+        }
+    return result
+
+
+def compare(
+    expected: dict[str, dict[str, str]],
+    actual: dict[str, dict[str, str]],
+) -> list[Difference]:
+    """Return the differences between the expected and the actual objects"""
+    differences = []
+    for kind in SNAPSHOT_QUERIES:
+        expected_kind = expected.get(kind, {})
+        actual_kind = actual.get(kind, {})
+        for name in sorted(expected_kind.keys() | actual_kind.keys()):
+            if expected_kind.get(name) != actual_kind.get(name):
+                differences.append(Difference(kind, name, expected_kind.get(name), actual_kind.get(name)))
+    return differences
@@ -0,0 +1,110 @@
+"""Glossary (StaR-Eau list of values) data loading."""
+
+import csv
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from qgis.core import QgsProcessingException, QgsProcessingFeedback
+
+if TYPE_CHECKING:
+    import psycopg
+
+# Values added to every glossary table
+ADDITIONAL_VALUES = (
+    ("non_renseigne", "Non renseigné(e)", "information en recherche ou disponible mais non saisie"),
+    ("non_concerne", "Non concerné(e)", "information non possible ou non pertinente pour l'élément décrit"),
+    ("non_valide", "Non validé(e)", "information existe mais n'est pas officiellement validée"),
+    ("non_determine", "Non déterminé(e)", "information inconnue ou non disponible et ne peut pas l'être"),
+    ("autre", "Autre", "ne figure pas dans la liste ci-dessus. cf. commentaire"),
+)
+
+GlossaryRow = tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def glossary_files(install_dir: Path) -> list[Path]:
+    """Return the glossary CSV files, one per table of the `_valeur` schema."""
+    return sorted(install_dir.joinpath("csv", "StaR-Eau").glob("*.csv"))
+
+
+def glossary_rows(csv_file: Path) -> Iterator[GlossaryRow]:
+    """Iterate over the (code, valeur, description) rows of a glossary file
+
+    Empty fields are returned as empty strings, and the rows without code
+    as NULL values. The rows common to all glossaries are yielded after
+    the file rows.
+    """
+    with csv_file.open(newline="") as f:
+        for row in csv.reader(f):
+            code, valeur, description = [*row, "", "", ""][:3]
+            if not code:
+                yield (None, None, None)
+                continue
+            yield (code, valeur, description)
+    yield from ADDITIONAL_VALUES
+
+
+def sql_literal(value: Optional[str]) -> str:
+    """Quote a value as a SQL string literal"""
+    if value is None:
+        return "NULL"
+    return "'" + value.replace("'", "''") + "'"
+
+
+def glossary_insert_sql(schema: str, csv_file: Path) -> str:
+    """Return the INSERT statement loading a glossary file"""
+    values = ",\n".join(f"({', '.join(sql_literal(v) for v in row)})" for row in glossary_rows(csv_file))
+    return (
+        f"INSERT INTO {schema}_valeur.{csv_file.stem} (code, valeur, description) VALUES\n"
+        f"{values}\n"
+        f"ON CONFLICT (code) DO NOTHING"
+    )
+
+
+def copy_glossaries(
+    conn: "psycopg.Connection",
+    schema: str,
+    install_dir: Path,
+    feedback: QgsProcessingFeedback,
+) -> int:
+    """Load all the glossaries with COPY, in a single transaction
+
+    Rows are streamed from the CSV files into a staging table, then
+    merged in each `_valeur` table. Return the number of loaded rows.
+    """
+    import psycopg
+
+    from psycopg import sql
+
+    files = glossary_files(install_dir)
+    count = 0
+    try:
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMPORARY TABLE glossary_staging "
+                "(table_name text, code text, valeur text, description text) "
+                "ON COMMIT DROP"
+            )
+            with cur.copy("COPY glossary_staging (table_name, code, valeur, description) FROM STDIN") as copy:
+                for csv_file in files:
+                    feedback.pushInfo(csv_file.name)
+                    for row in glossary_rows(csv_file):
+                        copy.write_row((csv_file.stem, *row))
+                        count += 1
+
+            # Send all the merge statements at once
+            with conn.pipeline():
+                for csv_file in files:
+                    cur.execute(
+                        sql.SQL(
+                            "INSERT INTO {} (code, valeur, description) "
+                            "SELECT code, valeur, description FROM glossary_staging "
+                            "WHERE table_name = %s "
+                            "ON CONFLICT (code) DO NOTHING"
+                        ).format(sql.Identifier(f"{schema}_valeur", csv_file.stem)),
+                        (csv_file.stem,),
+                    )
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+
+    return count
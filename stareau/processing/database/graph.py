@@ -0,0 +1,335 @@
+"""Graph of the network, for the traces.
+
+The pipes of a network are the edges of the graph, from their initial
+node to their terminal node, and the nodes are given integer ids. The
+graph is stored in arrays: the edges leaving and entering each node are
+stored as compressed sparse rows, so that a trace only walks integer
+arrays.
+
+The graphs are kept in memory, for each database, schema and network.
+The signature of a graph is the latest `date_maj` and the number of rows
+of its tables, and the time of the last topology build: a graph is
+loaded again when its signature has changed. Unlike the statistics of
+the server, the signature is up to date as soon as an edit is committed,
+and it is not changed by a rolled back edit.
+"""
+
+import threading
+
+from array import array
+from contextlib import closing
+from dataclasses import dataclass
+from itertools import compress
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsDataSourceUri,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+)
+
+from ...plugin_tools.i18n import tr
+from ..tools import iter_query, pooled_connection, psycopg_module
+from . import topology
+
+if TYPE_CHECKING:
+    import psycopg
+
+DOWNSTREAM = "downstream"
+UPSTREAM = "upstream"
+CONNECTED = "connected"
+
+# Number of rows fetched at once when loading a graph
+FETCH_SIZE = 10000
+
+# Table index of the nodes which are only known from the pipes
+NO_TABLE = -1
+
+
+def compressed_rows(size: int, keys: array) -> tuple[array, array]:
+    """Return the offsets and the items of compressed sparse rows
+
+    The items of row `i` are the indexes of `keys` equal to `i`, stored
+    from `offsets[i]` to `offsets[i + 1]`.
+    """
+    offsets = array("l", bytes(array("l").itemsize * (size + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    items = array("l", bytes(array("l").itemsize * len(keys)))
+    position = array("l", offsets[:-1])
+    for item, key in enumerate(keys):
+        items[position[key]] = item
+        position[key] += 1
+    return offsets, items
+
+
+@dataclass
+class Trace:
+    nodes: list[int]
+    edges: list[int]
+
+
+class NetworkGraph:
+    """Graph of the pipes and the nodes of a network"""
+
+    def __init__(self, tables: list[str]):
+        self.tables = tables
+        self.node_index: dict[str, int] = {}
+        self.node_table = array("h")
+        self.node_fid = array("l")
+        self.edge_table = array("h")
+        self.edge_fid = array("l")
+        self.edge_from = array("l")
+        self.edge_to = array("l")
+        self.edge_index: dict[tuple[int, int], int] = {}
+        # Edges leaving each node, and the nodes they enter
+        self.out_offsets = array("l")
+        self.out_edges = array("l")
+        self.out_nodes = array("l")
+        # Edges entering each node, and the nodes they leave
+        self.in_offsets = array("l")
+        self.in_edges = array("l")
+        self.in_nodes = array("l")
+        self._components: Optional[array] = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_table)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_from)
+
+    def node(self, node_id: str, table: int = NO_TABLE, fid: int = 0) -> int:
+        """Return the integer id of a node, added if it is not known yet"""
+        node = self.node_index.get(node_id)
+        if node is None:
+            node = self.node_index[node_id] = len(self.node_table)
+            self.node_table.append(table)
+            self.node_fid.append(fid)
+        elif table != NO_TABLE:
+            self.node_table[node] = table
+            self.node_fid[node] = fid
+        return node
+
+    def add_edge(self, start: str, end: str, table: int, fid: int):
+        self.edge_index[(table, fid)] = len(self.edge_from)
+        self.edge_from.append(self.node(start))
+        self.edge_to.append(self.node(end))
+        self.edge_table.append(table)
+        self.edge_fid.append(fid)
+
+    def build(self):
+        """Build the compressed sparse rows of the edges leaving and entering the nodes"""
+        self._components = None
+        self.out_offsets, self.out_edges = compressed_rows(self.node_count, self.edge_from)
+        self.out_nodes = array("l", (self.edge_to[edge] for edge in self.out_edges))
+        self.in_offsets, self.in_edges = compressed_rows(self.node_count, self.edge_to)
+        self.in_nodes = array("l", (self.edge_from[edge] for edge in self.in_edges))
+
+    def edge(self, table: str, fid: int) -> Optional[int]:
+        """Return the edge of a pipe, if it is in the graph"""
+        if table not in self.tables:
+            return None
+        return self.edge_index.get((self.tables.index(table), fid))
+
+    def components(self) -> array:
+        """Return the connected component of each node, computed once for the graph"""
+        if self._components is not None:
+            return self._components
+        out_offsets, out_nodes = self.out_offsets, self.out_nodes
+        in_offsets, in_nodes = self.in_offsets, self.in_nodes
+        labels = array("l", [-1]) * self.node_count
+        for start in range(self.node_count):
+            if labels[start] >= 0:
+                continue
+            labels[start] = start
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for end in out_nodes[out_offsets[node] : out_offsets[node + 1]]:
+                    if labels[end] < 0:
+                        labels[end] = start
+                        stack.append(end)
+                for end in in_nodes[in_offsets[node] : in_offsets[node + 1]]:
+                    if labels[end] < 0:
+                        labels[end] = start
+                        stack.append(end)
+        self._components = labels
+        return labels
+
+    def trace(self, nodes: Iterable[int], direction: str) -> Trace:
+        """Return the nodes and the edges reached from the nodes in the direction
+
+        The walk only marks the reached nodes: the reached edges are the
+        ones leaving a reached node, or entering one for an upstream trace.
+        """
+        if direction == CONNECTED:
+            labels = self.components()
+            wanted = {labels[node] for node in nodes}
+            seen = bytearray(map(wanted.__contains__, labels))
+        else:
+            if direction == UPSTREAM:
+                offsets, ends = self.in_offsets, self.in_nodes
+            else:
+                offsets, ends = self.out_offsets, self.out_nodes
+            seen = bytearray(self.node_count)
+            stack = []
+            for node in nodes:
+                if not seen[node]:
+                    seen[node] = 1
+                    stack.append(node)
+            push = stack.append
+            pop = stack.pop
+            while stack:
+                node = pop()
+                for end in ends[offsets[node] : offsets[node + 1]]:
+                    if not seen[end]:
+                        seen[end] = 1
+                        push(end)
+
+        edge_nodes = self.edge_to if direction == UPSTREAM else self.edge_from
+        return Trace(
+            list(compress(range(self.node_count), seen)),
+            list(compress(range(self.edge_count), map(seen.__getitem__, edge_nodes))),
+        )
+
+    def features(self, trace: Trace) -> dict[str, list[int]]:
+        """Return the fids of the features of a trace, by table"""
+        fids: dict[str, list[int]] = {table: [] for table in self.tables}
+        for edge in trace.edges:
+            fids[self.tables[self.edge_table[edge]]].append(self.edge_fid[edge])
+        for node in trace.nodes:
+            table = self.node_table[node]
+            if table != NO_TABLE:
+                fids[self.tables[table]].append(self.node_fid[node])
+        return fids
+
+
+def graph_tables(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+    network: str,
+    branches: bool,
+) -> tuple[list[str], list[str]]:
+    """Return the pipe and the node tables of a network"""
+    for tables in topology.network_tables(connection, schema):
+        if tables.network == network:
+            break
+    else:
+        raise QgsProcessingException(tr(f"The structure is not installed in the schema {schema}"))
+
+    def keep(table: str) -> bool:
+        return branches or not table.split(".")[0].endswith("_brcht")
+
+    return [t for t in tables.pipes if keep(t)], [t for t in tables.nodes if keep(t)]
+
+
+def signature_sql(schema: str, tables: list[str], topology_build: bool) -> str:
+    """Return the SQL reading the signature of the tables of a graph"""
+    rows = "\n            UNION ALL\n".join(
+        f"            SELECT date_maj FROM ONLY {table}" for table in tables
+    )
+    built_at = (
+        f"(SELECT max(built_at) FROM {schema}.{topology.TOPOLOGY_TABLE})::text" if topology_build else "NULL"
+    )
+    return f"""
+        SELECT max(date_maj)::text, count(*), {built_at}
+        FROM (
+{rows}
+        ) t"""
+
+
+def signature(conn: "psycopg.Connection", schema: str, tables: list[str]) -> tuple:
+    """Return the signature of the tables of a graph"""
+    row = conn.execute(f"SELECT to_regclass('{schema}.{topology.TOPOLOGY_TABLE}') IS NOT NULL").fetchone()
+    topology_build = bool(row and row[0])
+    return tuple(conn.execute(signature_sql(schema, tables, topology_build)).fetchone() or ())
+
+
+def edges_sql(pipes: list[str]) -> str:
+    """Return the SQL reading the edges of the graph, with the index of their table"""
+    return "\nUNION ALL\n".join(
+        f"SELECT noeudinitial, noeudterminal, {index}, fid FROM ONLY {table} "
+        "WHERE noeudinitial <> '' AND noeudterminal <> ''"
+        for index, table in enumerate(pipes)
+    )
+
+
+def nodes_sql(nodes: list[str], first_index: int) -> str:
+    """Return the SQL reading the nodes of the graph, with the index of their table"""
+    return "\nUNION ALL\n".join(
+        f"SELECT id_noeud_reseau, {index}, fid FROM ONLY {table}"
+        for index, table in enumerate(nodes, first_index)
+    )
+
+
+def load_graph(
+    connection: QgsAbstractDatabaseProviderConnection,
+    pipes: list[str],
+    nodes: list[str],
+) -> NetworkGraph:
+    """Load the graph of the pipes and the nodes, streamed with `iter_query`"""
+    graph = NetworkGraph(pipes + nodes)
+    with closing(iter_query(connection, nodes_sql(nodes, len(pipes)), fetch_size=FETCH_SIZE)) as rows:
+        for node_id, table, fid in rows:
+            graph.node(node_id, table, fid)
+    with closing(iter_query(connection, edges_sql(pipes), fetch_size=FETCH_SIZE)) as rows:
+        for start, end, table, fid in rows:
+            graph.add_edge(start, end, table, fid)
+    graph.build()
+    return graph
+
+
+class GraphCache:
+    """Graphs of the networks, kept in memory while their tables are not modified"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graphs: dict[tuple, tuple[tuple, NetworkGraph]] = {}
+        self.loads = 0
+
+    def get(
+        self,
+        connection: QgsAbstractDatabaseProviderConnection,
+        schema: str,
+        network: str,
+        *,
+        branches: bool,
+        feedback: Optional[QgsProcessingFeedback] = None,
+    ) -> NetworkGraph:
+        """Return the graph of a network, loaded again if its tables have been modified"""
+        psycopg = psycopg_module()
+
+        pipes, nodes = graph_tables(connection, schema, network, branches)
+        key = (QgsDataSourceUri(connection.uri()).connectionInfo(False), schema, network, branches)
+        try:
+            with pooled_connection(connection) as conn:
+                current = signature(conn, schema, pipes + nodes)
+        except psycopg.Error as e:
+            raise QgsProcessingException(str(e)) from None
+
+        with self._lock:
+            cached = self._graphs.get(key)
+        if cached and cached[0] == current:
+            return cached[1]
+
+        if feedback:
+            feedback.pushInfo(tr(f"Loading the graph of the {network} network"))
+        graph = load_graph(connection, pipes, nodes)
+
+        with self._lock:
+            self._graphs[key] = (current, graph)
+            self.loads += 1
+        return graph
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+
+# Shared by the algorithm runs of the QGIS session
+graph_cache = GraphCache()
@@ -0,0 +1,581 @@
+"""Import of network data from GeoPackage or Shapefile layers.
+
+Each source layer is mapped to a table of the structure, by its name or
+with a mapping file, and its fields to the columns of the same name.
+The features are streamed to the table with a binary COPY, so they are
+never all held in memory, whatever the size of the layer. The layers of
+different tables are loaded at once, on several connections; the layers
+of the same table one after the other.
+
+The columns inherited from `champ_commun` which are not mapped, or
+are NULL in the source, are filled with common values given for the
+import.
+
+The mapping file is a JSON file such as::
+
+    {
+      "layers": {
+        "canalisations": {
+          "table": "stareau_aep.aep_canalisation",
+          "fields": {"materiau": "MAT", "diametre_nominal": "DN"}
+        }
+      }
+    }
+"""
+
+import contextlib
+import json
+import queue
+import struct
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Sequence
+
+from qgis.core import (
+    Qgis,
+    QgsAbstractDatabaseProviderConnection,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsFeatureRequest,
+    QgsFeatureSource,
+    QgsFields,
+    QgsGeometry,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProviderConnectionException,
+    QgsProviderRegistry,
+    QgsVectorLayer,
+    QgsVectorLayerFeatureSource,
+    QgsWkbTypes,
+)
+from qgis.PyQt.QtCore import QDate, QDateTime, QTime, QVariant
+
+from ...plugin_tools.i18n import tr
+from ..tools import pooled_connection
+from . import install, project
+from .batch import TargetFeedback
+from .glossary import sql_literal
+
+if TYPE_CHECKING:
+    import psycopg
+
+# Number of features copied between two checks of the progress and cancelation
+BATCH_SIZE = 10000
+
+# Columns of champ_commun set to the time of the import when not mapped
+IMPORT_TIME_COLUMNS = ("date_creation", "date_maj")
+
+# Flag of the EWKB type telling that the SRID follows the type
+EWKB_SRID_FLAG = 0x20000000
+
+TRUE_VALUES = ("1", "t", "true", "o", "oui", "y", "yes")
+FALSE_VALUES = ("0", "f", "false", "n", "non", "no")
+
+
+def to_bool(value: object) -> bool:
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f"invalid boolean: {value}")
+    return bool(value)
+
+
+def to_date(value: object) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def to_datetime(value: object) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value))
+
+
+# Conversion of the source values to the base type of the columns
+CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "int2": int,
+    "int4": int,
+    "int8": int,
+    "float4": float,
+    "float8": float,
+    "numeric": lambda value: Decimal(str(value)),
+    "bool": to_bool,
+    "text": str,
+    "varchar": str,
+    "bpchar": str,
+    "date": to_date,
+    "timestamp": to_datetime,
+    "timestamptz": to_datetime,
+}
+
+
+@dataclass
+class Column:
+    name: str
+    type_name: str
+    not_null: bool
+    has_default: bool
+    identity: bool
+    common: bool
+    # Identity sequence of the parent table: the identity is not inherited
+    sequence: Optional[str] = None
+
+    @property
+    def required(self) -> bool:
+        return self.not_null and not self.has_default and not self.sequence
+
+
+@dataclass
+class TargetTable:
+    schema: str
+    table: str
+    columns: list[Column]
+    geometry: Optional[project.ProjectLayer] = None
+
+    def __str__(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    def column(self, name: str) -> Optional[Column]:
+        return next((column for column in self.columns if column.name == name), None)
+
+
+@dataclass
+class LayerMapping:
+    """Mapping of a source layer to a table"""
+
+    name: str
+    table: TargetTable
+    # Source field of each mapped column
+    fields: dict[str, str]
+    # Common values of the columns which are not mapped, or NULL in the source
+    defaults: dict[str, Any] = field(default_factory=dict)
+
+    def columns(self) -> list[Column]:
+        """Return the copied columns, but the geometry"""
+        names = set(self.fields) | set(self.defaults)
+        return [column for column in self.table.columns if column.name in names or column.sequence]
+
+
+def target_tables_sql(schema: str) -> str:
+    """Return the SQL reading the columns of the tables of the structure"""
+    schemas = ", ".join(sql_literal(name) for name in install.schemas(schema))
+    champ_commun = sql_literal(f"{schema}_principale.champ_commun")
+    return f"""
+        SELECT
+            n.nspname, c.relname, a.attname,
+            CASE WHEN t.typtype = 'd' THEN bt.typname ELSE t.typname END,
+            a.attnotnull OR coalesce(t.typnotnull, false),
+            a.atthasdef OR a.attidentity <> '',
+            a.attidentity <> '',
+            a.attinhcount > 0 AND EXISTS (
+                SELECT 1 FROM pg_catalog.pg_attribute p
+                WHERE p.attrelid = to_regclass({champ_commun}) AND p.attname = a.attname
+            ),
+            (
+                SELECT pg_get_serial_sequence(format('%I.%I', pn.nspname, pc.relname), pa.attname)
+                FROM pg_catalog.pg_inherits i
+                JOIN pg_catalog.pg_class pc ON pc.oid = i.inhparent
+                JOIN pg_catalog.pg_namespace pn ON pn.oid = pc.relnamespace
+                JOIN pg_catalog.pg_attribute pa ON pa.attrelid = pc.oid AND pa.attname = a.attname
+                WHERE i.inhrelid = c.oid AND pa.attidentity <> '' AND a.attidentity = ''
+                ORDER BY i.inhseqno
+                LIMIT 1
+            )
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid
+        JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+        LEFT JOIN pg_catalog.pg_type bt ON bt.oid = t.typbasetype
+        WHERE n.nspname IN ({schemas}) AND c.relkind = 'r'
+            AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = ''
+        ORDER BY n.nspname, c.relname, a.attnum"""
+
+
+def target_tables(connection: QgsAbstractDatabaseProviderConnection, schema: str) -> list[TargetTable]:
+    """Return the tables of the structure with their columns"""
+    try:
+        result = connection.executeSql(target_tables_sql(schema))
+    except QgsProviderConnectionException as e:
+        raise QgsProcessingException(str(e))
+    geometries = {
+        (layer.schema, layer.table, layer.geometry_column): layer
+        for layer in project.project_layers(connection, schema)
+        if layer.geometry_column
+    }
+
+    tables: dict[tuple[str, str], TargetTable] = {}
+    for row in result:
+        table = tables.setdefault((row[0], row[1]), TargetTable(row[0], row[1], []))
+        table.columns.append(
+            Column(row[2], row[3], bool(row[4]), bool(row[5]), bool(row[6]), bool(row[7]), row[8] or None)
+        )
+        # Only one geometry column of a table is imported
+        if table.geometry is None:
+            table.geometry = geometries.get((row[0], row[1], row[2]))
+    return list(tables.values())
+
+
+def read_mapping(path: Path) -> dict[str, dict]:
+    """Read the layers of a mapping file"""
+    try:
+        mapping = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        raise QgsProcessingException(tr(f"The mapping file {path} cannot be read: {e}"))
+    return mapping.get("layers", {})
+
+
+def source_name(layer: QgsVectorLayer) -> str:
+    """Return the name of the source layer, as in the GeoPackage or the Shapefile name"""
+    parts = QgsProviderRegistry.instance().decodeUri(layer.providerType(), layer.source())
+    if parts.get("layerName"):
+        return parts["layerName"]
+    if parts.get("path"):
+        return Path(parts["path"]).stem
+    return layer.name()
+
+
+def find_table(tables: Sequence[TargetTable], name: str) -> TargetTable:
+    """Return the table of a name, qualified with the schema or not"""
+    schema, _, table = name.rpartition(".")
+    found = [t for t in tables if t.table == table and (not schema or t.schema == schema)]
+    if not found:
+        raise QgsProcessingException(tr(f"The table {name} is not in the structure"))
+    if len(found) > 1:
+        raise QgsProcessingException(
+            tr(f"The table {name} is in several schemas, it must be qualified with its schema")
+        )
+    return found[0]
+
+
+def map_layer(
+    name: str,
+    fields: QgsFields,
+    tables: Sequence[TargetTable],
+    layer_mapping: Optional[dict],
+    common_values: dict[str, str],
+) -> LayerMapping:
+    """Map a source layer to a table
+
+    The columns are mapped to the fields of the mapping file, then to
+    the fields of the same name, ignoring the case. The identity
+    columns, as fid, are only mapped from the mapping file: they are
+    filled by their sequence, the one of the parent table for the
+    tables inheriting the column.
+    """
+    layer_mapping = layer_mapping or {}
+    table = find_table(tables, layer_mapping.get("table", name))
+    source_fields = {source_field.name().lower(): source_field.name() for source_field in fields}
+
+    mapped: dict[str, str] = {}
+    for column_name, field_name in layer_mapping.get("fields", {}).items():
+        if table.column(column_name) is None:
+            raise QgsProcessingException(tr(f"{name}: the column {column_name} is not in the table {table}"))
+        if fields.indexOf(field_name) < 0:
+            raise QgsProcessingException(tr(f"{name}: the field {field_name} is not in the layer"))
+        mapped[column_name] = field_name
+    geometry_column = table.geometry.geometry_column if table.geometry else None
+    for column in table.columns:
+        if column.name in mapped or column.identity or column.sequence or column.name == geometry_column:
+            continue
+        if column.name.lower() in source_fields:
+            mapped[column.name] = source_fields[column.name.lower()]
+
+    defaults: dict[str, Any] = {}
+    for column in table.columns:
+        if not column.common:
+            continue
+        if column.name in common_values and column.type_name in CONVERTERS:
+            try:
+                defaults[column.name] = convert(column, common_values[column.name])
+            except ValueError as e:
+                raise QgsProcessingException(tr(f"Invalid common value of {column.name}: {e}")) from None
+        elif column.name in IMPORT_TIME_COLUMNS:
+            defaults[column.name] = datetime.now()
+
+    for column in table.columns:
+        if (column.name in mapped or column.name in common_values) and column.type_name not in CONVERTERS:
+            raise QgsProcessingException(
+                tr(f"{name}: the column {column.name} of type {column.type_name} cannot be imported")
+            )
+
+    return LayerMapping(name, table, mapped, defaults)
+
+
+def missing_columns(mapping: LayerMapping, has_geometry: bool) -> list[str]:
+    """Return the required columns which are not filled by the mapping"""
+    geometry_column = mapping.table.geometry.geometry_column if mapping.table.geometry else None
+    return [
+        column.name
+        for column in mapping.table.columns
+        if column.required
+        and column.name not in mapping.fields
+        and column.name not in mapping.defaults
+        and not (column.name == geometry_column and has_geometry)
+    ]
+
+
+def convert(column: Column, value: object) -> object:
+    """Convert a source value to the type of a column"""
+    if value is None or (isinstance(value, QVariant) and value.isNull()):
+        return None
+    if isinstance(value, QDateTime):
+        value = value.toPyDateTime()
+    elif isinstance(value, QDate):
+        value = value.toPyDate()
+    elif isinstance(value, QTime):
+        value = value.toPyTime()
+    return CONVERTERS[column.type_name](value)
+
+
+def ewkb(geometry: QgsGeometry, srid: int) -> bytes:
+    """Return the geometry as EWKB, the binary format of the PostGIS geometries, with its SRID"""
+    wkb = bytes(geometry.asWkb())
+    order = "<" if wkb[0] == 1 else ">"
+    (wkb_type,) = struct.unpack(f"{order}I", wkb[1:5])
+    return wkb[:1] + struct.pack(f"{order}II", wkb_type | EWKB_SRID_FLAG, srid) + wkb[5:]
+
+
+def geometry_value(geometry: QgsGeometry, wkb_type: Qgis.WkbType, srid: int) -> Optional[bytes]:
+    """Return the geometry converted to the type of the column, as EWKB"""
+    if geometry.isNull():
+        return None
+    if geometry.wkbType() != wkb_type:
+        # Single to multi part, or the opposite, and Z or M added or dropped
+        geometries = geometry.coerceToType(wkb_type)
+        if len(geometries) != 1:
+            raise ValueError(
+                f"{QgsWkbTypes.displayString(geometry.wkbType())} cannot be converted "
+                f"to {QgsWkbTypes.displayString(wkb_type)}"
+            )
+        geometry = geometries[0]
+    return ewkb(geometry, srid)
+
+
+def register_geometry(conn: "psycopg.Connection") -> Optional[int]:
+    """Register the dumper of the EWKB geometries in the binary COPY, return the geometry type"""
+    from psycopg.adapt import Dumper
+    from psycopg.pq import Format
+
+    row = conn.execute("SELECT to_regtype('public.geometry')::oid").fetchone()
+    if not row or not row[0]:
+        return None
+    geometry_oid: int = row[0]
+
+    class GeometryBinaryDumper(Dumper):
+        format = Format.BINARY
+        oid = geometry_oid
+
+        def dump(self, obj):
+            return obj
+
+    conn.adapters.register_dumper(None, GeometryBinaryDumper)
+    return geometry_oid
+
+
+@dataclass
+class LayerSource:
+    """Source layer, created in the main thread and read from a worker thread"""
+
+    mapping: LayerMapping
+    source: QgsFeatureSource
+    fields: QgsFields
+    crs: QgsCoordinateReferenceSystem
+    has_geometry: bool
+
+
+def layer_source(layer: QgsVectorLayer, mapping: LayerMapping) -> LayerSource:
+    """Return the source of a layer, to be created in the thread of the layer"""
+    return LayerSource(
+        mapping=mapping,
+        source=QgsVectorLayerFeatureSource(layer),
+        fields=layer.fields(),
+        crs=layer.crs(),
+        has_geometry=layer.isSpatial(),
+    )
+
+
+def sequence_values(conn: "psycopg.Connection", sequence: str, size: int) -> Iterator[int]:
+    """Draw the values of a sequence, `size` at once"""
+    while True:
+        cursor = conn.execute("SELECT nextval(%s::regclass) FROM generate_series(1, %s)", (sequence, size))
+        yield from (row[0] for row in cursor.fetchall())
+
+
+def copy_layer(
+    conn: "psycopg.Connection",
+    layer: LayerSource,
+    transform_context: QgsCoordinateTransformContext,
+    feedback: QgsProcessingFeedback,
+    batch_size: int = BATCH_SIZE,
+    sequence_conn: Optional["psycopg.Connection"] = None,
+) -> int:
+    """Stream the features of a layer to its table, with a binary COPY
+
+    The values of the sequences of the parent tables are drawn on
+    `sequence_conn`, as `conn` is busy with the COPY.
+    """
+    import psycopg
+
+    from psycopg import sql
+
+    mapping = layer.mapping
+    table = mapping.table
+    columns = mapping.columns()
+    geometry = table.geometry if layer.has_geometry else None
+
+    names = [column.name for column in columns]
+    types: list[Any] = [column.type_name for column in columns]
+    srid = 0
+    if geometry:
+        if not geometry.geometry_column or geometry.srid is None:
+            raise QgsProcessingException(tr(f"{mapping.name}: the SRID of the geometry column is unknown"))
+        srid = geometry.srid
+        geometry_oid = register_geometry(conn)
+        if geometry_oid is None:
+            raise QgsProcessingException(tr("PostGIS is not installed in the database"))
+        names.append(geometry.geometry_column)
+        types.append(geometry_oid)
+
+    indexes = [
+        layer.fields.indexOf(mapping.fields[c.name]) if c.name in mapping.fields else -1 for c in columns
+    ]
+    sequences: dict[str, Iterator[int]] = {}
+    for column in columns:
+        if column.sequence:
+            if sequence_conn is None:
+                raise QgsProcessingException(tr(f"{mapping.name}: no connection to fill {column.name}"))
+            sequences[column.name] = sequence_values(sequence_conn, column.sequence, batch_size)
+    request = QgsFeatureRequest().setSubsetOfAttributes([index for index in indexes if index >= 0])
+    if geometry:
+        request.setDestinationCrs(QgsCoordinateReferenceSystem(f"EPSG:{srid}"), transform_context)
+    else:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+
+    statement = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(
+        sql.Identifier(table.schema, table.table),
+        sql.SQL(", ").join(sql.Identifier(name) for name in names),
+    )
+
+    count = 0
+    feature = None
+    try:
+        with conn.transaction(), conn.cursor() as cur, cur.copy(statement) as copy:
+            copy.set_types(types)
+            for feature in layer.source.getFeatures(request):
+                attributes = feature.attributes()
+                row = []
+                for column, index in zip(columns, indexes):
+                    value = convert(column, attributes[index]) if index >= 0 else None
+                    if value is None:
+                        value = mapping.defaults.get(column.name)
+                    if value is None and column.name in sequences:
+                        value = next(sequences[column.name])
+                    row.append(value)
+                if geometry:
+                    row.append(geometry_value(feature.geometry(), geometry.wkb_type, srid))
+                copy.write_row(row)
+                count += 1
+                if count % batch_size == 0:
+                    if feedback.isCanceled():
+                        raise QgsProcessingException(tr("Canceled"))
+                    feedback.pushInfo(tr(f"{mapping.name}: {count} features"))
+        conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table.schema, table.table)))
+    except (ValueError, TypeError) as e:
+        feature_id = feature.id() if feature is not None else "?"
+        raise QgsProcessingException(tr(f"{mapping.name}, feature {feature_id}: {e}")) from None
+    except psycopg.Error as e:
+        raise QgsProcessingException(f"{mapping.name}: {e}") from None
+
+    return count
+
+
+def import_layers(
+    connection: QgsAbstractDatabaseProviderConnection,
+    layers: Sequence[LayerSource],
+    transform_context: QgsCoordinateTransformContext,
+    *,
+    workers: int,
+    feedback: QgsProcessingFeedback,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Import the layers, the ones of different tables at once, and return the number of features
+
+    The layers of a table are imported one after the other, each one in
+    its own transaction. The first failure stops the import, the layers
+    already imported are kept.
+    """
+    by_table: dict[str, list[LayerSource]] = {}
+    for layer in layers:
+        by_table.setdefault(str(layer.mapping.table), []).append(layer)
+
+    messages: queue.Queue = queue.Queue()
+    table_feedbacks = {table: TargetFeedback(table, messages) for table in by_table}
+
+    def flush():
+        while not messages.empty():
+            table, error, text = messages.get()
+            if error:
+                feedback.reportError(f"[{table}] {text}")
+            else:
+                feedback.pushInfo(f"[{table}] {text}")
+
+    def import_table(table: str) -> int:
+        table_feedback = table_feedbacks[table]
+        count = 0
+        with contextlib.ExitStack() as stack:
+            conn = stack.enter_context(pooled_connection(connection))
+            sequence_conn = None
+            if any(column.sequence for column in by_table[table][0].mapping.table.columns):
+                sequence_conn = stack.enter_context(pooled_connection(connection))
+            for layer in by_table[table]:
+                start = time.perf_counter()
+                layer_count = copy_layer(
+                    conn,
+                    layer,
+                    transform_context,
+                    table_feedback,
+                    batch_size,
+                    sequence_conn,
+                )
+                table_feedback.pushInfo(
+                    tr(f"{layer.mapping.name}: {layer_count} features in {time.perf_counter() - start:.1f}s")
+                )
+                count += layer_count
+        return count
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {executor.submit(import_table, table): table for table in by_table}
+        try:
+            while running:
+                done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                flush()
+                if feedback.isCanceled():
+                    for table_feedback in table_feedbacks.values():
+                        table_feedback.cancel()
+                for future in done:
+                    running.pop(future)
+                    total += future.result()
+                    feedback.setProgress(100 * (len(by_table) - len(running)) / len(by_table))
+        finally:
+            # Stop the other tables on the first failure
+            for future in running:
+                future.cancel()
+            for table_feedback in table_feedbacks.values():
+                table_feedback.cancel()
+    flush()
+
+    return total
@@ -0,0 +1,287 @@
+"""Rendering of the database structure install script."""
+
+import os
+import re
+import statistics
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from ...plugin_tools import phases, resources
+from . import ledger
+from .glossary import glossary_files, glossary_insert_sql
+from .rewrite import SqlRewriter
+
+# Install SQL files, in order, relative to the `sql` install directory.
+# `{schema}` is the name of the plugin schema directory, which is
+# used even if the target schema is not the same.
+SQL_FILES = (
+    "00_initialize_database.sql",
+    "StaR-Eau/00-creation schemas.sql",
+    "StaR-Eau/01-creation domaines.sql",
+    "StaR-Eau/02-creation tables principales.sql",
+    "StaR-Eau/03-creation tables communes.sql",
+    "StaR-Eau/04-creation assainissement.sql",
+    "StaR-Eau/05-creation branchement assainissement.sql",
+    "StaR-Eau/06-creation eau potable.sql",
+    "StaR-Eau/07-creation branchement eau potable.sql",
+    "StaR-Eau/08-creation gestion pei.sql",
+    "StaR-Eau/09-creation table valeur.sql",
+    "StaR-Eau/10-creation_com_materiau.sql",
+    "{schema}/10_FUNCTION.sql",
+    "{schema}/20_TABLE_SEQUENCE_DEFAULT.sql",
+    "{schema}/30_VIEW.sql",
+    "{schema}/40_INDEX.sql",
+    "{schema}/50_TRIGGER.sql",
+    "{schema}/60_CONSTRAINT.sql",
+    "{schema}/70_COMMENT.sql",
+    "{schema}/90_GLOSSARY.sql",
+    "99_finalize_database.sql",
+)
+
+# Schema suffixes, in drop order
+SCHEMA_SUFFIXES = (
+    "_defense_incendie",
+    "_aep_brcht",
+    "_aep",
+    "_ass_brcht",
+    "_ass",
+    "_principale",
+    "_commun",
+    "_valeur",
+    "",
+)
+
+TRANSACTION_STATEMENT = re.compile(
+    r"^\s*(BEGIN|COMMIT|START\s+TRANSACTION)\s*;[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def sql_files(install_dir: Path) -> list[Path]:
+    """Return the install SQL files in execution order"""
+    plugin_schema_name = resources.schema_name()
+    return [install_dir.joinpath("sql", sf.format(schema=plugin_schema_name)) for sf in SQL_FILES]
+
+
+def schemas(schema: str) -> list[str]:
+    """Return the names of all the schemas of the structure"""
+    return [f"{schema}{suffix}" for suffix in SCHEMA_SUFFIXES]
+
+
+def drop_schema_sql(schema: str) -> str:
+    """Return the SQL dropping the whole structure"""
+    sql = "".join(f"DROP SCHEMA IF EXISTS {name} CASCADE;\n" for name in schemas(schema))
+    sql += f"DROP DOMAIN IF EXISTS {schema}.c_insee;\nDROP DOMAIN IF EXISTS {schema}.c_annee;"
+    return sql
+
+
+def adapt_sql(sql: str, schema: str, srid: int) -> str:
+    """Replace the default schema and SRID by the user defined ones
+
+    Useful when the SQL calls functions or objects prefixed by the schema.
+    """
+    return SqlRewriter(schema, srid).rewrite(sql)
+
+
+def render_sql_file(
+    sql_file: Path,
+    schema: str,
+    srid: int,
+    cache_dir: Optional[Path] = None,
+) -> str:
+    """Return the content of a SQL file adapted to the schema and SRID
+
+    See `SqlRewriter.render` for the render cache.
+    """
+    return SqlRewriter(schema, srid).render(sql_file, cache_dir)
+
+
+def metadata_sql(schema: str, version: int) -> str:
+    """Return the SQL registering the installed version
+
+    The install is also recorded in the migration ledger.
+    """
+    return f"""
+        INSERT INTO {schema}.metadata
+        (id, me_version, me_version_date, me_status)
+        VALUES (
+            1, '{version}', now()::timestamp(0), 1
+        );
+        {ledger.install_sql(schema, version)}"""
+
+
+def installed_version_sql(schema: str) -> str:
+    """Return the SQL reading the installed version, if the metadata table exists"""
+    return f"""
+        SELECT me_version
+        FROM {schema}.metadata
+        WHERE me_status = 1
+        ORDER BY me_version_date DESC
+        LIMIT 1"""
+
+
+def data_tables_sql(schema: str) -> str:
+    """Return the SQL listing the data tables of the structure
+
+    The glossaries (the `_valeur` schema and the `glossary_` tables),
+    the metadata and the migration ledger are not data tables.
+    """
+    data_schemas = ", ".join(f"'{name}'" for name in schemas(schema) if name != f"{schema}_valeur")
+    return f"""
+        SELECT format('%I.%I', n.nspname, c.relname)
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p')
+        AND n.nspname IN ({data_schemas})
+        AND NOT (
+            n.nspname = '{schema}'
+            AND (c.relname IN ('metadata', '{ledger.LEDGER_TABLE}') OR c.relname LIKE 'glossary\\_%')
+        )
+        ORDER BY 1"""
+
+
+def version_update_sql(schema: str, version: int) -> str:
+    """Return the SQL updating the installed version"""
+    return f"""
+        UPDATE {schema}.metadata
+        SET (me_version, me_version_date)
+        = ( '{version}', now()::timestamp(0) )"""
+
+
+def truncate_sql(tables: list[str]) -> str:
+    """Return the SQL emptying the tables and resetting their sequences"""
+    return f"TRUNCATE TABLE {', '.join(tables)} RESTART IDENTITY"
+
+
+def strip_transaction_statements(sql: str) -> str:
+    """Remove the transaction control statements of a script
+
+    So that the script can be embedded in an enclosing transaction.
+    """
+    return TRANSACTION_STATEMENT.sub("", sql)
+
+
+def iter_install_script(
+    install_dir: Path,
+    schema: str,
+    srid: int,
+    *,
+    version: int,
+    override: bool,
+    glossaries: bool = True,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[tuple[str, str]]:
+    """Iterate over the (name, sql) parts of the whole install script
+
+    Transaction control statements are removed so that the parts
+    may be concatenated and run as a single transaction.
+    If `glossaries` is False, the glossary data is left out.
+    """
+    if override:
+        yield "drop", drop_schema_sql(schema)
+
+    for sql_file in sql_files(install_dir):
+        sql = render_sql_file(sql_file, schema, srid, cache_dir)
+        if len(sql.strip()) == 0:
+            continue
+        sql = strip_transaction_statements(sql)
+        yield sql_file.relative_to(install_dir.joinpath("sql")).as_posix(), sql
+
+    if glossaries:
+        for csv_file in glossary_files(install_dir):
+            yield csv_file.name, glossary_insert_sql(schema, csv_file)
+
+    yield "metadata", metadata_sql(schema, version)
+
+
+def iter_upgrade_script(
+    schema: str,
+    srid: int,
+    *,
+    from_version: int,
+    version: int,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[tuple[str, str]]:
+    """Iterate over the (name, sql) parts of the upgrade script from a version
+
+    Each migration is recorded in the ledger and followed by the update
+    of the installed version, and the last part sets the plugin version.
+    Transaction control statements are removed, as in `iter_install_script`.
+
+    Only the transactional phase of the migrations is rendered: the online
+    phases are run by the next upgrade with the algorithm.
+    """
+    yield "ledger", ledger.table_sql(schema)
+
+    for new_version, sql_file in resources.available_migrations(from_version):
+        sql = render_sql_file(sql_file, schema, srid, cache_dir)
+        if len(sql.strip()) == 0:
+            continue
+        sql = strip_transaction_statements(phases.split_phases(sql)[phases.TRANSACTION]).rstrip()
+        record = ledger.record_sql(
+            schema,
+            new_version,
+            kind="upgrade",
+            file_name=sql_file.name,
+            checksum=ledger.migration_checksum(new_version, sql_file),
+        )
+        yield (
+            sql_file.name,
+            f"{ledger.start_sql()};\n{sql}\n;\n{record};\n{version_update_sql(schema, new_version)}",
+        )
+
+    yield "metadata", f"{version_update_sql(schema, version)};\n{ledger.upgrade_sql(schema, version)}"
+
+
+def script_part(name: str, sql: str) -> str:
+    """Return a part of a script, with its name as a comment"""
+    return f"-- {name}\n{sql.rstrip()}\n;\n\n"
+
+
+def render_install_script(parts: Iterator[tuple[str, str]]) -> str:
+    """Join the install script parts in a single script"""
+    return "".join(script_part(name, sql) for name, sql in parts)
+
+
+def script_header(title: str, schema: str, srid: int) -> str:
+    """Return the header of a rendered script"""
+    return (
+        f"{title}\n"
+        f"Schema: {schema}, SRID: {srid}\n"
+        "\n"
+        "Run it in a single transaction, for instance with:\n"
+        "  psql --single-transaction --set ON_ERROR_STOP=1 --file <script>"
+    )
+
+
+def write_script(path: Path, parts: Iterable[tuple[str, str]], header: str = "") -> int:
+    """Stream the script parts to a file and return the number of parts
+
+    The file is written next to its destination and moved at the end,
+    so that a failed render does not leave a truncated script.
+    """
+    count = 0
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            f.writelines(f"-- {line}".rstrip() + "\n" for line in header.splitlines())
+            f.write("\n")
+            for name, sql in parts:
+                f.write(script_part(name, sql))
+                count += 1
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return count
+
+
+def round_trip_time(query: Callable[[], Any], samples: int = 3) -> float:
+    """Return the median time, in seconds, of a trivial query"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
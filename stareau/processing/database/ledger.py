@@ -0,0 +1,167 @@
+"""Ledger of the applied migrations.
+
+Each install, applied migration and upgrade is recorded in the
+`migration_ledger` table of the plugin schema, with the checksum of the
+migration file, its start and end time and the plugin version which
+applied it. The upgrade uses it to skip the migrations already applied
+and to refuse to run when an applied migration file has been edited.
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsProcessingException,
+    QgsProviderConnectionException,
+)
+
+from ...plugin_tools import resources
+from ...plugin_tools.manifest import file_checksum
+from .glossary import sql_literal
+
+LEDGER_TABLE = "migration_ledger"
+
+# Transaction setting holding the start time of the running migration
+STARTED_AT_SETTING = "stareau.migration_started_at"
+
+
+def table_sql(schema: str) -> str:
+    """Return the SQL creating the ledger, if it does not exist"""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{LEDGER_TABLE} (
+            id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            version integer NOT NULL,
+            kind text NOT NULL,
+            file_name text,
+            checksum text,
+            started_at timestamp with time zone NOT NULL,
+            finished_at timestamp with time zone NOT NULL,
+            duration interval NOT NULL,
+            plugin_version text NOT NULL,
+            applied_by text NOT NULL DEFAULT current_user
+        );
+        CREATE INDEX IF NOT EXISTS {LEDGER_TABLE}_version_idx
+        ON {schema}.{LEDGER_TABLE} (version DESC, finished_at DESC);
+        COMMENT ON TABLE {schema}.{LEDGER_TABLE} IS 'Installs and migrations applied to the structure'"""
+
+
+def start_sql() -> str:
+    """Return the SQL keeping the start time of a migration in the transaction"""
+    return f"SELECT set_config('{STARTED_AT_SETTING}', clock_timestamp()::text, true)"
+
+
+def record_sql(
+    schema: str,
+    version: int,
+    *,
+    kind: str,
+    file_name: Optional[str] = None,
+    checksum: Optional[str] = None,
+    started_at: Optional[str] = None,
+) -> str:
+    """Return the SQL recording an install or a migration
+
+    The start time is the one kept by `start_sql`, unless a SQL
+    expression is given as `started_at`.
+    """
+    if started_at is None:
+        started_at = f"current_setting('{STARTED_AT_SETTING}')::timestamp with time zone"
+    return f"""
+        INSERT INTO {schema}.{LEDGER_TABLE}
+        (version, kind, file_name, checksum, started_at, finished_at, duration, plugin_version)
+        VALUES (
+            {int(version)}, {sql_literal(kind)}, {sql_literal(file_name)}, {sql_literal(checksum)},
+            {started_at}, clock_timestamp(), clock_timestamp() - {started_at},
+            {sql_literal(resources.version())}
+        )"""
+
+
+def install_sql(schema: str, version: int) -> str:
+    """Return the SQL creating the ledger and recording the install"""
+    # The install statements may be run on several connections:
+    # the install starts with the transaction
+    return f"{table_sql(schema)};\n{record_sql(schema, version, kind='install', started_at='now()')}"
+
+
+def upgrade_sql(schema: str, version: int) -> str:
+    """Return the SQL recording the version set at the end of an upgrade
+
+    Its duration is the one of the whole upgrade transaction.
+    """
+    return record_sql(schema, version, kind="version", started_at="now()")
+
+
+def latest_sql(schema: str) -> str:
+    """Return the SQL reading the last entry of the ledger, with its index"""
+    return f"""
+        SELECT version, kind, plugin_version, finished_at, duration
+        FROM {schema}.{LEDGER_TABLE}
+        ORDER BY version DESC, finished_at DESC
+        LIMIT 1"""
+
+
+def migration_checksum(version: int, sql_file: Path) -> str:
+    """Return the checksum of a migration file, from the manifest if it is known"""
+    checksum = resources.migration_manifest().get(version, {}).get("checksum")
+    return checksum or file_checksum(sql_file)
+
+
+def ledger_rows(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+    kinds: Iterable[str],
+) -> list:
+    """Return the (version, kind, checksum) rows of the migrations of the given kinds
+
+    Empty if the ledger does not exist yet.
+    """
+    kinds = ", ".join(sql_literal(kind) for kind in kinds)
+    try:
+        exists = connection.executeSql(f"SELECT to_regclass('{schema}.{LEDGER_TABLE}') IS NOT NULL")
+        if not (exists and exists[0][0]):
+            return []
+        return connection.executeSql(
+            f"""
+            SELECT version, kind, checksum
+            FROM {schema}.{LEDGER_TABLE}
+            WHERE kind IN ({kinds})
+            ORDER BY version"""
+        )
+    except QgsProviderConnectionException as e:
+        raise QgsProcessingException(str(e))
+
+
+def applied_migrations(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+) -> dict[int, str]:
+    """Return the checksum of the applied migrations, by version
+
+    A migration is applied once its transactional phase is committed.
+    """
+    return {int(version): checksum for version, _, checksum in ledger_rows(connection, schema, ("upgrade",))}
+
+
+def applied_phases(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+    phases: Iterable[str],
+) -> dict[int, set[str]]:
+    """Return the kinds recorded for each migration version: `upgrade` and the given phases"""
+    result: dict[int, set[str]] = {}
+    for version, kind, _ in ledger_rows(connection, schema, ("upgrade", *phases)):
+        result.setdefault(int(version), set()).add(kind)
+    return result
+
+
+def edited_migrations(
+    applied: dict[int, str],
+    available: Iterable[tuple[int, Path]],
+) -> list[Path]:
+    """Return the migration files changed since they have been applied"""
+    return [
+        sql_file
+        for version, sql_file in available
+        if version in applied and applied[version] != migration_checksum(version, sql_file)
+    ]
@@ -0,0 +1,250 @@
+"""Dependency aware execution of SQL scripts on several connections.
+
+Scripts are split into statements. Two statements depend on each other
+when they touch the same object of the structure schemas, so that the
+statements running at the same time never lock the same objects.
+Statements which cannot be analyzed are run alone, as barriers.
+"""
+
+import queue
+import re
+import time
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from qgis.core import QgsProcessingException, QgsProcessingFeedback
+
+from ...plugin_tools.i18n import tr
+from ...plugin_tools.sql import NAME, split_statements
+
+if TYPE_CHECKING:
+    import psycopg
+
+    from .timing import TimingReport
+
+QUALIFIED_NAME = re.compile(rf"(?P<schema>{NAME})\s*\.\s*(?P<name>{NAME})")
+
+SCHEMA_STATEMENT = re.compile(
+    rf"^\s*(?:CREATE|DROP|ALTER|COMMENT\s+ON)\s+SCHEMA\s+"
+    rf"(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(?P<schema>{NAME})",
+    re.IGNORECASE,
+)
+
+# Statements changing the session: they must be run on every connection
+SESSION_STATEMENT = re.compile(
+    r"^\s*(?:SET|RESET)\s|^\s*SELECT\s+pg_catalog\.set_config\s*\(",
+    re.IGNORECASE,
+)
+
+# Statements whose effects may spread beyond the objects they name
+CASCADE = re.compile(r"\bCASCADE\b", re.IGNORECASE)
+
+
+@dataclass
+class Statement:
+    """A statement of the install script and its dependencies"""
+
+    part: str
+    sql: str
+    # Objects of the structure touched by the statement
+    objects: set[str] = field(default_factory=set)
+    # Schemas in which objects are created or used
+    schemas: set[str] = field(default_factory=set)
+    # Schemas created, altered or dropped
+    schema_changes: set[str] = field(default_factory=set)
+    barrier: bool = False
+    session: bool = False
+    depends_on: set[int] = field(default_factory=set)
+
+
+def normalize_name(name: str) -> str:
+    """Return the name of an identifier as stored in the catalog"""
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.lower()
+
+
+def analyze(part: str, sql: str, code: str, structure_schemas: set[str]) -> Statement:
+    """Return the statement with the objects it touches"""
+    statement = Statement(part, sql)
+    if SESSION_STATEMENT.match(code):
+        statement.session = True
+        statement.barrier = True
+        return statement
+
+    if CASCADE.search(code):
+        statement.barrier = True
+        return statement
+
+    m = SCHEMA_STATEMENT.match(code)
+    if m:
+        statement.schema_changes.add(normalize_name(m.group("schema")))
+
+    for m in QUALIFIED_NAME.finditer(code):
+        schema = normalize_name(m.group("schema"))
+        if schema in structure_schemas:
+            statement.schemas.add(schema)
+            statement.objects.add(f"{schema}.{normalize_name(m.group('name'))}")
+
+    if not (statement.objects or statement.schema_changes):
+        # Nothing known about the statement, e.g. CREATE EXTENSION
+        statement.barrier = True
+    return statement
+
+
+def build_graph(
+    parts: Iterable[tuple[str, str]],
+    structure_schemas: Iterable[str],
+) -> list[Statement]:
+    """Split the script parts in statements and compute their dependencies
+
+    A statement depends on the previous statements touching the same
+    objects, or changing the schemas it uses. Barriers depend on all the
+    previous statements, and all the next statements depend on them.
+    """
+    structure_schemas = set(structure_schemas)
+    statements: list[Statement] = []
+    last_barrier = None
+    # Index of the last statement touching each object
+    last_use: dict[str, int] = {}
+    # Index of the last change of each schema, and its users since
+    last_schema_change: dict[str, int] = {}
+    schema_users: dict[str, list[int]] = {}
+
+    for part, sql in parts:
+        for text, code in split_statements(sql):
+            index = len(statements)
+            statement = analyze(part, text, code, structure_schemas)
+
+            if statement.barrier:
+                statement.depends_on.update(range(last_barrier or 0, index))
+                last_barrier = index
+                last_use.clear()
+                last_schema_change.clear()
+                schema_users.clear()
+                statements.append(statement)
+                continue
+
+            if last_barrier is not None:
+                statement.depends_on.add(last_barrier)
+            for name in statement.objects:
+                if name in last_use:
+                    statement.depends_on.add(last_use[name])
+                last_use[name] = index
+            for schema in statement.schemas - statement.schema_changes:
+                if schema in last_schema_change:
+                    statement.depends_on.add(last_schema_change[schema])
+                schema_users.setdefault(schema, []).append(index)
+            for schema in statement.schema_changes:
+                if schema in last_schema_change:
+                    statement.depends_on.add(last_schema_change[schema])
+                statement.depends_on.update(schema_users.pop(schema, []))
+                last_schema_change[schema] = index
+
+            statements.append(statement)
+
+    return statements
+
+
+def execute_graph(
+    statements: list[Statement],
+    connect: Callable[[], "psycopg.Connection"],
+    workers: int,
+    feedback: QgsProcessingFeedback,
+    report: Optional["TimingReport"] = None,
+) -> float:
+    """Run the statements on a pool of connections, following their dependencies
+
+    Each statement is committed on its own. On error, no new statement
+    is started and the error is raised once the running ones are done.
+    Return the total time spent in the statements, which can be compared
+    with the elapsed time to get the speedup. The time of each statement
+    is added to the report, if any.
+    """
+    import psycopg
+
+    connections: queue.Queue = queue.Queue()
+    opened = []
+    try:
+        for _ in range(max(1, workers)):
+            conn = connect()
+            conn.autocommit = True
+            opened.append(conn)
+            connections.put(conn)
+
+        def run(statement: Statement) -> float:
+            conn = connections.get()
+            try:
+                start = time.perf_counter()
+                conn.execute(statement.sql)
+                return time.perf_counter() - start
+            finally:
+                connections.put(conn)
+
+        dependents: dict[int, list[int]] = {}
+        pending = {}
+        for index, statement in enumerate(statements):
+            pending[index] = len(statement.depends_on)
+            for dep in statement.depends_on:
+                dependents.setdefault(dep, []).append(index)
+
+        ready = [index for index, count in pending.items() if count == 0]
+        running: dict[Future, int] = {}
+        busy_time = 0.0
+        error = None
+        started_parts = set()
+        with ThreadPoolExecutor(max_workers=len(opened)) as executor:
+            while (ready or running) and error is None:
+                if feedback.isCanceled():
+                    break
+                for index in ready:
+                    statement = statements[index]
+                    if statement.part not in started_parts:
+                        started_parts.add(statement.part)
+                        feedback.pushInfo(statement.part)
+                    if statement.session:
+                        # Nothing else is running: apply it to every connection
+                        for conn in opened:
+                            conn.execute(statement.sql)
+                        future: Future = Future()
+                        future.set_result(0.0)
+                    else:
+                        future = executor.submit(run, statement)
+                    running[future] = index
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except psycopg.Error as e:
+                        if error is None:
+                            error = (statements[index], e)
+                        continue
+                    busy_time += seconds
+                    if report is not None:
+                        statement = statements[index]
+                        report.add("statement", statement.part, seconds, sql=statement.sql)
+                    for dependent in dependents.get(index, []):
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            ready.append(dependent)
+
+            # Let the running statements finish
+            wait(running)
+
+        if error:
+            failed, exc = error
+            feedback.reportError(tr(f"Error when executing {failed.part}: {failed.sql[:200]}"))
+            raise QgsProcessingException(str(exc))
+        if feedback.isCanceled():
+            raise QgsProcessingException(tr("Install canceled"))
+        return busy_time
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+    finally:
+        for conn in opened:
+            conn.close()
@@ -0,0 +1,312 @@
+"""Administration project of the structure.
+
+The layers are read from the catalog with one query, and their data
+sources declare the primary key, the geometry type, the SRID and use
+the estimated metadata: QGIS does not have to introspect each table
+when the project is opened. The extent of each layer is estimated from
+the statistics of the table and stored in the project, which trusts
+the stored statistics. Tables which have never been analyzed have no
+extent stored, their extent is computed by QGIS.
+
+The project file is written element by element, not built in memory.
+"""
+
+import re
+import shutil
+
+from dataclasses import dataclass
+from io import TextIOBase
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+
+from qgis.core import (
+    Qgis,
+    QgsAbstractDatabaseProviderConnection,
+    QgsCoordinateReferenceSystem,
+    QgsDataSourceUri,
+    QgsProcessingException,
+    QgsProviderConnectionException,
+    QgsWkbTypes,
+)
+
+from ...plugin_tools import resources
+from ...plugin_tools.i18n import tr
+from ..tools import CONNECTION_NAME_CONTEXT_VAR
+from . import install
+from .glossary import sql_literal
+
+
+@dataclass
+class ProjectLayer:
+    schema: str
+    table: str
+    key: Optional[str]
+    geometry_column: Optional[str]
+    geometry_type: Optional[str]
+    dimension: Optional[int]
+    srid: Optional[int]
+    xmin: Optional[float]
+    ymin: Optional[float]
+    xmax: Optional[float]
+    ymax: Optional[float]
+
+    @property
+    def name(self) -> str:
+        return self.table
+
+    @property
+    def layer_id(self) -> str:
+        return re.sub(r"\W", "_", f"{self.schema}_{self.table}_{self.geometry_column or 'table'}")
+
+    @property
+    def extent(self) -> Optional[tuple[float, float, float, float]]:
+        if self.xmin is None or self.ymin is None or self.xmax is None or self.ymax is None:
+            return None
+        return (self.xmin, self.ymin, self.xmax, self.ymax)
+
+    @property
+    def wkb_type(self) -> Qgis.WkbType:
+        if not self.geometry_column:
+            return Qgis.WkbType.NoGeometry
+        wkb_type = QgsWkbTypes.parseType(self.geometry_type or "")
+        # The type of geometry_columns does not tell the Z dimension
+        if self.dimension and self.dimension >= 3 and not QgsWkbTypes.hasM(wkb_type):
+            wkb_type = QgsWkbTypes.addZ(wkb_type)
+        if self.dimension == 4:
+            wkb_type = QgsWkbTypes.addM(wkb_type)
+        return wkb_type
+
+
+def project_layers_sql(schema: str) -> str:
+    """Return the SQL reading the layers of the structure, one per geometry column"""
+    schemas = ", ".join(sql_literal(name) for name in install.schemas(schema))
+    return f"""
+        SELECT
+            n.nspname, c.relname, k.attname,
+            g.f_geometry_column, g.type, g.coord_dimension, g.srid,
+            ST_XMin(e.extent), ST_YMin(e.extent), ST_XMax(e.extent), ST_YMax(e.extent)
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN LATERAL (
+            SELECT a.attname
+            FROM pg_catalog.pg_index i
+            JOIN pg_catalog.pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = c.oid AND i.indisprimary AND i.indnatts = 1
+        ) k ON true
+        LEFT JOIN public.geometry_columns g
+            ON g.f_table_schema = n.nspname AND g.f_table_name = c.relname
+        LEFT JOIN LATERAL (
+            SELECT ST_EstimatedExtent(n.nspname, c.relname, g.f_geometry_column) AS extent
+            WHERE g.f_geometry_column IS NOT NULL
+        ) e ON true
+        WHERE n.nspname IN ({schemas}) AND c.relkind IN ('r', 'p')
+        ORDER BY n.nspname, c.relname, g.f_geometry_column"""
+
+
+def project_layers(connection: QgsAbstractDatabaseProviderConnection, schema: str) -> list[ProjectLayer]:
+    """Return the layers of the structure"""
+    try:
+        result = connection.executeSql(project_layers_sql(schema))
+    except QgsProviderConnectionException as e:
+        raise QgsProcessingException(str(e))
+    return [
+        ProjectLayer(
+            schema=row[0],
+            table=row[1],
+            key=row[2] or None,
+            geometry_column=row[3] or None,
+            geometry_type=row[4] or None,
+            dimension=int(row[5]) if row[5] else None,
+            srid=int(row[6]) if row[6] else None,
+            xmin=float(row[7]) if row[7] is not None else None,
+            ymin=float(row[8]) if row[8] is not None else None,
+            xmax=float(row[9]) if row[9] is not None else None,
+            ymax=float(row[10]) if row[10] is not None else None,
+        )
+        for row in result
+    ]
+
+
+def layer_source(connection_uri: str, layer: ProjectLayer) -> str:
+    """Return the data source of a layer, declaring all its metadata"""
+    uri = QgsDataSourceUri(connection_uri)
+    uri.setDataSource(layer.schema, layer.table, layer.geometry_column or "", "", layer.key or "")
+    uri.setUseEstimatedMetadata(True)
+    if layer.geometry_column:
+        uri.setWkbType(layer.wkb_type)
+        if layer.srid:
+            uri.setSrid(str(layer.srid))
+    return uri.uri(False)
+
+
+def project_extent(layers: Iterable[ProjectLayer], srid: int) -> Optional[tuple[float, float, float, float]]:
+    """Return the union of the extents of the layers in the given SRID"""
+    extents = [layer.extent for layer in layers if layer.extent and layer.srid == srid]
+    if not extents:
+        return None
+    return (
+        min(e[0] for e in extents),
+        min(e[1] for e in extents),
+        max(e[2] for e in extents),
+        max(e[3] for e in extents),
+    )
+
+
+class ProjectWriter:
+    """Write a QGIS project file element by element"""
+
+    def __init__(self, out: TextIOBase):
+        self.xml = XMLGenerator(out, "utf-8", short_empty_elements=True)
+        self.depth = 0
+
+    def start(self, tag: str, **attrs):
+        if self.depth:
+            self.xml.ignorableWhitespace("\n" + " " * self.depth)
+        self.xml.startElement(tag, AttributesImpl({key: str(value) for key, value in attrs.items()}))
+        self.depth += 1
+
+    def end(self, tag: str, inline: bool = False):
+        self.depth -= 1
+        if not inline:
+            self.xml.ignorableWhitespace("\n" + " " * self.depth)
+        self.xml.endElement(tag)
+
+    def element(self, tag: str, text: object = "", **attrs):
+        self.start(tag, **attrs)
+        if text != "":
+            self.xml.characters(str(text))
+        self.end(tag, inline=True)
+
+    def extent(self, tag: str, extent: Sequence[float]):
+        self.start(tag)
+        for key, value in zip(("xmin", "ymin", "xmax", "ymax"), extent):
+            self.element(key, repr(value))
+        self.end(tag)
+
+    def crs(self, srid: int):
+        crs = QgsCoordinateReferenceSystem(f"EPSG:{srid}")
+        self.start("spatialrefsys")
+        self.element("wkt", crs.toWkt())
+        self.element("srid", srid)
+        self.element("authid", f"EPSG:{srid}")
+        self.end("spatialrefsys")
+
+    def layer_tree(self, layers: Sequence[ProjectLayer]):
+        self.start("layer-tree-group")
+        schema = None
+        for layer in layers:
+            if layer.schema != schema:
+                if schema is not None:
+                    self.end("layer-tree-group")
+                schema = layer.schema
+                self.start("layer-tree-group", name=schema, checked="Qt::Checked", expanded="0")
+            self.start(
+                "layer-tree-layer",
+                id=layer.layer_id,
+                name=layer.name,
+                source="",
+                providerKey="postgres",
+                checked="Qt::Checked",
+                expanded="0",
+            )
+            self.end("layer-tree-layer", inline=True)
+        if schema is not None:
+            self.end("layer-tree-group")
+        self.end("layer-tree-group")
+
+    def map_layer(self, connection_uri: str, layer: ProjectLayer):
+        wkb_type = layer.wkb_type
+        self.start(
+            "maplayer",
+            type="vector",
+            geometry=QgsWkbTypes.geometryDisplayString(QgsWkbTypes.geometryType(wkb_type)),
+            wkbType=QgsWkbTypes.displayString(wkb_type),
+        )
+        if layer.extent:
+            self.extent("extent", layer.extent)
+        self.element("id", layer.layer_id)
+        self.element("datasource", layer_source(connection_uri, layer))
+        self.element("layername", layer.name)
+        if layer.srid:
+            self.start("srs")
+            self.crs(layer.srid)
+            self.end("srs")
+        self.element("provider", "postgres", encoding="UTF-8")
+        self.end("maplayer")
+
+
+def write_project(
+    path: Path,
+    connection: QgsAbstractDatabaseProviderConnection,
+    connection_name: str,
+    layers: Sequence[ProjectLayer],
+    srid: int,
+):
+    """Write the administration project of the layers"""
+    connection_uri = connection.uri()
+    with path.open("w", encoding="utf-8") as out:
+        writer = ProjectWriter(out)
+        writer.xml.startDocument()
+        writer.start("qgis", projectname=tr("Administration"), version="3.34.0")
+        writer.element("title", tr("Administration"))
+        # The extents stored in the project are used instead of being computed
+        writer.element("projectFlags", set="TrustStoredLayerStatistics")
+
+        writer.start("projectCrs")
+        writer.crs(srid)
+        writer.end("projectCrs")
+
+        writer.layer_tree(layers)
+
+        extent = project_extent(layers, srid)
+        if extent:
+            writer.start("mapcanvas", name="theMapCanvas")
+            writer.extent("extent", extent)
+            writer.start("destinationsrs")
+            writer.crs(srid)
+            writer.end("destinationsrs")
+            writer.end("mapcanvas")
+
+        writer.start("projectlayers")
+        for layer in layers:
+            writer.map_layer(connection_uri, layer)
+        writer.end("projectlayers")
+
+        writer.start("properties")
+        writer.start("Variables")
+        writer.start("variableNames", type="QStringList")
+        writer.element("value", CONNECTION_NAME_CONTEXT_VAR)
+        writer.end("variableNames")
+        writer.start("variableValues", type="QStringList")
+        writer.element("value", connection_name)
+        writer.end("variableValues")
+        writer.end("Variables")
+        writer.end("properties")
+
+        writer.end("qgis")
+        writer.xml.endDocument()
+        out.write("\n")
+
+
+def project_srid(layers: Iterable[ProjectLayer]) -> int:
+    """Return the SRID of the project, the one of the first layer with a geometry"""
+    return next((layer.srid for layer in layers if layer.srid), None) or resources.srid_value()
+
+
+def create_administration_project(
+    path: Path,
+    connection: QgsAbstractDatabaseProviderConnection,
+    connection_name: str,
+    schema: str,
+) -> list[ProjectLayer]:
+    """Write the administration project of the structure, with its Lizmap configuration"""
+    layers = project_layers(connection, schema)
+    write_project(path, connection, connection_name, layers, project_srid(layers))
+
+    config_file = resources.plugin_path("resources", "qgis", "plugin_admin.qgs.cfg")
+    if config_file.exists():
+        shutil.copyfile(config_file, f"{path}.cfg")
+
+    return layers
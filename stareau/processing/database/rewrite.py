@@ -0,0 +1,147 @@
+"""Schema and SRID substitution in the plugin SQL scripts.
+
+The scripts are written for the plugin schema and SRID. They are
+rewritten in a single pass over the SQL tokens, so that comments and
+plain string literals are left untouched.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+from pathlib import Path
+from typing import Optional
+
+from ...plugin_tools import resources
+from ...plugin_tools.sql import TOKENS
+
+# Bump when the rewrite rules change, to invalidate the render cache
+REWRITE_VERSION = 1
+
+# A string literal holding a schema qualified name, i.e. 'schema.relation'::regclass
+QUALIFIED_NAME = re.compile(r"(?P<schema>[A-Za-z_]\w*)\.")
+
+
+class SqlRewriter:
+    """Rewrite the plugin schema names and SRID of SQL scripts
+
+    Rewritten tokens are:
+
+    * identifiers, quoted or not, naming the plugin schema or one of
+      its sub-schemas (`stareau`, `stareau_valeur`, …)
+    * string literals holding one of these schema names, or starting
+      with a name qualified by one of them, such as sequence names
+      given to `nextval`
+    * the SRID of typmods such as `geometry(point, 2154)`
+
+    Dollar quoted bodies (functions, DO blocks) are rewritten as code.
+    """
+
+    def __init__(self, schema: str, srid: int):
+        self.schema = schema
+        self.srid = srid
+        self.plugin_schema = resources.schema_name()
+        self.plugin_srid = resources.srid_value()
+        self._schema_names = re.compile(rf"{re.escape(self.plugin_schema)}(?:_\w+)?")
+
+    @property
+    def identity(self) -> bool:
+        """Whether the rewrite does not change anything"""
+        return self.schema == self.plugin_schema and self.srid == self.plugin_srid
+
+    def rename(self, name: str) -> str:
+        """Return the new name of a schema, or the name itself"""
+        if self._schema_names.fullmatch(name):
+            return self.schema + name[len(self.plugin_schema) :]
+        return name
+
+    def rewrite(self, sql: str) -> str:
+        """Rewrite the SQL in one pass"""
+        if self.identity:
+            return sql
+
+        out = []
+        pos = 0
+        m = TOKENS.search(sql)
+        while m:
+            kind = m.lastgroup
+            token = m.group(0)
+            end = m.end()
+            if kind == "word":
+                token = self.rename(token)
+            elif kind == "quoted":
+                token = f'"{self.rename(token[1:-1])}"'
+            elif kind == "string":
+                qualified = QUALIFIED_NAME.match(token, 1)
+                if self._schema_names.fullmatch(token[1:-1]):
+                    token = f"'{self.rename(token[1:-1])}'"
+                elif qualified:
+                    name = qualified.group("schema")
+                    token = f"'{self.rename(name)}{token[qualified.end('schema') :]}"
+            elif kind == "srid":
+                if int(m.group("srid_value")) == self.plugin_srid:
+                    token = token.replace(m.group("srid_value"), str(self.srid))
+            elif kind == "dollar":
+                # Rewrite the body up to the closing delimiter as code
+                closing = sql.find(token, end)
+                if closing != -1:
+                    token += self.rewrite(sql[end:closing]) + token
+                    end = closing + len(m.group(0))
+            out.append(sql[pos : m.start()])
+            out.append(token)
+            pos = end
+            m = TOKENS.search(sql, pos)
+        out.append(sql[pos:])
+        return "".join(out)
+
+    def cache_key(self, sql: str) -> str:
+        """Return the render cache key of a SQL script"""
+        h = hashlib.sha256(sql.encode())
+        h.update(
+            f"\0{REWRITE_VERSION}\0{self.plugin_schema}\0{self.plugin_srid}"
+            f"\0{self.schema}\0{self.srid}".encode()
+        )
+        return h.hexdigest()
+
+    def render(self, sql_file: Path, cache_dir: Optional[Path] = None) -> str:
+        """Return the rewritten content of a SQL file
+
+        When `cache_dir` is set, the rendered file is read from the
+        cache if it has been already rendered with the same content,
+        schema and SRID, and stored in the cache otherwise.
+        """
+        sql = sql_file.read_text()
+        if self.identity or cache_dir is None:
+            return self.rewrite(sql)
+
+        cached = cache_dir.joinpath(f"{self.cache_key(sql)}.sql")
+        try:
+            return cached.read_text()
+        except OSError:
+            pass
+
+        rendered = self.rewrite(sql)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write in a temporary file first, so that concurrent renders
+            # never read a partial file
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(rendered)
+            os.replace(tmp, cached)
+        except OSError:
+            # The cache is an optimization only
+            pass
+        return rendered
+
+
+def cache_path() -> Path:
+    """Return the directory of the render cache"""
+    from qgis.core import QgsApplication
+
+    return Path(QgsApplication.qgisSettingsDirPath()).joinpath(
+        "cache",
+        resources.plugin_name_normalized(),
+        "sql",
+    )
@@ -0,0 +1,56 @@
+"""Statistics of the tables of the structure.
+
+They are read in one query from the estimates of the catalog and from
+the cumulative statistics, which are cheap, instead of counting the
+rows: the row counts are the ones of the last vacuum or analyze. A
+parent table only counts its own rows, not the ones of the tables
+inheriting from it.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from . import install
+from .glossary import sql_literal
+
+# Ratio of dead rows from which a table is reported as bloated
+BLOAT_RATIO = 0.2
+
+
+@dataclass
+class TableStatistics:
+    schema: str
+    table: str
+    rows: Optional[int]
+    size: str
+    index_size: str
+    last_vacuum: Optional[str]
+    last_analyze: Optional[str]
+    dead_rows: int
+
+    @property
+    def analyzed(self) -> bool:
+        return self.rows is not None
+
+    @property
+    def bloated(self) -> bool:
+        return self.dead_rows > BLOAT_RATIO * max(self.rows or 0, 1)
+
+
+def table_statistics_sql(schema: str) -> str:
+    """Return the SQL reading the statistics of the tables, the largest first"""
+    schemas = ", ".join(sql_literal(name) for name in install.schemas(schema))
+    return f"""
+        SELECT
+            n.nspname, c.relname,
+            CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END,
+            pg_size_pretty(pg_table_size(c.oid)),
+            pg_size_pretty(pg_indexes_size(c.oid)),
+            to_char(greatest(s.last_vacuum, s.last_autovacuum), 'YYYY-MM-DD HH24:MI'),
+            to_char(greatest(s.last_analyze, s.last_autoanalyze), 'YYYY-MM-DD HH24:MI'),
+            coalesce(s.n_dead_tup, 0)
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_stat_user_tables s ON s.relid = c.oid
+        WHERE n.nspname IN ({schemas}) AND c.relkind IN ('r', 'p')
+        ORDER BY pg_total_relation_size(c.oid) DESC, n.nspname, c.relname"""
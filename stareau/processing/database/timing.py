@@ -0,0 +1,106 @@
+"""Timing report of the install and upgrade scripts."""
+
+import json
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from qgis.core import QgsProcessingException, QgsProcessingFeedback
+
+from ...plugin_tools.i18n import tr
+from ...plugin_tools.sql import split_statements
+
+if TYPE_CHECKING:
+    import psycopg
+
+# Number of the slowest items written in the feedback
+TOP_N = 10
+
+# Length of the SQL kept in the report for each statement
+SQL_EXCERPT_LENGTH = 200
+
+
+class TimingReport:
+    """Collect the time spent in each file, statement and glossary
+
+    Entries have a kind (`file`, `statement`, `glossary` or `script`),
+    the name of the file or table, and the time in seconds. Statements
+    are timed only if `statements` is True, since it requires running
+    them one by one.
+    """
+
+    def __init__(self, statements: bool = False):
+        self.statements = statements
+        self.entries: list[dict] = []
+        self._start = time.perf_counter()
+
+    def add(self, kind: str, name: str, seconds: float, sql: Optional[str] = None):
+        entry = {"kind": kind, "name": name, "seconds": round(seconds, 6)}
+        if sql is not None:
+            entry["sql"] = sql[:SQL_EXCERPT_LENGTH]
+        self.entries.append(entry)
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        """Time the block and add it to the report, even if it fails"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(kind, name, time.perf_counter() - start)
+
+    def slowest(self, kind: str, n: int = TOP_N) -> list[dict]:
+        """Return the n slowest entries of a kind"""
+        entries = (e for e in self.entries if e["kind"] == kind)
+        return sorted(entries, key=lambda e: e["seconds"], reverse=True)[:n]
+
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+    def push_summary(self, feedback: QgsProcessingFeedback, n: int = TOP_N):
+        """Write the slowest files, glossaries and statements in the feedback"""
+        feedback.pushInfo(tr(f"Total time: {self.total():.2f}s"))
+        for kind, title in (
+            ("file", tr("Slowest files")),
+            ("glossary", tr("Slowest glossaries")),
+            ("statement", tr("Slowest statements")),
+        ):
+            entries = self.slowest(kind, n)
+            if not entries:
+                continue
+            feedback.pushInfo(f"{title}:")
+            for e in entries:
+                label = e["name"]
+                if "sql" in e:
+                    label = f"{label}: {' '.join(e['sql'].split())[:80]}"
+                feedback.pushInfo(f"  {e['seconds']:8.3f}s  {label}")
+
+    def write(self, path: Path, **properties):
+        """Write the report as a JSON file"""
+        data = {**properties, "total": round(self.total(), 6), "entries": self.entries}
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def execute_statements(
+    conn: "psycopg.Connection",
+    name: str,
+    sql: str,
+    report: TimingReport,
+    kind: str = "file",
+):
+    """Run a script statement by statement in one transaction, timing each of them
+
+    The transaction control statements of the script must have been removed.
+    """
+    import psycopg
+
+    try:
+        with report.measure(kind, name), conn.transaction():
+            for statement, _ in split_statements(sql):
+                start = time.perf_counter()
+                conn.execute(statement)
+                report.add("statement", name, time.perf_counter() - start, sql=statement)
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
@@ -0,0 +1,249 @@
+"""Topology of the network.
+
+The initial and terminal nodes of the pipes are filled from their
+geometry: each end of a pipe is snapped to the nearest node of the same
+network, within a tolerance. Each pipe table is updated with a single
+statement, in which the nearest node of each node table is found with
+a KNN search (`<->`) on the spatial index of the table, created by the
+install scripts. The ends without any node within the tolerance are
+cleared, so that a pipe never keeps a node it is no longer linked to.
+
+The time of the build of each pipe table is recorded in the
+`topology_build` table of the plugin schema, created by the install
+scripts since version 2. An incremental build only
+updates the pipes modified since the last build with the same
+tolerance, according to their `date_maj`, and the pipes close to the
+nodes modified since then.
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProviderConnectionException,
+)
+
+from ...plugin_tools.i18n import tr
+from ..tools import pooled_connection, psycopg_module
+from .glossary import sql_literal
+
+if TYPE_CHECKING:
+    import psycopg
+
+TOPOLOGY_TABLE = "topology_build"
+
+# Networks, by suffix of the schemas of their tables
+NETWORKS = {
+    "_aep": "aep",
+    "_aep_brcht": "aep",
+    "_ass": "ass",
+    "_ass_brcht": "ass",
+}
+
+
+@dataclass
+class NetworkTables:
+    network: str
+    pipes: list[str] = field(default_factory=list)
+    nodes: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BuildResult:
+    table: str
+    pipes: int
+    updated: int
+    unsnapped: int
+
+
+def network_tables_sql(schema: str) -> str:
+    """Return the SQL listing the tables inheriting the pipes and the nodes"""
+    return f"""
+        SELECT p.relname, n.nspname, c.relname
+        FROM pg_catalog.pg_inherits i
+        JOIN pg_catalog.pg_class p ON p.oid = i.inhparent
+        JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE p.oid IN (
+            to_regclass('{schema}_principale.canalisation'),
+            to_regclass('{schema}_principale.noeud_reseau')
+        )
+        ORDER BY n.nspname, c.relname"""
+
+
+def network_tables(connection: QgsAbstractDatabaseProviderConnection, schema: str) -> list[NetworkTables]:
+    """Return the pipe and node tables of each network"""
+    try:
+        result = connection.executeSql(network_tables_sql(schema))
+    except QgsProviderConnectionException as e:
+        raise QgsProcessingException(str(e)) from None
+    networks: dict[str, NetworkTables] = {}
+    for parent, table_schema, table in result:
+        network = NETWORKS.get(table_schema[len(schema) :])
+        if network is None:
+            continue
+        tables = networks.setdefault(network, NetworkTables(network))
+        if parent == "canalisation":
+            tables.pipes.append(f"{table_schema}.{table}")
+        else:
+            tables.nodes.append(f"{table_schema}.{table}")
+    return list(networks.values())
+
+
+def last_build_sql(schema: str, table: str, tolerance: float) -> str:
+    """Return the SQL reading the time of the last build of a table with the tolerance"""
+    return f"""
+        SELECT built_at
+        FROM {schema}.{TOPOLOGY_TABLE}
+        WHERE table_name = {sql_literal(table)} AND tolerance = {float(tolerance)!r}"""
+
+
+def record_sql(schema: str, table: str, tolerance: float) -> str:
+    """Return the SQL recording the build of a table
+
+    The build time is the start of the transaction: the rows modified
+    during the build are updated again by the next build.
+    """
+    return f"""
+        INSERT INTO {schema}.{TOPOLOGY_TABLE} (table_name, tolerance, built_at)
+        VALUES ({sql_literal(table)}, {float(tolerance)!r}, localtimestamp)
+        ON CONFLICT (table_name)
+        DO UPDATE SET tolerance = EXCLUDED.tolerance, built_at = EXCLUDED.built_at"""
+
+
+def nearest_node_sql(nodes: list[str], point: str, tolerance: float) -> str:
+    """Return the SQL expression of the nearest node of a point within the tolerance"""
+    candidates = "\n                UNION ALL\n".join(
+        f"""                (
+                    SELECT id_noeud_reseau AS id, geom <-> {point} AS distance
+                    FROM {node}
+                    ORDER BY geom <-> {point}
+                    LIMIT 1
+                )"""
+        for node in nodes
+    )
+    return f"""(
+            SELECT n.id FROM (
+{candidates}
+            ) n
+            WHERE n.distance <= {float(tolerance)!r}
+            ORDER BY n.distance
+            LIMIT 1
+        )"""
+
+
+def modified_pipes_sql(pipe: str, nodes: list[str], tolerance: float, since: str) -> str:
+    """Return the SQL condition on the pipes modified, or close to nodes modified, since a time"""
+    close_pipes = "\n                UNION ALL\n".join(
+        f"""                SELECT c.ctid
+                FROM {node} n
+                JOIN {pipe} c ON ST_DWithin(c.geom, n.geom, {float(tolerance)!r})
+                WHERE n.date_maj > {since}"""
+        for node in nodes
+    )
+    return f"""p.date_maj > {since}
+            OR p.ctid IN (
+{close_pipes}
+            )"""
+
+
+def build_sql(pipe: str, nodes: list[str], tolerance: float, since: Optional[str] = None) -> str:
+    """Return the SQL snapping the ends of the pipes of a table to the nodes
+
+    The nodes of the ends without any node within the tolerance are
+    cleared. Only the rows whose nodes change are updated.
+    The query returns the number of pipes, of updated pipes and of
+    ends without any node.
+    """
+    where = f"WHERE {modified_pipes_sql(pipe, nodes, tolerance, since)}" if since else ""
+    return f"""
+        WITH pipes AS (
+            SELECT p.ctid AS row_id, ST_StartPoint(p.geom) AS start_point, ST_EndPoint(p.geom) AS end_point
+            FROM ONLY {pipe} p
+            {where}
+        ),
+        snapped AS (
+            SELECT
+                row_id,
+                {nearest_node_sql(nodes, "start_point", tolerance)} AS initial,
+                {nearest_node_sql(nodes, "end_point", tolerance)} AS terminal
+            FROM pipes
+        ),
+        updated AS (
+            UPDATE ONLY {pipe} p
+            SET
+                noeudinitial = coalesce(s.initial, ''),
+                noeudterminal = coalesce(s.terminal, '')
+            FROM snapped s
+            WHERE p.ctid = s.row_id
+            AND (coalesce(s.initial, ''), coalesce(s.terminal, ''))
+                IS DISTINCT FROM (p.noeudinitial, p.noeudterminal)
+            RETURNING 1
+        )
+        SELECT
+            (SELECT count(*) FROM snapped),
+            (SELECT count(*) FROM updated),
+            (
+                SELECT count(*) FILTER (WHERE initial IS NULL) + count(*) FILTER (WHERE terminal IS NULL)
+                FROM snapped
+            )"""
+
+
+def build_table(
+    conn: "psycopg.Connection",
+    schema: str,
+    pipe: str,
+    nodes: list[str],
+    tolerance: float,
+    incremental: bool,
+) -> BuildResult:
+    """Build the topology of a pipe table, in a transaction"""
+    with conn.transaction():
+        since = None
+        if incremental:
+            row = conn.execute(last_build_sql(schema, pipe, tolerance)).fetchone()
+            if row:
+                since = sql_literal(str(row[0])) + "::timestamp"
+        counts = conn.execute(build_sql(pipe, nodes, tolerance, since)).fetchone() or (0, 0, 0)
+        pipes, updated, unsnapped = counts
+        conn.execute(record_sql(schema, pipe, tolerance))
+    return BuildResult(pipe, pipes, updated, unsnapped)
+
+
+def build_topology(
+    connection: QgsAbstractDatabaseProviderConnection,
+    schema: str,
+    tolerance: float,
+    *,
+    incremental: bool,
+    feedback: QgsProcessingFeedback,
+) -> list[BuildResult]:
+    """Build the topology of all the pipe tables, each one in its own transaction"""
+    psycopg = psycopg_module()
+
+    networks = network_tables(connection, schema)
+    if not networks:
+        raise QgsProcessingException(tr(f"The structure is not installed in the schema {schema}"))
+    results = []
+    try:
+        with pooled_connection(connection) as conn:
+            total = sum(len(tables.pipes) for tables in networks)
+            for tables in networks:
+                for pipe in tables.pipes:
+                    if feedback.isCanceled():
+                        break
+                    result = build_table(conn, schema, pipe, tables.nodes, tolerance, incremental)
+                    feedback.pushInfo(
+                        tr(
+                            f"{pipe}: {result.updated} pipes updated out of {result.pipes}, "
+                            f"{result.unsnapped} ends without any node"
+                        )
+                    )
+                    results.append(result)
+                    feedback.setProgress(100 * len(results) / total)
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+    return results
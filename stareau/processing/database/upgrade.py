@@ -0,0 +1,390 @@
+"""Upgrade engine applying the whole migration chain in one transaction.
+
+Each migration runs in its own savepoint, under a short `lock_timeout`:
+when a lock cannot be taken in time, the migration is rolled back to
+its savepoint and retried after a growing delay, instead of queuing
+behind long running queries. The installed version is updated at the
+end of the transaction only, so that the metadata never records a
+partial upgrade. Each migration is recorded in the ledger, see the
+`ledger` module.
+
+Only the transactional phase of the migrations is run in the upgrade
+transaction: their online phases are run after the commit, see the
+`phases` module.
+"""
+
+import importlib.util
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Sequence
+
+from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProviderConnectionException,
+)
+
+from ...plugin_tools import phases, resources
+from ...plugin_tools.i18n import tr
+from ...plugin_tools.sql import split_statements
+from . import install, ledger
+from .glossary import sql_literal
+from .timing import TimingReport
+
+if TYPE_CHECKING:
+    import psycopg
+
+# Default lock timeout, in milliseconds
+LOCK_TIMEOUT = 2000
+
+# Default number of retries of a migration when a lock is not available
+RETRIES = 3
+
+# First delay, in seconds, before retrying; doubled at each retry
+BACKOFF = 0.5
+
+# SQLSTATE of lock_not_available and deadlock_detected
+LOCK_ERRORS = ("55P03", "40P01")
+
+# The same errors, from the message of a QGIS connection
+LOCK_ERROR_MESSAGES = ("lock timeout", "could not obtain lock", "deadlock detected")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+    checksum: str
+
+    def record_sql(self, schema: str) -> str:
+        """Return the SQL recording the migration in the ledger"""
+        return ledger.record_sql(
+            schema,
+            self.version,
+            kind="upgrade",
+            file_name=self.name,
+            checksum=self.checksum,
+        )
+
+
+@dataclass
+class OnlinePhase:
+    """Phase of a migration run outside of the upgrade transaction"""
+
+    version: int
+    name: str
+    phase: str
+    sql: str
+
+
+def migration_phases(sql_file: Path, sql: str) -> dict[str, str]:
+    try:
+        return phases.split_phases(sql)
+    except ValueError as e:
+        raise QgsProcessingException(f"{sql_file.name}: {e}") from None
+
+
+def migrations(
+    schema: str,
+    srid: int,
+    from_version: int,
+    cache_dir: Optional[Path] = None,
+    applied: Iterable[int] = (),
+) -> list[Migration]:
+    """Return the migrations to apply from a version, adapted to the schema
+
+    Empty files and the `applied` versions are left out. Only the
+    transactional phase of the files is kept, without its transaction
+    control statements, so that the migrations run in the upgrade
+    transaction.
+    """
+    applied = set(applied)
+    result = []
+    for version, sql_file in resources.available_migrations(from_version):
+        if version in applied:
+            continue
+        sql = install.render_sql_file(sql_file, schema, srid, cache_dir)
+        if len(sql.strip()) == 0:
+            continue
+        sql = migration_phases(sql_file, sql)[phases.TRANSACTION]
+        result.append(
+            Migration(
+                version,
+                sql_file.name,
+                install.strip_transaction_statements(sql),
+                ledger.migration_checksum(version, sql_file),
+            )
+        )
+    return result
+
+
+def online_phases(
+    schema: str,
+    srid: int,
+    done: dict[int, set[str]],
+    cache_dir: Optional[Path] = None,
+) -> list[OnlinePhase]:
+    """Return the online phases left to run, in order
+
+    `done` holds the kinds recorded in the ledger for each version: the
+    online phases of a migration are run once its transactional phase,
+    recorded as `upgrade`, has been committed.
+    """
+    result = []
+    for version, sql_file in resources.available_migrations():
+        kinds = done.get(version, set())
+        if "upgrade" not in kinds:
+            continue
+        # Files without online phases according to the manifest are not read
+        known = resources.migration_manifest().get(version, {}).get("phases")
+        if known is not None and not set(known) & set(phases.ONLINE_PHASES):
+            continue
+        sql = install.render_sql_file(sql_file, schema, srid, cache_dir)
+        for phase, phase_sql in migration_phases(sql_file, sql).items():
+            if phase in phases.ONLINE_PHASES and phase not in kinds and phase_sql.strip():
+                result.append(OnlinePhase(version, sql_file.name, phase, phase_sql))
+    # All the concurrent phases are run before the validations
+    return sorted(result, key=lambda p: phases.ONLINE_PHASES.index(p.phase))
+
+
+def lock_timeout_sql(lock_timeout: int) -> str:
+    """Return the SQL setting the lock timeout, in milliseconds, of the transaction"""
+    return f"SET LOCAL lock_timeout = '{int(lock_timeout)}ms'"
+
+
+def backoff_delays(retries: int, backoff: float = BACKOFF) -> Iterator[float]:
+    """Yield the delays before each retry"""
+    for attempt in range(retries):
+        yield backoff * 2**attempt
+
+
+def is_lock_error(error: Exception) -> bool:
+    """Whether the error is a lock which could not be taken in time"""
+    sqlstate = getattr(error, "sqlstate", None)
+    if sqlstate:
+        return sqlstate in LOCK_ERRORS
+    message = str(error).lower()
+    return any(text in message for text in LOCK_ERROR_MESSAGES)
+
+
+def upgrade_script(
+    migrations: Sequence[Migration],
+    schema: str,
+    version: int,
+    lock_timeout: int,
+) -> str:
+    """Return the whole upgrade as a single script
+
+    Sent as one multi-statement query, the script is run by PostgreSQL
+    as a single implicit transaction, which `SET LOCAL` applies to.
+    """
+    parts = [
+        ("lock_timeout", lock_timeout_sql(lock_timeout)),
+        ("ledger", ledger.table_sql(schema)),
+    ]
+    for migration in migrations:
+        parts.append(
+            (
+                migration.name,
+                f"{ledger.start_sql()};\n{migration.sql.rstrip()}\n;\n{migration.record_sql(schema)}",
+            )
+        )
+    parts.append(
+        ("metadata", f"{install.version_update_sql(schema, version)};\n{ledger.upgrade_sql(schema, version)}")
+    )
+    return install.render_install_script(iter(parts))
+
+
+def execute_migration(
+    conn: "psycopg.Connection",
+    migration: Migration,
+    schema: str,
+    report: TimingReport,
+):
+    """Run a migration and record it in the ledger
+
+    The statements are timed if required by the report.
+    """
+    conn.execute(ledger.start_sql())
+    with report.measure("file", migration.name):
+        if not report.statements:
+            # The transactional phase of a migration may be empty
+            if migration.sql.strip():
+                conn.execute(migration.sql)
+        else:
+            for statement, _ in split_statements(migration.sql):
+                start = time.perf_counter()
+                conn.execute(statement)
+                report.add("statement", migration.name, time.perf_counter() - start, sql=statement)
+    conn.execute(migration.record_sql(schema))
+
+
+def run_upgrade(
+    conn: "psycopg.Connection",
+    migrations: Sequence[Migration],
+    *,
+    schema: str,
+    version: int,
+    feedback: QgsProcessingFeedback,
+    report: TimingReport,
+    lock_timeout: int = LOCK_TIMEOUT,
+    retries: int = RETRIES,
+):
+    """Apply the migrations in one transaction, with one savepoint each
+
+    A migration failing on a lock is retried from its savepoint, at most
+    `retries` times. Any other error, or a cancel, rolls back the whole
+    upgrade.
+    """
+    import psycopg
+
+    try:
+        with conn.transaction():
+            conn.execute(lock_timeout_sql(lock_timeout))
+            conn.execute(ledger.table_sql(schema))
+            for migration in migrations:
+                feedback.pushInfo(tr("* NEW DB VERSION ") + str(migration.version))
+                delays = backoff_delays(retries)
+                while True:
+                    try:
+                        with conn.transaction():
+                            execute_migration(conn, migration, schema, report)
+                        break
+                    except psycopg.Error as e:
+                        delay = next(delays, None) if is_lock_error(e) else None
+                        if delay is None:
+                            feedback.reportError(f"Error when executing file {migration.name}")
+                            raise
+                        feedback.pushInfo(
+                            tr(f"* {migration.name}: lock not available, retrying in {delay:.1f}s")
+                        )
+                        time.sleep(delay)
+
+                if feedback.isCanceled():
+                    raise QgsProcessingException(tr("Upgrade canceled, nothing has been changed"))
+                feedback.pushInfo(f"* {migration.name} -- OK !")
+
+            conn.execute(install.version_update_sql(schema, version))
+            conn.execute(ledger.upgrade_sql(schema, version))
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+
+
+def run_upgrade_script(
+    connection: QgsAbstractDatabaseProviderConnection,
+    migrations: Sequence[Migration],
+    *,
+    schema: str,
+    version: int,
+    feedback: QgsProcessingFeedback,
+    report: TimingReport,
+    lock_timeout: int = LOCK_TIMEOUT,
+    retries: int = RETRIES,
+):
+    """Apply the migrations as one script on a QGIS connection
+
+    Used when psycopg is not available: the script is retried as a
+    whole when a lock is not available.
+    """
+    script = upgrade_script(migrations, schema, version, lock_timeout)
+    delays = backoff_delays(retries)
+    while True:
+        try:
+            with report.measure("script", "upgrade"):
+                connection.executeSql(script)
+            break
+        except QgsProviderConnectionException as e:
+            delay = next(delays, None) if is_lock_error(e) else None
+            if delay is None:
+                raise QgsProcessingException(str(e)) from None
+            feedback.pushInfo(tr(f"* Lock not available, retrying the upgrade in {delay:.1f}s"))
+            time.sleep(delay)
+
+    for migration in migrations:
+        feedback.pushInfo(f"* {migration.name} -- OK !")
+
+
+def has_psycopg() -> bool:
+    return importlib.util.find_spec("psycopg") is not None
+
+
+def run_online_phase(
+    conn: "psycopg.Connection",
+    phase: OnlinePhase,
+    *,
+    schema: str,
+    feedback: QgsProcessingFeedback,
+    report: TimingReport,
+    lock_timeout: int = LOCK_TIMEOUT,
+    retries: int = RETRIES,
+):
+    """Run an online phase statement by statement, outside of any transaction
+
+    The connection must be in autocommit mode. Each statement is retried
+    alone when a lock is not available. An index left invalid by an
+    interrupted concurrent build is dropped and built again, a valid one
+    is kept. The phase is recorded in the ledger once all its statements
+    have been run.
+    """
+    import psycopg
+
+    feedback.pushInfo(tr(f"* {phase.name}: {phase.phase} phase"))
+    try:
+        conn.execute(f"SET lock_timeout = '{int(lock_timeout)}ms'")
+        row = conn.execute("SELECT clock_timestamp()::text").fetchone()
+        # Fall back on the time of the record, in autocommit mode
+        started_at = f"{sql_literal(row[0])}::timestamp with time zone" if row else "now()"
+
+        for statement, code in split_statements(phase.sql):
+            if feedback.isCanceled():
+                raise QgsProcessingException(
+                    tr("Upgrade canceled, run it again to resume the remaining phases")
+                )
+
+            index = phases.index_name(code)
+            if index:
+                row = conn.execute(
+                    "SELECT indisvalid FROM pg_catalog.pg_index WHERE indexrelid = to_regclass(%s)",
+                    (index,),
+                ).fetchone()
+                if row and row[0]:
+                    feedback.pushInfo(tr(f"  Index {index} already built"))
+                    continue
+                if row:
+                    feedback.pushInfo(
+                        tr(f"  Dropping the invalid index {index} left by an interrupted build")
+                    )
+                    conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+            delays = backoff_delays(retries)
+            while True:
+                try:
+                    start = time.perf_counter()
+                    conn.execute(statement)
+                    report.add("statement", phase.name, time.perf_counter() - start, sql=statement)
+                    break
+                except psycopg.Error as e:
+                    delay = next(delays, None) if is_lock_error(e) else None
+                    if delay is None:
+                        feedback.reportError(f"Error when executing the {phase.phase} phase of {phase.name}")
+                        raise
+                    feedback.pushInfo(tr(f"  Lock not available, retrying in {delay:.1f}s"))
+                    time.sleep(delay)
+
+        conn.execute(
+            ledger.record_sql(
+                schema,
+                phase.version,
+                kind=phase.phase,
+                file_name=phase.name,
+                started_at=started_at,
+            )
+        )
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+
+    feedback.pushInfo(f"* {phase.name} ({phase.phase}) -- OK !")
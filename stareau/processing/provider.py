@@ -8,7 +8,16 @@ from ..plugin_tools.resources import (
 from .alg_configure_plugin import ConfigurePlugin
 from .alg_create_database_local_interface import CreateDatabaseLocalInterface
 from .database import (
+    BuildNetworkTopology,
+    CheckDatabaseStructure,
+    CreateDatabaseBatch,
+    CreateDatabaseFromTemplate,
     CreateDatabaseStructure,
+    ImportNetworkData,
+    TraceConnected,
+    TraceDownstream,
+    TraceUpstream,
+    UpgradeDatabaseFleet,
     UpgradeDatabaseStructure,
 )
 from .tools import provider_id
@@ -28,6 +37,17 @@ class Provider(QgsProcessingProvider):
         # Database
         self.addAlgorithm(CreateDatabaseStructure())
         self.addAlgorithm(UpgradeDatabaseStructure())
+        self.addAlgorithm(CreateDatabaseFromTemplate())
+        self.addAlgorithm(CreateDatabaseBatch())
+        self.addAlgorithm(UpgradeDatabaseFleet())
+        self.addAlgorithm(CheckDatabaseStructure())
+        self.addAlgorithm(ImportNetworkData())
+        self.addAlgorithm(BuildNetworkTopology())
+
+        # Network
+        self.addAlgorithm(TraceDownstream())
+        self.addAlgorithm(TraceUpstream())
+        self.addAlgorithm(TraceConnected())
 
         self.addAlgorithm(CreateDatabaseLocalInterface())
 
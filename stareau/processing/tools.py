@@ -1,20 +1,41 @@
-import shutil
+import threading
+import time
 
-from pathlib import Path
-from typing import Any, List, Optional, Tuple, Union
+from contextlib import closing, contextmanager
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Generator, Iterator, List, Optional, Sequence, Tuple, Union
 
 from qgis.core import (
+    QgsAbstractDatabaseProviderConnection,
     QgsDataSourceUri,
     QgsExpressionContextUtils,
+    QgsProcessingException,
+    QgsProcessingFeedback,
     QgsProject,
     QgsProviderConnectionException,
     QgsProviderRegistry,
 )
 
-from ..plugin_tools.resources import plugin_name_normalized, plugin_path
+from ..plugin_tools.i18n import tr
+from ..plugin_tools.resources import plugin_name_normalized
+
+if TYPE_CHECKING:
+    import psycopg
 
 CONNECTION_NAME_CONTEXT_VAR = f"{plugin_name_normalized()}_connection_name"
 
+# Number of rows fetched at once by the streamed queries
+FETCH_SIZE = 5000
+
+# Number of idle psycopg connections kept open for each database
+POOL_MAX_SIZE = 4
+
+# Time in seconds after which an idle connection is closed
+POOL_IDLE_TIMEOUT = 300
+
+# Time in seconds after which an idle connection is checked before being reused
+POOL_CHECK_AFTER = 30
+
 
 def provider_id() -> str:
     return plugin_name_normalized()
@@ -32,32 +53,300 @@ def get_connection_name(project: QgsProject) -> str:
     )
 
 
-def get_postgis_connection_list():
+class ConnectionRegistry:
+    """Cache of the QGIS PostgreSQL connections
+
+    Reading the connections rereads the QGIS settings and builds new
+    connection objects each time: they are read once, then updated from
+    the signals of the provider metadata when a connection is created,
+    changed or deleted. The registry may be used from the processing
+    threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: Optional[dict[str, QgsAbstractDatabaseProviderConnection]] = None
+        self._uris: dict[str, QgsDataSourceUri] = {}
+        self._metadata = None
+        self.hits = 0
+        self.misses = 0
+
+    def metadata(self):
+        """Return the provider metadata, connected to the registry on the first call"""
+        if self._metadata is None:
+            metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
+            metadata.connectionCreated.connect(self.update)
+            metadata.connectionChanged.connect(self.update)
+            metadata.connectionDeleted.connect(self.remove)
+            self._metadata = metadata
+        return self._metadata
+
+    def _cached_connections(self) -> dict[str, QgsAbstractDatabaseProviderConnection]:
+        """Return the connections by name, read on the first call; the lock must be held"""
+        if self._connections is None:
+            self.misses += 1
+            self._connections = dict(self.metadata().connections())
+        else:
+            self.hits += 1
+        return self._connections
+
+    def connections(self) -> dict[str, QgsAbstractDatabaseProviderConnection]:
+        """Return a copy of the connections by name"""
+        with self._lock:
+            return dict(self._cached_connections())
+
+    def names(self) -> list[str]:
+        """Return the names of the connections"""
+        with self._lock:
+            return list(self._cached_connections())
+
+    def find(self, connection_name: str) -> Optional[QgsAbstractDatabaseProviderConnection]:
+        """Return the connection or None if it does not exist"""
+        with self._lock:
+            return self._cached_connections().get(connection_name)
+
+    def uri(self, connection_name: str) -> Optional[QgsDataSourceUri]:
+        """Return the URI of the connection or None if it does not exist"""
+        connection = self.find(connection_name)
+        if not connection:
+            return None
+        with self._lock:
+            if connection_name not in self._uris:
+                self._uris[connection_name] = QgsDataSourceUri(connection.uri())
+            # A copy, which may be changed by the caller
+            return QgsDataSourceUri(self._uris[connection_name])
+
+    def update(self, connection_name: str):
+        """Read again a created or changed connection"""
+        connection = self.metadata().findConnection(connection_name)
+        with self._lock:
+            self._uris.pop(connection_name, None)
+            if self._connections is not None and connection:
+                self._connections[connection_name] = connection
+
+    def remove(self, connection_name: str):
+        """Forget a deleted connection"""
+        with self._lock:
+            self._uris.pop(connection_name, None)
+            if self._connections is not None:
+                self._connections.pop(connection_name, None)
+
+    def clear(self):
+        """Forget all the connections, which are read again on the next call"""
+        with self._lock:
+            self._connections = None
+            self._uris.clear()
+
+
+# Shared by the dock and the algorithms
+connection_registry = ConnectionRegistry()
+
+
+def get_postgis_connection_list() -> list[str]:
     """Get a list of the PostGIS connection names"""
-    metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
-    postgres_connections = metadata.connections()
-    connections = postgres_connections.keys()
-    return connections
+    return connection_registry.names()
 
 
 def get_postgis_connection_uri_from_name(connection_name: str) -> Optional[QgsDataSourceUri]:
     """
     Return a QgsDatasourceUri from a PostgreSQL connection name
     """
-    metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
-    connection = metadata.findConnection(connection_name)
-    if not connection:
-        return None
+    return connection_registry.uri(connection_name)
+
+
+def psycopg_module() -> ModuleType:
+    """
+    Return the optional psycopg module
+
+    To be used instead of `import psycopg` before any psycopg connection
+    is open, so that a missing module is reported as a processing error.
+    """
+    try:
+        import psycopg
+    except ImportError:
+        raise QgsProcessingException(
+            tr("The python module 'psycopg' is required, please install it.")
+        ) from None
+    return psycopg
+
+
+def psycopg_connection(connection: QgsAbstractDatabaseProviderConnection) -> "psycopg.Connection":
+    """
+    Open a psycopg connection to the database of a PostgreSQL connection
+
+    The optional psycopg module is used for what the QGIS connection
+    API does not provide, such as COPY or explicit transactions.
+    """
+    psycopg = psycopg_module()
+
+    try:
+        return psycopg.connect(QgsDataSourceUri(connection.uri()).connectionInfo(True))
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+
+
+class ConnectionPool:
+    """Pool of psycopg connections, reused across the algorithm runs
+
+    Opening a connection to a remote server may take hundreds of
+    milliseconds. Released connections are kept open, at most `max_size`
+    for each database, and closed once idle for `idle_timeout` seconds.
+    More connections may be in use at once: the extra ones are closed
+    when released. A connection idle for more than `check_after` seconds
+    is checked with a query before being reused.
+
+    Connections are returned to the pool with their transaction rolled
+    back and their session settings reset.
+    """
+
+    def __init__(
+        self,
+        max_size: int = POOL_MAX_SIZE,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        check_after: float = POOL_CHECK_AFTER,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self._lock = threading.Lock()
+        # Idle connections, with the time they have been released, by connection info
+        self._idle: dict[str, list[tuple[float, "psycopg.Connection"]]] = {}
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.discarded = 0
 
-    return QgsDataSourceUri(connection.uri())
+    def metrics(self) -> dict[str, int]:
+        """Return the counters of the pool"""
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "in_use": self.in_use,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "discarded": self.discarded,
+            }
+
+    def evict(self, now: Optional[float] = None):
+        """Close the connections idle for too long"""
+        now = time.monotonic() if now is None else now
+        expired: list["psycopg.Connection"] = []
+        with self._lock:
+            for idle in self._idle.values():
+                expired.extend(conn for released, conn in idle if now - released > self.idle_timeout)
+                idle[:] = [(released, conn) for released, conn in idle if now - released <= self.idle_timeout]
+            self.evicted += len(expired)
+        for conn in expired:
+            conn.close()
+
+    def acquire(self, conninfo: str) -> "psycopg.Connection":
+        """Return an idle connection to the database, or a new one"""
+        import psycopg
+
+        now = time.monotonic()
+        self.evict(now)
+        while True:
+            with self._lock:
+                idle = self._idle.get(conninfo)
+                if not idle:
+                    break
+                released, conn = idle.pop()
+            if now - released > self.check_after:
+                try:
+                    conn.execute("SELECT 1")
+                    conn.rollback()
+                except psycopg.Error:
+                    # The server may have closed the connection meanwhile
+                    conn.close()
+                    with self._lock:
+                        self.discarded += 1
+                    continue
+            with self._lock:
+                self.reused += 1
+                self.in_use += 1
+            return conn
+
+        # `DISCARD ALL` drops the prepared statements on release: psycopg
+        # must not prepare the queries run several times
+        conn = psycopg.connect(conninfo, prepare_threshold=None)
+        with self._lock:
+            self.created += 1
+            self.in_use += 1
+        return conn
+
+    def release(self, conninfo: str, conn: "psycopg.Connection"):
+        """Return a connection to the pool"""
+        import psycopg
+
+        keep = not conn.closed
+        if keep:
+            try:
+                conn.rollback()
+                conn.autocommit = True
+                # Settings, such as lock_timeout, and temporary tables of the session
+                conn.execute("DISCARD ALL")
+                conn.autocommit = False
+                conn.read_only = None
+            except psycopg.Error:
+                keep = False
+
+        with self._lock:
+            self.in_use -= 1
+            idle = self._idle.setdefault(conninfo, [])
+            keep = keep and len(idle) < self.max_size
+            if keep:
+                idle.append((time.monotonic(), conn))
+            else:
+                self.discarded += 1
+        if not keep:
+            conn.close()
+
+    def close(self):
+        """Close all the idle connections"""
+        with self._lock:
+            idle = [conn for connections in self._idle.values() for _, conn in connections]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+# Shared by the algorithm runs of the QGIS session
+connection_pool = ConnectionPool()
+
+
+@contextmanager
+def pooled_connection(connection: QgsAbstractDatabaseProviderConnection) -> Iterator["psycopg.Connection"]:
+    """
+    Use a psycopg connection of the pool to the database of a PostgreSQL connection
+
+    As with a psycopg connection, the transaction is committed at the
+    end of the block, or rolled back if it fails.
+    """
+    psycopg = psycopg_module()
+
+    conninfo = QgsDataSourceUri(connection.uri()).connectionInfo(True)
+    try:
+        conn = connection_pool.acquire(conninfo)
+    except psycopg.Error as e:
+        raise QgsProcessingException(str(e)) from None
+
+    try:
+        yield conn
+        if not conn.closed and not conn.autocommit:
+            conn.commit()
+    finally:
+        connection_pool.release(conninfo, conn)
 
 
 def fetch_data_from_sql_query(
     connection_name: str, sql: str
 ) -> Union[Tuple[Any, None], Tuple[List[Any], str]]:
     """Execute SQL and return the result."""
-    metadata = QgsProviderRegistry.instance().providerMetadata("postgres")
-    connection = metadata.findConnection(connection_name)
+    connection = connection_registry.find(connection_name)
+    if connection is None:
+        return [], tr(f"The connection {connection_name} does not exist")
 
     try:
         result = connection.executeSql(sql)
@@ -66,53 +355,73 @@ def fetch_data_from_sql_query(
         return [], str(e)
 
 
-def getVersionInteger(f):
-    """
-    Transform "0.1.2" into "000102"
-    Transform "10.9.12" into "100912"
-    to allow comparing versions
-    and sorting the upgrade files
-    """
-    return "".join([a.zfill(2) for a in f.strip().split(".")])
+def iter_query_pages(
+    connection: QgsAbstractDatabaseProviderConnection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    *,
+    fetch_size: int = FETCH_SIZE,
+    row_type: Optional[type] = None,
+    feedback: Optional[QgsProcessingFeedback] = None,
+) -> Generator[list, None, None]:
+    """Execute SQL and yield the result by pages of at most `fetch_size` rows
 
+    The rows are read from a server side cursor, so that only one page
+    is in memory at a time. They are tuples, or `row_type` objects built
+    with the columns as keyword arguments, such as a dataclass.
 
-def createAdministrationProjectFromTemplate(
-    connection_name: str,
-    project_file_path: str,
-) -> bool:
-    """
-    Creates a new administration project from template
-    for the given connection name
-    to the given target path
+    The query stops when the feedback is canceled: the caller must check
+    the feedback to tell a canceled query from a complete one.
+
+    The pooled connection is held until the generator is exhausted or
+    closed: a caller which may stop before the end must close it, for
+    instance with `contextlib.closing`::
+
+        with closing(iter_query_pages(connection, sql)) as pages:
+            for rows in pages:
+                ...
     """
-    # Get connection information
-    uri = get_postgis_connection_uri_from_name(connection_name)
-    if not uri:
-        return False
+    with pooled_connection(connection) as conn:
+        import psycopg
 
-    connection_info = uri.connectionInfo()
+        from psycopg.rows import class_row, tuple_row
 
-    # FIXME THIS IS TOTALLY WRONG !!!!
-    # Variables are blindly replaced, some of them are wrong, this may
-    # lead to a real mess
+        row_factory = class_row(row_type) if row_type else tuple_row
+        try:
+            conn.read_only = True
+            with conn.cursor(name=f"{plugin_name_normalized()}_stream", row_factory=row_factory) as cursor:
+                cursor.itersize = fetch_size
+                cursor.execute(sql, params)
+                while not (feedback and feedback.isCanceled()):
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    yield rows
+        except psycopg.Error as e:
+            raise QgsProcessingException(str(e)) from None
 
-    # Read in the template file
-    template_file = plugin_path("resources", "qgis", "plugin_admin.qgs")
-    with open(template_file, "r") as fin:
-        filedata = fin.read()
 
-    # Replace the database connection information
-    filedata = filedata.replace("service='pg_stareau_service'", connection_info)
+def iter_query(
+    connection: QgsAbstractDatabaseProviderConnection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    **kwargs,
+) -> Generator[Any, None, None]:
+    """Execute SQL and yield the rows one by one, see `iter_query_pages`
 
-    # Replace also the QGIS project variable
-    filedata = filedata.replace("stareau_connection_name_value", connection_name)
-    with open(project_file_path, "w") as fout:
-        fout.write(filedata)
+    As with `iter_query_pages`, the generator must be closed by a caller
+    which may stop before the end.
+    """
+    with closing(iter_query_pages(connection, sql, params, **kwargs)) as pages:
+        for rows in pages:
+            yield from rows
 
-    # Copy the Lizmap configuration
-    config_file = plugin_path("resources", "qgis", "plugin_admin.qgs.cfg")
-    config_file_path = Path(config_file)
-    if config_file_path.exists():
-        shutil.copyfile(config_file, f"{project_file_path}.cfg")
 
-    return True
+def getVersionInteger(f):
+    """
+    Transform "0.1.2" into "000102"
+    Transform "10.9.12" into "100912"
+    to allow comparing versions
+    and sorting the upgrade files
+    """
+    return "".join([a.zfill(2) for a in f.strip().split(".")])
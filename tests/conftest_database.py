@@ -43,6 +43,15 @@ def processing_provider() -> Provider:
 
     assert registry.algorithmById(f"{provider_id}:create_database_structure") is not None
     assert registry.algorithmById(f"{provider_id}:upgrade_database_structure") is not None
+    assert registry.algorithmById(f"{provider_id}:create_database_from_template") is not None
+    assert registry.algorithmById(f"{provider_id}:create_database_batch") is not None
+    assert registry.algorithmById(f"{provider_id}:upgrade_database_fleet") is not None
+    assert registry.algorithmById(f"{provider_id}:check_database_structure") is not None
+    assert registry.algorithmById(f"{provider_id}:import_network_data") is not None
+    assert registry.algorithmById(f"{provider_id}:build_network_topology") is not None
+    assert registry.algorithmById(f"{provider_id}:trace_downstream") is not None
+    assert registry.algorithmById(f"{provider_id}:trace_upstream") is not None
+    assert registry.algorithmById(f"{provider_id}:trace_connected") is not None
 
     return provider
 
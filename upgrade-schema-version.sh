@@ -11,6 +11,8 @@
 # 2. Create an empty migration sql file to $MODULE_NAME/install/sql/upgrade/upgrade_to_<n+1>.sql
 # 3. Update the schema version in metadata.txt
 
+set -e
+
 
 # Create directories
 mkdir -p tests/data $MODULE_NAME/install/sql/upgrade
@@ -47,6 +49,8 @@ cp -ar $schema_source $schema_dest
 
 echo "Creating migration sql file '$new_migration_sql'"
 touch $new_migration_sql
+python3 -m $MODULE_NAME migration-manifest
+echo "Run 'make migration-manifest' once the migration file is written"
 
 echo "Updating schema version in metadadata.txt"
 sed -i "s/schemaVersion=.*/schemaVersion=$new_schema_version/" $MODULE_NAME/metadata.txt